@@ -0,0 +1,736 @@
+import argparse
+import json
+import logging
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import mne
+import numpy as np
+from data_acquisition.eeg_headset import MockEEGHeadset
+from data_acquisition.gui import PygameGui
+from data_acquisition.gui.display_mode import WindowedDisplayMode
+
+from src.compressed_block import read_compressed_block, write_compressed_block
+from src.config import Config
+from src.constants import (
+    COMPRESSED_STORAGE_CHUNK_SECONDS,
+    COMPRESSED_STORAGE_COMPRESSION_LEVEL,
+    MOCK_EEG_CHUNK_SAMPLE_COUNT,
+)
+from src.eeg_stream import MockEEGStream
+from src.sentence_corpus import SentenceCorpus, get_corpus_index_path
+from src.sentence_sequencer import SentenceSequencer
+from src.sentences import Sentences, load_sentences
+from src.session_plan import compile_session_plan
+from src.shared_memory_stream import (
+    SharedMemoryPublishingHeadset,
+    SharedMemoryStreamReader,
+)
+from src.simulation import VirtualEEGStream
+from src.streaming_eeg_headset import StreamingEEGHeadset
+from src.text_layout_cache import get_text_layout_key, load_sentence_layouts
+from src.timing_recorder import TimingRecorder
+
+sys.path.insert(0, str(Path(__file__).parent / "eeg_checker"))
+
+from utils import CHANNELS, SAMPLING_FREQUENCY, preprocess_data  # noqa: E402
+
+RESULT_FORMAT_VERSION = 1
+RESULTS_DIR_PATH = Path("benchmarks")
+REPEAT_COUNT = 5
+
+SEQUENCER_SENTENCE_COUNT = 1000
+CORPUS_SENTENCE_COUNTS = [1_000, 10_000, 100_000]
+MOCK_HEADSET_RECORDING_SECONDS = [1, 5]
+STREAMING_RECORDING_SECONDS = [60, 300, 900]
+PREPROCESSING_RECORDING_SECONDS = [60, 300, 900]
+BLOCK_STORAGE_RECORDING_SECONDS = 300
+BLOCK_STORAGE_READ_SECONDS = 1
+SHARED_MEMORY_STREAM_SECONDS = 600
+SHARED_MEMORY_STREAM_READER_COUNT = 2
+TEXT_LAYOUT_SENTENCE_COUNT = 10_000
+TEXT_LAYOUT_DISPLAY_SIZE = (1920, 1080)
+
+# Upper limits for timings and lower limits for throughputs, keyed by result id.
+DEFAULT_THRESHOLDS: dict[str, float] = {
+    "sequencer_get_next": 200,
+    "sequencer_event_manager_with_pause": 100,
+    "load_sentences": 50,
+    "corpus_open[sentence_count=100000]": 50,
+    "corpus_index_build[sentence_count=100000]": 500,
+    "streaming_save[recording_seconds=900]": 2e6,
+    "preprocess_data[recording_seconds=900]": 5e6,
+    "compressed_block_write[recording_seconds=300]": 2e6,
+    "compressed_block_read[recording_seconds=300]": 20,
+    "shared_memory_publish": 2e6,
+    "text_layout_lookup": 50,
+}
+
+
+@dataclass(frozen=True, kw_only=True)
+class BenchmarkResult:
+    name: str
+    parameters: dict[str, int]
+    unit: str
+    is_higher_better: bool
+    values: list[float]
+
+    @property
+    def id(self) -> str:
+        if not self.parameters:
+            return self.name
+
+        parameters = ",".join(
+            f"{key}={value}" for key, value in sorted(self.parameters.items())
+        )
+
+        return f"{self.name}[{parameters}]"
+
+    @property
+    def median(self) -> float:
+        return statistics.median(self.values)
+
+    def is_within(self, threshold: float | None) -> bool:
+        if threshold is None:
+            return True
+
+        return (
+            self.median >= threshold
+            if self.is_higher_better
+            else self.median <= threshold
+        )
+
+
+def measure(fun: Callable[[], object], repeat_count: int = REPEAT_COUNT) -> list[float]:
+    durations: list[float] = []
+    for _ in range(repeat_count):
+        started_at = time.perf_counter()
+        fun()
+        durations.append(time.perf_counter() - started_at)
+
+    return durations
+
+
+def build_sentence_sequencer(
+    *, gui: PygameGui, config: Config, logger: logging.Logger
+) -> SentenceSequencer:
+    sentences = load_sentences()
+
+    return SentenceSequencer(
+        gui=gui,
+        eeg_headset=MockEEGHeadset(logger=logger),
+        config=config,
+        session_plan=compile_session_plan(config=config, sentences=sentences, seed=0),
+        sentences=sentences,
+        block_index=0,
+        timing_recorder=TimingRecorder(capacity=2 * config.sentence_count + 2),
+        logger=logger,
+    )
+
+
+def benchmark_sequencer(logger: logging.Logger) -> list[BenchmarkResult]:
+    gui = PygameGui(
+        display_mode=WindowedDisplayMode(width=800, height=600),
+        window_title="benchmark",
+        logger=logger,
+    )
+    config = Config(
+        block_count=1,
+        sentence_count=SEQUENCER_SENTENCE_COUNT,
+        do_show_continue_screen=False,
+    )
+
+    get_next_micros: list[float] = []
+    for _ in range(REPEAT_COUNT):
+        sequencer = build_sentence_sequencer(gui=gui, config=config, logger=logger)
+        screen_count = 0
+        started_at = time.perf_counter()
+        try:
+            while True:
+                sequencer._get_next()  # pyright: ignore[reportPrivateUsage]
+                screen_count += 1
+        except StopIteration:
+            pass
+        get_next_micros.append((time.perf_counter() - started_at) / screen_count * 1e6)
+
+    sequencer = build_sentence_sequencer(gui=gui, config=config, logger=logger)
+    event_manager = next(
+        iter(
+            sequencer._fixation_cross_screen_event_managers.values()  # pyright: ignore[reportPrivateUsage]
+        )
+    )
+    event_manager_micros = [
+        duration / SEQUENCER_SENTENCE_COUNT * 1e6
+        for duration in measure(
+            lambda: [
+                sequencer._get_event_manager(  # pyright: ignore[reportPrivateUsage]
+                    event_manager
+                )
+                for _ in range(SEQUENCER_SENTENCE_COUNT)
+            ]
+        )
+    ]
+
+    return [
+        BenchmarkResult(
+            name="sequencer_get_next",
+            parameters={},
+            unit="us/screen",
+            is_higher_better=False,
+            values=get_next_micros,
+        ),
+        BenchmarkResult(
+            name="sequencer_event_manager_with_pause",
+            parameters={},
+            unit="us/screen",
+            is_higher_better=False,
+            values=event_manager_micros,
+        ),
+    ]
+
+
+def write_corpus(path: Path, sentence_count: int, rng: np.random.Generator) -> None:
+    words = ["zdanie", "sentence", "długie", "short", "experiment", "słowo", "word"]
+    word_counts = rng.integers(3, 20, size=sentence_count)
+
+    with open(path, "w", encoding="utf-8") as file:
+        for word_count in word_counts:
+            file.write(" ".join(rng.choice(words, size=word_count)) + "\n")
+
+
+def benchmark_sentence_loading(temp_dir_path: Path) -> list[BenchmarkResult]:
+    results = [
+        BenchmarkResult(
+            name="load_sentences",
+            parameters={},
+            unit="ms",
+            is_higher_better=False,
+            values=[duration * 1e3 for duration in measure(load_sentences)],
+        )
+    ]
+
+    rng = np.random.default_rng(0)
+    for sentence_count in CORPUS_SENTENCE_COUNTS:
+        text_path = temp_dir_path / f"corpus_{sentence_count}.txt"
+        write_corpus(text_path, sentence_count, rng)
+        index_path = get_corpus_index_path(text_path)
+
+        def open_without_index() -> None:
+            index_path.unlink(missing_ok=True)
+            SentenceCorpus(text_path=text_path).close()
+
+        index_build_durations = measure(open_without_index)
+        open_durations = measure(lambda: SentenceCorpus(text_path=text_path).close())
+
+        results += [
+            BenchmarkResult(
+                name="corpus_index_build",
+                parameters={"sentence_count": sentence_count},
+                unit="ms",
+                is_higher_better=False,
+                values=[duration * 1e3 for duration in index_build_durations],
+            ),
+            BenchmarkResult(
+                name="corpus_open",
+                parameters={"sentence_count": sentence_count},
+                unit="ms",
+                is_higher_better=False,
+                values=[duration * 1e3 for duration in open_durations],
+            ),
+        ]
+
+    return results
+
+
+def benchmark_mock_headset_save(
+    temp_dir_path: Path, logger: logging.Logger
+) -> list[BenchmarkResult]:
+    headset = MockEEGHeadset(logger=logger)
+
+    results: list[BenchmarkResult] = []
+    for recording_seconds in MOCK_HEADSET_RECORDING_SECONDS:
+        throughputs: list[float] = []
+        for repeat in range(REPEAT_COUNT):
+            path = temp_dir_path / f"mock_{recording_seconds}_{repeat}_raw.fif"
+
+            headset.start()
+            time.sleep(recording_seconds)
+            headset.annotate("benchmark")
+
+            started_at = time.perf_counter()
+            headset.stop_and_save_at_path(path)
+            duration = time.perf_counter() - started_at
+
+            throughputs.append(path.stat().st_size / duration)
+            path.unlink()
+
+        results.append(
+            BenchmarkResult(
+                name="mock_headset_save",
+                parameters={"recording_seconds": recording_seconds},
+                unit="bytes/s",
+                is_higher_better=True,
+                values=throughputs,
+            )
+        )
+
+    headset.disconnect()
+
+    return results
+
+
+def benchmark_streaming_save(
+    temp_dir_path: Path, logger: logging.Logger
+) -> list[BenchmarkResult]:
+    stream = VirtualEEGStream(logger=logger, seed=0)
+    headset = StreamingEEGHeadset(
+        stream=stream, logger=logger, segment_dir_path=temp_dir_path / ".segments"
+    )
+    headset.set_participant_id("benchmark")
+
+    results: list[BenchmarkResult] = []
+    for recording_seconds in STREAMING_RECORDING_SECONDS:
+        throughputs: list[float] = []
+        for repeat in range(REPEAT_COUNT):
+            path = temp_dir_path / f"streaming_{recording_seconds}_{repeat}_raw.fif"
+
+            headset.start()
+            stream.advance(recording_seconds * 1000)
+            headset.annotate("benchmark")
+
+            started_at = time.perf_counter()
+            headset.stop_and_save_at_path(path)
+            duration = time.perf_counter() - started_at
+
+            sample_count = recording_seconds * stream.sampling_frequency
+            throughputs.append(len(stream.channel_names) * sample_count / duration)
+            path.unlink()
+
+        results.append(
+            BenchmarkResult(
+                name="streaming_save",
+                parameters={"recording_seconds": recording_seconds},
+                unit="samples/s",
+                is_higher_better=True,
+                values=throughputs,
+            )
+        )
+
+    headset.disconnect()
+
+    return results
+
+
+def benchmark_preprocessing(temp_dir_path: Path) -> list[BenchmarkResult]:
+    rng = np.random.default_rng(0)
+    info = mne.create_info(CHANNELS, SAMPLING_FREQUENCY, ch_types="eeg")
+
+    results: list[BenchmarkResult] = []
+    for recording_seconds in PREPROCESSING_RECORDING_SECONDS:
+        sample_count = recording_seconds * SAMPLING_FREQUENCY
+        path = temp_dir_path / f"preprocessing_{recording_seconds}_raw.fif"
+        mne.io.RawArray(
+            rng.normal(scale=10, size=(len(CHANNELS), sample_count)), info
+        ).save(path)
+
+        durations = measure(lambda: preprocess_data(path, use_cache=False))
+
+        results.append(
+            BenchmarkResult(
+                name="preprocess_data",
+                parameters={"recording_seconds": recording_seconds},
+                unit="samples/s",
+                is_higher_better=True,
+                values=[
+                    len(CHANNELS) * sample_count / duration for duration in durations
+                ],
+            )
+        )
+        path.unlink()
+
+    return results
+
+
+def benchmark_block_storage(
+    temp_dir_path: Path, logger: logging.Logger
+) -> list[BenchmarkResult]:
+    stream = VirtualEEGStream(logger=logger, seed=0)
+    headset = StreamingEEGHeadset(
+        stream=stream, logger=logger, segment_dir_path=temp_dir_path / ".segments"
+    )
+    headset.set_participant_id("benchmark")
+    fif_path = temp_dir_path / "block_storage_raw.fif"
+    headset.start()
+    stream.advance(BLOCK_STORAGE_RECORDING_SECONDS * 1000)
+    headset.annotate("benchmark")
+    headset.stop_and_save_at_path(fif_path)
+    headset.disconnect()
+
+    raw = mne.io.read_raw_fif(fif_path, preload=True)
+    sample_count = len(raw.ch_names) * int(raw.n_times)
+    read_sample_count = int(BLOCK_STORAGE_READ_SECONDS * raw.info["sfreq"])
+    read_starts = np.random.default_rng(0).integers(
+        0, raw.n_times - read_sample_count, size=REPEAT_COUNT
+    )
+    parameters = {"recording_seconds": BLOCK_STORAGE_RECORDING_SECONDS}
+
+    compressed_path = temp_dir_path / "block_storage.eegz"
+    write_durations = measure(
+        lambda: write_compressed_block(
+            raw,
+            compressed_path,
+            chunk_seconds=COMPRESSED_STORAGE_CHUNK_SECONDS,
+            compression_level=COMPRESSED_STORAGE_COMPRESSION_LEVEL,
+        )
+    )
+    fif_save_durations = measure(
+        lambda: raw.save(fif_path, overwrite=True, verbose="error")
+    )
+
+    block = read_compressed_block(compressed_path)
+    read_millis: list[float] = []
+    fif_read_millis: list[float] = []
+    for start in read_starts:
+        started_at = time.perf_counter()
+        block.read_samples(start, start + read_sample_count)
+        read_millis.append((time.perf_counter() - started_at) * 1000)
+
+        started_at = time.perf_counter()
+        mne.io.read_raw_fif(fif_path, preload=False).get_data(
+            start=start, stop=start + read_sample_count
+        )
+        fif_read_millis.append((time.perf_counter() - started_at) * 1000)
+
+    compression_ratio = fif_path.stat().st_size / compressed_path.stat().st_size
+
+    return [
+        BenchmarkResult(
+            name="compressed_block_write",
+            parameters=parameters,
+            unit="samples/s",
+            is_higher_better=True,
+            values=[sample_count / duration for duration in write_durations],
+        ),
+        BenchmarkResult(
+            name="fif_save",
+            parameters=parameters,
+            unit="samples/s",
+            is_higher_better=True,
+            values=[sample_count / duration for duration in fif_save_durations],
+        ),
+        BenchmarkResult(
+            name="compressed_block_read",
+            parameters=parameters,
+            unit="ms/window",
+            is_higher_better=False,
+            values=read_millis,
+        ),
+        BenchmarkResult(
+            name="fif_read",
+            parameters=parameters,
+            unit="ms/window",
+            is_higher_better=False,
+            values=fif_read_millis,
+        ),
+        BenchmarkResult(
+            name="compressed_block_ratio",
+            parameters=parameters,
+            unit="x",
+            is_higher_better=True,
+            values=[compression_ratio],
+        ),
+    ]
+
+
+def benchmark_shared_memory_stream(logger: logging.Logger) -> list[BenchmarkResult]:
+    stream = MockEEGStream(logger=logger, seed=0)
+    headset = SharedMemoryPublishingHeadset(
+        headset=MockEEGHeadset(logger=logger),
+        stream=stream,
+        logger=logger,
+        name=f"benchmark_eeg_{os.getpid()}",
+    )
+    readers = [
+        SharedMemoryStreamReader(name=f"benchmark_eeg_{os.getpid()}")
+        for _ in range(SHARED_MEMORY_STREAM_READER_COUNT)
+    ]
+
+    # Chunks are generated up front, so only publishing is timed. Readers poll
+    # every second of samples, as a live consumer would.
+    chunk_count = (
+        SHARED_MEMORY_STREAM_SECONDS
+        * stream.sampling_frequency
+        // MOCK_EEG_CHUNK_SAMPLE_COUNT
+    )
+    read_interval_chunk_count = stream.sampling_frequency // MOCK_EEG_CHUNK_SAMPLE_COUNT
+    chunk = np.random.default_rng(0).standard_normal(
+        (len(stream.channel_names), MOCK_EEG_CHUNK_SAMPLE_COUNT), dtype=np.float32
+    )
+    sample_count = len(stream.channel_names) * chunk_count * MOCK_EEG_CHUNK_SAMPLE_COUNT
+
+    publish_durations: list[float] = []
+    read_durations: list[float] = []
+    lost_sample_count = 0
+    for _ in range(REPEAT_COUNT):
+        publish_duration = 0.0
+        read_duration = 0.0
+        for chunk_index in range(chunk_count):
+            started_at = time.perf_counter()
+            stream._publish(chunk)  # pyright: ignore[reportPrivateUsage]
+            publish_duration += time.perf_counter() - started_at
+
+            if (chunk_index + 1) % read_interval_chunk_count == 0:
+                headset.annotate("benchmark")
+                started_at = time.perf_counter()
+                for reader in readers:
+                    lost_sample_count += reader.read().lost_sample_count
+                    reader.read_annotations()
+                read_duration += time.perf_counter() - started_at
+
+        publish_durations.append(publish_duration)
+        read_durations.append(read_duration)
+
+    for reader in readers:
+        reader.close()
+    headset.disconnect()
+
+    if lost_sample_count > 0:
+        logger.warning(f"shared memory stream - readers lost {lost_sample_count}")
+
+    return [
+        BenchmarkResult(
+            name="shared_memory_publish",
+            parameters={},
+            unit="samples/s",
+            is_higher_better=True,
+            values=[sample_count / duration for duration in publish_durations],
+        ),
+        BenchmarkResult(
+            name="shared_memory_read",
+            parameters={"reader_count": SHARED_MEMORY_STREAM_READER_COUNT},
+            unit="samples/s",
+            is_higher_better=True,
+            values=[
+                SHARED_MEMORY_STREAM_READER_COUNT * sample_count / duration
+                for duration in read_durations
+            ],
+        ),
+    ]
+
+
+def benchmark_text_layout(temp_dir_path: Path) -> list[BenchmarkResult]:
+    rng = np.random.default_rng(0)
+    text_paths = [temp_dir_path / f"layout_{name}.txt" for name in ("pl", "en")]
+    for text_path in text_paths:
+        write_corpus(text_path, TEXT_LAYOUT_SENTENCE_COUNT, rng)
+    cache_dir_path = temp_dir_path / "text_layouts"
+    key = get_text_layout_key(TEXT_LAYOUT_DISPLAY_SIZE)
+
+    def open_sentences() -> Sentences:
+        polish_path, english_path = text_paths
+
+        return Sentences(
+            polish=SentenceCorpus(text_path=polish_path),
+            english=SentenceCorpus(text_path=english_path),
+        )
+
+    def build_layouts() -> None:
+        shutil.rmtree(cache_dir_path, ignore_errors=True)
+        load_sentence_layouts(sentences, key=key, cache_dir_path=cache_dir_path)
+
+    sentences = open_sentences()
+    build_durations = measure(build_layouts)
+
+    # After one sentence is added to the corpus, only it is laid out again.
+    update_durations: list[float] = []
+    for _ in range(REPEAT_COUNT):
+        with open(text_paths[0], "a", encoding="utf-8") as file:
+            file.write(f"zdanie {len(update_durations)}\n")
+        sentences = open_sentences()
+
+        started_at = time.perf_counter()
+        load_sentence_layouts(sentences, key=key, cache_dir_path=cache_dir_path)
+        update_durations.append(time.perf_counter() - started_at)
+
+    layouts = load_sentence_layouts(sentences, key=key, cache_dir_path=cache_dir_path)
+    lookup_durations = measure(
+        lambda: [
+            layouts.polish[sentence_id]
+            for sentence_id in range(TEXT_LAYOUT_SENTENCE_COUNT)
+        ]
+    )
+
+    parameters = {"sentence_count": TEXT_LAYOUT_SENTENCE_COUNT}
+
+    return [
+        BenchmarkResult(
+            name="text_layout_build",
+            parameters=parameters,
+            unit="ms",
+            is_higher_better=False,
+            values=[duration * 1e3 for duration in build_durations],
+        ),
+        BenchmarkResult(
+            name="text_layout_update",
+            parameters=parameters,
+            unit="ms",
+            is_higher_better=False,
+            values=[duration * 1e3 for duration in update_durations],
+        ),
+        BenchmarkResult(
+            name="text_layout_lookup",
+            parameters={},
+            unit="us",
+            is_higher_better=False,
+            values=[
+                duration * 1e6 / TEXT_LAYOUT_SENTENCE_COUNT
+                for duration in lookup_durations
+            ],
+        ),
+    ]
+
+
+def get_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=Path(__file__).parent,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def build_report(
+    results: list[BenchmarkResult], thresholds: dict[str, float]
+) -> dict[str, object]:
+    return {
+        "format_version": RESULT_FORMAT_VERSION,
+        "commit": get_commit(),
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "environment": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "mne": mne.__version__,
+            "platform": platform.platform(),
+            "processor": platform.processor(),
+        },
+        "repeat_count": REPEAT_COUNT,
+        "results": {
+            result.id: {
+                "name": result.name,
+                "parameters": result.parameters,
+                "unit": result.unit,
+                "direction": "higher" if result.is_higher_better else "lower",
+                "median": result.median,
+                "min": min(result.values),
+                "max": max(result.values),
+                "values": result.values,
+                "threshold": thresholds.get(result.id),
+                "passed": result.is_within(thresholds.get(result.id)),
+            }
+            for result in sorted(results, key=lambda result: result.id)
+        },
+    }
+
+
+def print_comparison(report: dict[str, object], baseline_path: Path) -> None:
+    with open(baseline_path, encoding="utf-8") as file:
+        baseline = json.load(file)
+
+    results: dict[str, dict[str, float]] = report["results"]  # type: ignore
+    for result_id, result in results.items():
+        baseline_result = baseline["results"].get(result_id)
+        if baseline_result is None:
+            continue
+
+        change = result["median"] / baseline_result["median"] - 1
+        print(f"{result_id}: {change:+.1%} against {baseline.get('commit')}")
+
+
+def main() -> bool:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--output", type=Path)
+    parser.add_argument(
+        "--thresholds",
+        type=Path,
+        help="JSON object of result id to threshold, merged over the defaults",
+    )
+    parser.add_argument("--baseline", type=Path, help="earlier result to compare to")
+    parser.add_argument(
+        "--skip-mock-headset",
+        action="store_true",
+        help="skip the real-time mock headset recording",
+    )
+    args = parser.parse_args()
+
+    thresholds = dict(DEFAULT_THRESHOLDS)
+    if args.thresholds is not None:
+        with open(args.thresholds, encoding="utf-8") as file:
+            thresholds |= json.load(file)
+
+    mne.set_log_level("ERROR")
+    logger = logging.getLogger("benchmark")
+    logger.setLevel(logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_dir_path = Path(temp_dir)
+
+        results = benchmark_sequencer(logger)
+        results += benchmark_sentence_loading(temp_dir_path)
+        if not args.skip_mock_headset:
+            results += benchmark_mock_headset_save(temp_dir_path, logger)
+        results += benchmark_streaming_save(temp_dir_path, logger)
+        results += benchmark_preprocessing(temp_dir_path)
+        results += benchmark_block_storage(temp_dir_path, logger)
+        results += benchmark_shared_memory_stream(logger)
+        results += benchmark_text_layout(temp_dir_path)
+
+    report = build_report(results, thresholds)
+
+    output_path = (
+        args.output or RESULTS_DIR_PATH / f"{report['commit'] or 'local'}.json"
+    )
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, "w", encoding="utf-8") as file:
+        json.dump(report, file, indent=2, sort_keys=True)
+
+    is_ok = True
+    for result in sorted(results, key=lambda result: result.id):
+        threshold = thresholds.get(result.id)
+        is_within = result.is_within(threshold)
+        is_ok &= is_within
+
+        limit = (
+            ""
+            if threshold is None
+            else f" ({'min' if result.is_higher_better else 'max'} {threshold:g})"
+        )
+        print(
+            f"{'ok  ' if is_within else 'FAIL'} {result.id}: "
+            f"{result.median:.4g} {result.unit}{limit}"
+        )
+    print(f"results written to {output_path}")
+
+    if args.baseline is not None:
+        print_comparison(report, args.baseline)
+
+    return is_ok
+
+
+if __name__ == "__main__":
+    raise SystemExit(0 if main() else 1)
@@ -0,0 +1,164 @@
+import argparse
+import json
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+from batch_qc import MEDIAN_ABSOLUTE_DEVIATION_TO_STD
+from epoching import METADATA_FILE_NAME, load_epochs
+from utils import CHANNELS
+
+# Epochs per second of 32 channels and 301 samples that reject_artifacts should
+# sustain, see benchmark_artifact_rejection.py.
+TARGET_THROUGHPUT_EPOCHS_PER_SECOND = 5_000
+
+REJECTION_FILE_NAME = "rejection.npz"
+CHUNK_SIZE_BYTES = 256 * 1024**2
+
+PEAK_TO_PEAK_THRESHOLD = 150e-6
+FLAT_PEAK_TO_PEAK_THRESHOLD = 1e-6
+VARIANCE_ROBUST_ZSCORE = 3.5
+HIGH_FREQUENCY_BAND = (30, 45)
+HIGH_FREQUENCY_POWER_ROBUST_ZSCORE = 3.5
+
+# A channel that is bad in this many epochs is marked bad as a whole, and its
+# epochs are no longer rejected because of it.
+BAD_CHANNEL_RATIO = 0.2
+
+CRITERIA = ["peak_to_peak", "flat", "variance", "high_frequency_power"]
+
+
+def get_chunk_epoch_count(epochs, chunk_size_bytes=CHUNK_SIZE_BYTES):
+    epoch_size_bytes = epochs[0].nbytes if len(epochs) > 0 else 1
+
+    return max(1, chunk_size_bytes // epoch_size_bytes)
+
+
+@lru_cache
+def get_band_basis(sample_count, sampling_frequency, l_freq, h_freq):
+    frequencies = np.fft.rfftfreq(sample_count, 1 / sampling_frequency)
+    band_bins = np.flatnonzero((frequencies >= l_freq) & (frequencies <= h_freq))
+
+    phase = 2 * np.pi * np.outer(np.arange(sample_count), band_bins) / sample_count
+    basis = np.concatenate([np.cos(phase), np.sin(phase)], axis=1).astype(np.float32)
+    basis.setflags(write=False)
+
+    return basis
+
+
+def compute_features(epochs, sampling_frequency, chunk_size_bytes=CHUNK_SIZE_BYTES):
+    epoch_count, channel_count, sample_count = epochs.shape
+    band_basis = get_band_basis(
+        sample_count, float(sampling_frequency), *map(float, HIGH_FREQUENCY_BAND)
+    )
+
+    features = {
+        name: np.empty((epoch_count, channel_count))
+        for name in ["peak_to_peak", "variance", "high_frequency_power"]
+    }
+
+    chunk_epoch_count = get_chunk_epoch_count(epochs, chunk_size_bytes)
+    for start in range(0, epoch_count, chunk_epoch_count):
+        chunk = np.asarray(epochs[start : start + chunk_epoch_count], np.float32)
+        stop = start + len(chunk)
+
+        features["peak_to_peak"][start:stop] = chunk.max(axis=-1) - chunk.min(axis=-1)
+
+        centered = chunk - chunk.mean(axis=-1, keepdims=True)
+        sum_of_squares = np.einsum("...i,...i->...", centered, centered)
+        features["variance"][start:stop] = sum_of_squares / sample_count
+
+        # Only the DFT bins inside the band are computed, as one matrix product,
+        # and the total power follows from Parseval's theorem, so no full FFT is
+        # needed. Band bins exclude DC and Nyquist and so count twice.
+        band_projection = centered @ band_basis
+        band_power = np.einsum("...i,...i->...", band_projection, band_projection)
+        features["high_frequency_power"][start:stop] = (
+            2
+            * band_power
+            / np.maximum(sample_count * sum_of_squares, np.finfo(np.float32).tiny)
+        )
+
+    return features
+
+
+def get_robust_zscore(values, axis=0):
+    log_values = np.log(np.maximum(values, np.finfo(float).tiny))
+    median = np.median(log_values, axis=axis, keepdims=True)
+    median_absolute_deviation = np.median(
+        np.abs(log_values - median), axis=axis, keepdims=True
+    )
+
+    return (log_values - median) / np.maximum(
+        MEDIAN_ABSOLUTE_DEVIATION_TO_STD * median_absolute_deviation,
+        np.finfo(float).eps,
+    )
+
+
+def find_artifacts(features):
+    # Variance and high-frequency power are compared per channel across epochs,
+    # since channels differ in their typical level.
+    bad_masks = {
+        "peak_to_peak": features["peak_to_peak"] > PEAK_TO_PEAK_THRESHOLD,
+        "flat": features["peak_to_peak"] < FLAT_PEAK_TO_PEAK_THRESHOLD,
+        "variance": get_robust_zscore(features["variance"]) > VARIANCE_ROBUST_ZSCORE,
+        "high_frequency_power": get_robust_zscore(features["high_frequency_power"])
+        > HIGH_FREQUENCY_POWER_ROBUST_ZSCORE,
+    }
+
+    is_bad = np.logical_or.reduce([bad_masks[criterion] for criterion in CRITERIA])
+    bad_ratios = is_bad.mean(axis=0) if len(is_bad) > 0 else np.zeros(is_bad.shape[1])
+    is_bad_channel = bad_ratios > BAD_CHANNEL_RATIO
+    is_rejected = (is_bad & ~is_bad_channel).any(axis=1)
+
+    return {
+        **{f"is_bad_{criterion}": mask for criterion, mask in bad_masks.items()},
+        "is_bad": is_bad,
+        "bad_ratios": bad_ratios,
+        "is_bad_channel": is_bad_channel,
+        "is_rejected": is_rejected,
+    }
+
+
+def reject_artifacts(epochs, sampling_frequency, chunk_size_bytes=CHUNK_SIZE_BYTES):
+    return find_artifacts(
+        compute_features(epochs, sampling_frequency, chunk_size_bytes)
+    )
+
+
+def run_artifact_rejection(epochs_output_path, chunk_size_bytes=CHUNK_SIZE_BYTES):
+    epochs, _ = load_epochs(epochs_output_path)
+    with open(epochs_output_path / METADATA_FILE_NAME, encoding="utf-8") as file:
+        sampling_frequency = json.load(file)["sampling_frequency"]
+
+    rejection = reject_artifacts(epochs, sampling_frequency, chunk_size_bytes)
+    np.savez(epochs_output_path / REJECTION_FILE_NAME, **rejection)
+
+    return rejection
+
+
+def load_rejection(epochs_output_path):
+    with np.load(epochs_output_path / REJECTION_FILE_NAME) as rejection:
+        return dict(rejection)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Find artifacts in epochs.")
+    parser.add_argument("epochs_output_path", type=Path)
+    parser.add_argument("--chunk-size-bytes", type=int, default=CHUNK_SIZE_BYTES)
+    args = parser.parse_args()
+
+    rejection = run_artifact_rejection(
+        args.epochs_output_path, chunk_size_bytes=args.chunk_size_bytes
+    )
+
+    print(
+        f"rejected {rejection['is_rejected'].sum()} of "
+        f"{len(rejection['is_rejected'])} epochs"
+    )
+    for channel, bad_ratio, is_bad_channel in zip(
+        CHANNELS, rejection["bad_ratios"], rejection["is_bad_channel"]
+    ):
+        print(
+            f"{channel}: {bad_ratio:.1%} bad{' - bad channel' if is_bad_channel else ''}"
+        )
@@ -0,0 +1,158 @@
+import argparse
+import csv
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from pathlib import Path
+
+import mne
+import numpy as np
+from utils import CHANNELS, DATA_PATH, filter_data, load_data
+
+QC_OUTPUT_PATH = Path.cwd().parent / "qc"
+BLOCK_FILE_PATTERN = "*/*_raw.fif"
+COMPRESSED_BLOCK_FILE_PATTERN = "*/*_raw.eegz"
+
+WORKER_MEMORY_LIMIT_BYTES = 2 * 1024**3
+
+LINE_NOISE_FREQUENCY = 50
+LINE_NOISE_BANDWIDTH = 1
+FLAT_CHANNEL_VARIANCE = 1e-14
+NOISY_CHANNEL_ROBUST_ZSCORE = 3.5
+MEDIAN_ABSOLUTE_DEVIATION_TO_STD = 1.4826
+
+SUMMARY_COLUMNS = [
+    "participant_id",
+    "block",
+    "channel",
+    "variance",
+    "is_flat",
+    "is_noisy",
+    "line_noise_power",
+    "error",
+]
+
+
+def find_block_files(data_path=DATA_PATH):
+    # Compressed blocks are not read here, they have to be exported to FIF first.
+    for compressed_block_path in sorted(data_path.glob(COMPRESSED_BLOCK_FILE_PATTERN)):
+        if not compressed_block_path.with_suffix(".fif").exists():
+            print(
+                f"{compressed_block_path} skipped - export it with "
+                f"python -m src.compressed_block {compressed_block_path.parent}"
+            )
+
+    return sorted(data_path.glob(BLOCK_FILE_PATTERN))
+
+
+def check_block(file_to_check):
+    raw_data = load_data(file_to_check)
+
+    line_noise_power = (
+        raw_data.compute_psd(
+            fmin=LINE_NOISE_FREQUENCY - LINE_NOISE_BANDWIDTH,
+            fmax=LINE_NOISE_FREQUENCY + LINE_NOISE_BANDWIDTH,
+        )
+        .get_data()
+        .mean(axis=1)
+    )
+
+    variance = filter_data(raw_data).get_data().var(axis=1)
+
+    log_variance = np.log(np.maximum(variance, FLAT_CHANNEL_VARIANCE))
+    median_absolute_deviation = np.median(
+        np.abs(log_variance - np.median(log_variance))
+    )
+    robust_zscore = (log_variance - np.median(log_variance)) / (
+        MEDIAN_ABSOLUTE_DEVIATION_TO_STD * median_absolute_deviation
+        or np.finfo(float).eps
+    )
+
+    return [
+        {
+            "participant_id": file_to_check.parent.name,
+            "block": file_to_check.name.removesuffix("_raw.fif"),
+            "channel": channel,
+            "variance": variance[idx],
+            "is_flat": variance[idx] < FLAT_CHANNEL_VARIANCE,
+            "is_noisy": robust_zscore[idx] > NOISY_CHANNEL_ROBUST_ZSCORE,
+            "line_noise_power": line_noise_power[idx],
+            "error": "",
+        }
+        for idx, channel in enumerate(CHANNELS)
+    ]
+
+
+def run_batch_qc(
+    data_path=DATA_PATH,
+    output_path=QC_OUTPUT_PATH,
+    max_workers=None,
+    worker_memory_limit_bytes=WORKER_MEMORY_LIMIT_BYTES,
+):
+    files_to_check = find_block_files(data_path)
+    output_path.mkdir(parents=True, exist_ok=True)
+    summary_path = output_path / f"qc_{datetime.now():%Y%m%d_%H%M%S}.csv"
+
+    with (
+        ProcessPoolExecutor(
+            max_workers=max_workers or os.cpu_count(),
+            initializer=_init_worker,
+            initargs=(worker_memory_limit_bytes,),
+        ) as executor,
+        open(summary_path, "w", newline="", encoding="utf-8") as summary_file,
+    ):
+        writer = csv.DictWriter(summary_file, fieldnames=SUMMARY_COLUMNS)
+        writer.writeheader()
+
+        futures = {
+            executor.submit(check_block, file_to_check): file_to_check
+            for file_to_check in files_to_check
+        }
+        for done_count, future in enumerate(as_completed(futures), start=1):
+            file_to_check = futures[future]
+            try:
+                writer.writerows(future.result())
+                status = "ok"
+            except Exception as error:
+                writer.writerow(
+                    {
+                        "participant_id": file_to_check.parent.name,
+                        "block": file_to_check.name.removesuffix("_raw.fif"),
+                        "error": repr(error),
+                    }
+                )
+                status = f"failed - {error!r}"
+
+            print(f"[{done_count}/{len(futures)}] {file_to_check} - {status}")
+
+    return summary_path
+
+
+def _init_worker(memory_limit_bytes):
+    mne.set_log_level("ERROR")
+
+    try:
+        import resource
+    except ImportError:
+        return
+
+    resource.setrlimit(resource.RLIMIT_AS, (memory_limit_bytes, memory_limit_bytes))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check every recorded block.")
+    parser.add_argument("--data-path", type=Path, default=DATA_PATH)
+    parser.add_argument("--output-path", type=Path, default=QC_OUTPUT_PATH)
+    parser.add_argument("--max-workers", type=int, default=None)
+    parser.add_argument(
+        "--worker-memory-limit-bytes", type=int, default=WORKER_MEMORY_LIMIT_BYTES
+    )
+    args = parser.parse_args()
+
+    summary_path = run_batch_qc(
+        data_path=args.data_path,
+        output_path=args.output_path,
+        max_workers=args.max_workers,
+        worker_memory_limit_bytes=args.worker_memory_limit_bytes,
+    )
+    print(f"summary written to {summary_path}")
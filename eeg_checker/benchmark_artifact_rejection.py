@@ -0,0 +1,113 @@
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+from artifact_rejection import (
+    CHUNK_SIZE_BYTES,
+    HIGH_FREQUENCY_BAND,
+    TARGET_THROUGHPUT_EPOCHS_PER_SECOND,
+    compute_features,
+    reject_artifacts,
+)
+from utils import CHANNELS, SAMPLING_FREQUENCY
+
+EPOCH_COUNTS = [1_000, 10_000, 50_000]
+EPOCH_SAMPLE_COUNT = 301
+ARTIFACT_RATIO = 0.05
+REFERENCE_EPOCH_COUNT = 200
+MAX_RELATIVE_ERROR = 1e-4
+REPEAT_COUNT = 3
+
+
+def generate_epochs(path, epoch_count, rng):
+    epochs = np.lib.format.open_memmap(
+        path,
+        mode="w+",
+        dtype=np.float32,
+        shape=(epoch_count, len(CHANNELS), EPOCH_SAMPLE_COUNT),
+    )
+
+    chunk_epoch_count = CHUNK_SIZE_BYTES // epochs[0].nbytes
+    for start in range(0, epoch_count, chunk_epoch_count):
+        chunk = epochs[start : start + chunk_epoch_count]
+        chunk[:] = rng.normal(scale=1e-5, size=chunk.shape)
+
+        artifact_count = int(len(chunk) * ARTIFACT_RATIO)
+        chunk[:artifact_count, 0] *= 50
+        chunk[artifact_count : 2 * artifact_count, 1] = 0
+
+    epochs.flush()
+
+    return np.load(path, mmap_mode="r")
+
+
+def compute_features_per_epoch(epochs, sampling_frequency):
+    frequencies = np.abs(np.fft.fftfreq(epochs.shape[-1], 1 / sampling_frequency))
+    is_in_band = (frequencies >= HIGH_FREQUENCY_BAND[0]) & (
+        frequencies <= HIGH_FREQUENCY_BAND[1]
+    )
+
+    features = {
+        name: np.empty(epochs.shape[:2])
+        for name in ["peak_to_peak", "variance", "high_frequency_power"]
+    }
+    for epoch_idx, epoch in enumerate(epochs):
+        for channel_idx, channel in enumerate(np.asarray(epoch, dtype=np.float64)):
+            power = np.abs(np.fft.fft(channel)) ** 2
+            features["peak_to_peak"][epoch_idx, channel_idx] = (
+                channel.max() - channel.min()
+            )
+            features["variance"][epoch_idx, channel_idx] = channel.var()
+            features["high_frequency_power"][epoch_idx, channel_idx] = power[
+                is_in_band
+            ].sum() / max(power[1:].sum(), np.finfo(np.float32).tiny)
+
+    return features
+
+
+def main():
+    rng = np.random.default_rng(0)
+
+    is_ok = True
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for epoch_count in EPOCH_COUNTS:
+            epochs = generate_epochs(
+                Path(temp_dir) / f"epochs_{epoch_count}.npy", epoch_count, rng
+            )
+
+            durations = []
+            for _ in range(REPEAT_COUNT):
+                started_at = time.perf_counter()
+                rejection = reject_artifacts(epochs, SAMPLING_FREQUENCY)
+                durations.append(time.perf_counter() - started_at)
+            throughput = epoch_count / min(durations)
+
+            reference_epochs = epochs[:REFERENCE_EPOCH_COUNT]
+            expected = compute_features_per_epoch(reference_epochs, SAMPLING_FREQUENCY)
+            actual = compute_features(reference_epochs, SAMPLING_FREQUENCY)
+            relative_error = max(
+                np.abs(actual[name] - expected[name]).max()
+                / np.abs(expected[name]).max()
+                for name in expected
+            )
+
+            is_ok &= relative_error <= MAX_RELATIVE_ERROR
+            is_ok &= throughput >= TARGET_THROUGHPUT_EPOCHS_PER_SECOND
+
+            print(
+                f"{epoch_count} epochs: {throughput:.0f} epochs/s "
+                f"(target {TARGET_THROUGHPUT_EPOCHS_PER_SECOND}), "
+                f"rejected {rejection['is_rejected'].mean():.1%}, "
+                f"bad channels {rejection['is_bad_channel'].sum()}, "
+                f"max relative error {relative_error:.2e} "
+                f"(tolerance {MAX_RELATIVE_ERROR:.0e})"
+            )
+
+            del epochs
+
+    return is_ok
+
+
+if __name__ == "__main__":
+    raise SystemExit(0 if main() else 1)
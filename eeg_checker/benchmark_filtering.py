@@ -0,0 +1,92 @@
+import time
+
+import mne
+import numpy as np
+from filtering import TARGET_THROUGHPUT_SAMPLES_PER_SECOND, filter_arrays
+from utils import (
+    BANDSTOP_FREQUENCY,
+    CHANNELS,
+    HIGHPASS_FREQUENCY,
+    LOWPASS_FREQUENCY,
+    SAMPLING_FREQUENCY,
+    filter_data_with_mne,
+)
+
+BLOCK_DURATIONS_SECONDS = [60, 300, 900]
+BLOCK_COUNT = 6
+MAX_RELATIVE_ERROR = 1e-6
+REPEAT_COUNT = 3
+
+
+def generate_blocks(duration_seconds, block_count, rng):
+    sample_count = int(duration_seconds * SAMPLING_FREQUENCY)
+    time_seconds = np.arange(sample_count) / SAMPLING_FREQUENCY
+
+    return [
+        rng.normal(scale=1e-5, size=(len(CHANNELS), sample_count))
+        + 5e-6 * np.sin(2 * np.pi * 50 * time_seconds)
+        for _ in range(block_count)
+    ]
+
+
+def filter_blocks_with_mne(blocks):
+    info = mne.create_info(CHANNELS, SAMPLING_FREQUENCY, ch_types="eeg")
+
+    return [
+        filter_data_with_mne(mne.io.RawArray(block, info, copy="data")).get_data()
+        for block in blocks
+    ]
+
+
+def filter_blocks(blocks):
+    return filter_arrays(
+        blocks,
+        SAMPLING_FREQUENCY,
+        LOWPASS_FREQUENCY,
+        HIGHPASS_FREQUENCY,
+        BANDSTOP_FREQUENCY,
+    )
+
+
+def measure(fun, blocks):
+    durations = []
+    for _ in range(REPEAT_COUNT):
+        started_at = time.perf_counter()
+        filtered = fun(blocks)
+        durations.append(time.perf_counter() - started_at)
+
+    return filtered, sum(block.size for block in blocks) / min(durations)
+
+
+def main():
+    mne.set_log_level("ERROR")
+    rng = np.random.default_rng(0)
+
+    is_ok = True
+    for duration_seconds in BLOCK_DURATIONS_SECONDS:
+        blocks = generate_blocks(duration_seconds, BLOCK_COUNT, rng)
+
+        expected, mne_throughput = measure(filter_blocks_with_mne, blocks)
+        actual, throughput = measure(filter_blocks, blocks)
+
+        relative_error = max(
+            np.abs(actual_block - expected_block).max() / np.abs(expected_block).max()
+            for actual_block, expected_block in zip(actual, expected)
+        )
+        is_ok &= relative_error <= MAX_RELATIVE_ERROR
+        is_ok &= throughput >= TARGET_THROUGHPUT_SAMPLES_PER_SECOND
+
+        print(
+            f"{BLOCK_COUNT} x {duration_seconds} s: "
+            f"mne {mne_throughput / 1e6:.1f} M samples/s, "
+            f"batched {throughput / 1e6:.1f} M samples/s "
+            f"(target {TARGET_THROUGHPUT_SAMPLES_PER_SECOND / 1e6:.0f}), "
+            f"max relative error {relative_error:.2e} "
+            f"(tolerance {MAX_RELATIVE_ERROR:.0e})"
+        )
+
+    return is_ok
+
+
+if __name__ == "__main__":
+    raise SystemExit(0 if main() else 1)
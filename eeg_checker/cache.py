@@ -0,0 +1,158 @@
+import hashlib
+import json
+import os
+import shutil
+import uuid
+from pathlib import Path
+
+import mne
+import numpy as np
+
+CACHE_PATH = Path.cwd().parent / ".eeg_checker_cache"
+CACHE_SIZE_LIMIT_BYTES = 5 * 1024**3
+HASH_CHUNK_SIZE_BYTES = 1024**2
+CACHE_FORMAT_VERSION = 2
+
+DATA_FILE_NAME = "data.npy"
+INFO_FILE_NAME = "info.fif"
+ANNOTATIONS_FILE_NAME = "annotations-annot.fif"
+METADATA_FILE_NAME = "metadata.json"
+FILE_DIGESTS_DIR_NAME = ".file_digests"
+
+
+def hash_file(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        while chunk := file.read(HASH_CHUNK_SIZE_BYTES):
+            digest.update(chunk)
+
+    return digest.hexdigest()
+
+
+def get_file_digest(path, cache_path=CACHE_PATH):
+    # Hashing a whole recording takes longer than loading it from the cache, so
+    # its digest is kept and only computed again once its size or modification
+    # time changes.
+    stat = os.stat(path)
+    path_digest = hashlib.sha256(str(Path(path).resolve()).encode()).hexdigest()
+    file_digest_path = cache_path / FILE_DIGESTS_DIR_NAME / f"{path_digest}.json"
+
+    try:
+        with open(file_digest_path, encoding="utf-8") as file:
+            file_digest = json.load(file)
+        if (file_digest["size"], file_digest["mtime_ns"]) == (
+            stat.st_size,
+            stat.st_mtime_ns,
+        ):
+            return file_digest["digest"]
+    except (OSError, ValueError, KeyError):
+        pass
+
+    digest = hash_file(path)
+    _write_json_atomically(
+        file_digest_path,
+        {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "digest": digest},
+    )
+
+    return digest
+
+
+def get_cache_key(path, parameters, cache_path=CACHE_PATH):
+    encoded_parameters = json.dumps(parameters, sort_keys=True, default=str)
+
+    digest = hashlib.sha256()
+    digest.update(str(CACHE_FORMAT_VERSION).encode())
+    digest.update(get_file_digest(path, cache_path).encode())
+    digest.update(encoded_parameters.encode())
+
+    return digest.hexdigest()
+
+
+def load_or_compute(
+    path,
+    parameters,
+    compute,
+    cache_path=CACHE_PATH,
+    size_limit_bytes=CACHE_SIZE_LIMIT_BYTES,
+):
+    entry_path = cache_path / get_cache_key(path, parameters, cache_path)
+
+    if entry_path.is_dir():
+        os.utime(entry_path)
+        return _load_entry(entry_path)
+
+    raw_data = compute()
+    _store_entry(entry_path, raw_data)
+    _evict_least_recently_used(cache_path, size_limit_bytes)
+
+    return raw_data
+
+
+def clear_cache(cache_path=CACHE_PATH):
+    shutil.rmtree(cache_path, ignore_errors=True)
+
+
+def _load_entry(entry_path):
+    data = np.load(entry_path / DATA_FILE_NAME, mmap_mode="c")
+    info = mne.io.read_info(entry_path / INFO_FILE_NAME, verbose="error")
+    with open(entry_path / METADATA_FILE_NAME, encoding="utf-8") as file:
+        metadata = json.load(file)
+
+    # A cropped window keeps its first sample, so that annotations counted from
+    # the measurement date still fall inside it.
+    raw_data = mne.io.RawArray(
+        data,
+        info,
+        first_samp=metadata["first_samp"],
+        copy="info",
+        verbose="error",
+    )
+    raw_data.set_annotations(mne.read_annotations(entry_path / ANNOTATIONS_FILE_NAME))
+
+    return raw_data
+
+
+def _store_entry(entry_path, raw_data):
+    temporary_path = entry_path.with_name(f".{entry_path.name}.{uuid.uuid4().hex}")
+    temporary_path.mkdir(parents=True)
+
+    np.save(temporary_path / DATA_FILE_NAME, raw_data.get_data())
+    mne.io.write_info(temporary_path / INFO_FILE_NAME, raw_data.info)
+    with open(temporary_path / METADATA_FILE_NAME, "w", encoding="utf-8") as file:
+        json.dump({"first_samp": int(raw_data.first_samp)}, file)
+    raw_data.annotations.save(
+        temporary_path / ANNOTATIONS_FILE_NAME, overwrite=True, verbose="error"
+    )
+
+    try:
+        temporary_path.rename(entry_path)
+    except OSError:
+        shutil.rmtree(temporary_path, ignore_errors=True)
+
+
+def _write_json_atomically(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary_path = path.with_name(f".{path.name}.{uuid.uuid4().hex}")
+    with open(temporary_path, "w", encoding="utf-8") as file:
+        json.dump(data, file)
+    temporary_path.replace(path)
+
+
+def _evict_least_recently_used(cache_path, size_limit_bytes):
+    entries = [
+        (entry.stat().st_mtime, _get_size(entry), entry)
+        for entry in cache_path.iterdir()
+        if entry.is_dir() and not entry.name.startswith(".")
+    ]
+    total_size = sum(size for _, size, _ in entries)
+
+    for _, size, entry in sorted(entries):
+        if total_size <= size_limit_bytes:
+            break
+
+        shutil.rmtree(entry, ignore_errors=True)
+        total_size -= size
+
+
+def _get_size(entry_path):
+    return sum(file.stat().st_size for file in entry_path.iterdir())
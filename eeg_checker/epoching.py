@@ -0,0 +1,294 @@
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from pathlib import Path
+
+import mne
+import numpy as np
+from batch_qc import find_block_files
+from utils import (
+    CHANNELS,
+    DATA_PATH,
+    get_preprocessing_parameters,
+    preprocess_data,
+    read_data,
+)
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.sentence_corpus import SentenceCorpus  # noqa: E402
+
+EPOCHS_OUTPUT_PATH = Path.cwd().parent / "epochs"
+ASSETS_PATH = Path(__file__).parent.parent / "src" / "assets"
+
+EPOCH_TMIN = -0.2
+EPOCH_TMAX = 1.0
+
+SENTENCE_START_ANNOTATION = "SENTENCE_START"
+SENTENCE_END_ANNOTATION = "SENTENCE_END"
+PAUSE_START_ANNOTATION = "PAUSE_START"
+PAUSE_END_ANNOTATION = "PAUSE_END"
+
+# Blocks alternate between the languages, starting with Polish, see
+# src/session_plan.py. Used for recordings made before session plans were saved.
+LANGUAGES = ["pl", "en"]
+SESSION_PLAN_FILE_NAME = "session_plan.npz"
+
+EPOCHS_FILE_NAME = "epochs.npy"
+INDEX_FILE_NAME = "index.npy"
+METADATA_FILE_NAME = "metadata.json"
+
+
+def find_epoch_windows(raw_data, tmin=EPOCH_TMIN, tmax=EPOCH_TMAX):
+    sampling_frequency = raw_data.info["sfreq"]
+    start_offset = int(round(tmin * sampling_frequency))
+    stop_offset = int(round(tmax * sampling_frequency)) + 1
+
+    annotations = raw_data.annotations
+    onsets = raw_data.time_as_index(
+        annotations.onset, use_rounding=True, origin=annotations.orig_time
+    )
+    descriptions = annotations.description
+
+    pause_starts = onsets[descriptions == PAUSE_START_ANNOTATION]
+    pause_ends = onsets[descriptions == PAUSE_END_ANNOTATION]
+    if len(pause_ends) < len(pause_starts):
+        pause_ends = np.append(pause_ends, raw_data.n_times)
+
+    # A sentence interrupted by a pause is not shown again, so only sentences
+    # followed directly by their end annotation are completed trials.
+    is_sentence_start = descriptions == SENTENCE_START_ANNOTATION
+    is_completed = is_sentence_start & (
+        np.append(descriptions[1:], "") == SENTENCE_END_ANNOTATION
+    )
+    trial_onsets = onsets[is_completed]
+    trials = np.arange(len(trial_onsets))
+
+    starts = trial_onsets + start_offset
+    stops = trial_onsets + stop_offset
+    overlaps_pause = (
+        (starts[:, None] < pause_ends[None, :])
+        & (stops[:, None] > pause_starts[None, :])
+    ).any(axis=1)
+    is_kept = ~overlaps_pause & (starts >= 0) & (stops <= raw_data.n_times)
+
+    return trials[is_kept], starts[is_kept], stop_offset - start_offset
+
+
+def load_block_trials(participant_path, block):
+    plan_path = participant_path / SESSION_PLAN_FILE_NAME
+    if not plan_path.is_file():
+        return None
+
+    with np.load(plan_path) as plan:
+        trials = plan["trials"]
+
+    block_trials = trials[trials["block"] == block]
+    # Trials cut off by a pause are marked in plans saved since spare trials were
+    # added.
+    if "was_paused" in block_trials.dtype.names:
+        block_trials = block_trials[~block_trials["was_paused"]]
+
+    return block_trials
+
+
+def plan_block(file_to_check, corpora):
+    raw_data = read_data(file_to_check)
+    trials, starts, sample_count = find_epoch_windows(raw_data)
+
+    block = int(file_to_check.name.removesuffix("_raw.fif"))
+    block_trials = load_block_trials(file_to_check.parent, block)
+
+    if block_trials is None:
+        language = LANGUAGES[block % len(LANGUAGES)]
+        languages = [language] * len(trials)
+        sentence_ids = [-1] * len(trials)
+        texts = [""] * len(trials)
+    else:
+        is_planned = trials < len(block_trials)
+        trials, starts = trials[is_planned], starts[is_planned]
+        planned = block_trials[trials]
+        # Numbered as in the plan, which counts the trials skipped for a pause.
+        trials = planned["trial"]
+        languages = [LANGUAGES[language] for language in planned["language"]]
+        sentence_ids = planned["sentence_id"].tolist()
+        texts = [
+            corpora[language][sentence_id]
+            for language, sentence_id in zip(languages, sentence_ids)
+        ]
+
+    return {
+        "participant_id": file_to_check.parent.name,
+        "block": block,
+        "trials": trials,
+        "starts": starts,
+        "sample_count": sample_count,
+        "sampling_frequency": raw_data.info["sfreq"],
+        "languages": languages,
+        "sentence_ids": sentence_ids,
+        "texts": texts,
+    }
+
+
+def build_index(block_plans):
+    epoch_count = sum(len(block_plan["trials"]) for block_plan in block_plans)
+    max_text_length = max(
+        (len(text) for block_plan in block_plans for text in block_plan["texts"]),
+        default=1,
+    )
+    max_participant_id_length = max(
+        (len(block_plan["participant_id"]) for block_plan in block_plans), default=1
+    )
+
+    index = np.zeros(
+        epoch_count,
+        dtype=[
+            ("participant_id", f"U{max_participant_id_length}"),
+            ("block", np.int16),
+            ("trial", np.int32),
+            ("language", "U2"),
+            ("sentence_id", np.int32),
+            ("onset_sample", np.int64),
+            ("text", f"U{max_text_length}"),
+        ],
+    )
+
+    offset = 0
+    for block_plan in block_plans:
+        stop = offset + len(block_plan["trials"])
+        index["participant_id"][offset:stop] = block_plan["participant_id"]
+        index["block"][offset:stop] = block_plan["block"]
+        index["trial"][offset:stop] = block_plan["trials"]
+        index["language"][offset:stop] = block_plan["languages"]
+        index["sentence_id"][offset:stop] = block_plan["sentence_ids"]
+        index["onset_sample"][offset:stop] = block_plan["starts"] - int(
+            round(EPOCH_TMIN * block_plan["sampling_frequency"])
+        )
+        index["text"][offset:stop] = block_plan["texts"]
+
+        block_plan["offset"] = offset
+        offset = stop
+
+    return index
+
+
+def extract_block_epochs(file_to_check, epochs_path, offset, starts, use_cache):
+    raw_data = preprocess_data(file_to_check, use_cache=use_cache)
+    data = raw_data.get_data()
+
+    epochs = np.load(epochs_path, mmap_mode="r+")
+    sample_count = epochs.shape[2]
+    windows = starts[:, None] + np.arange(sample_count)[None, :]
+    epochs[offset : offset + len(starts)] = data[:, windows].transpose(1, 0, 2)
+    epochs.flush()
+
+    return len(starts)
+
+
+def run_epoching(
+    data_path=DATA_PATH,
+    output_path=EPOCHS_OUTPUT_PATH,
+    max_workers=None,
+    use_cache=True,
+):
+    files_to_check = find_block_files(data_path)
+    if not files_to_check:
+        raise ValueError(f"No block files in {data_path}")
+
+    corpora = {
+        language: SentenceCorpus(text_path=ASSETS_PATH / f"{language}.txt")
+        for language in LANGUAGES
+    }
+
+    block_plans = [
+        plan_block(file_to_check, corpora) for file_to_check in files_to_check
+    ]
+    sampling_frequencies = {
+        block_plan["sampling_frequency"] for block_plan in block_plans
+    }
+    if len(sampling_frequencies) > 1:
+        raise ValueError(f"Mixed sampling frequencies: {sampling_frequencies}")
+
+    index = build_index(block_plans)
+    sampling_frequency = block_plans[0]["sampling_frequency"]
+    sample_count = block_plans[0]["sample_count"]
+
+    epochs_output_path = output_path / f"epochs_{datetime.now():%Y%m%d_%H%M%S}"
+    epochs_output_path.mkdir(parents=True)
+    epochs_path = epochs_output_path / EPOCHS_FILE_NAME
+
+    # The array is allocated once up front and every worker writes its own
+    # slice of it in place, so no epoch data passes between processes.
+    np.lib.format.open_memmap(
+        epochs_path,
+        mode="w+",
+        dtype=np.float32,
+        shape=(len(index), len(CHANNELS), sample_count),
+    ).flush()
+    np.save(epochs_output_path / INDEX_FILE_NAME, index)
+
+    with ProcessPoolExecutor(
+        max_workers=max_workers or os.cpu_count(), initializer=_init_worker
+    ) as executor:
+        futures = {
+            executor.submit(
+                extract_block_epochs,
+                file_to_check,
+                epochs_path,
+                block_plan["offset"],
+                block_plan["starts"],
+                use_cache,
+            ): file_to_check
+            for file_to_check, block_plan in zip(files_to_check, block_plans)
+            if len(block_plan["starts"]) > 0
+        }
+        for done_count, future in enumerate(as_completed(futures), start=1):
+            epoch_count = future.result()
+            print(f"[{done_count}/{len(futures)}] {futures[future]} - {epoch_count}")
+
+    with open(epochs_output_path / METADATA_FILE_NAME, "w", encoding="utf-8") as file:
+        json.dump(
+            {
+                **get_preprocessing_parameters(),
+                "sampling_frequency": sampling_frequency,
+                "tmin": EPOCH_TMIN,
+                "tmax": EPOCH_TMAX,
+                "shape": [len(index), len(CHANNELS), sample_count],
+                "unit": "V",
+            },
+            file,
+            indent=2,
+        )
+
+    return epochs_output_path
+
+
+def load_epochs(epochs_output_path):
+    return (
+        np.load(epochs_output_path / EPOCHS_FILE_NAME, mmap_mode="r"),
+        np.load(epochs_output_path / INDEX_FILE_NAME),
+    )
+
+
+def _init_worker():
+    mne.set_log_level("ERROR")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Extract sentence epochs.")
+    parser.add_argument("--data-path", type=Path, default=DATA_PATH)
+    parser.add_argument("--output-path", type=Path, default=EPOCHS_OUTPUT_PATH)
+    parser.add_argument("--max-workers", type=int, default=None)
+    parser.add_argument("--no-cache", action="store_true")
+    args = parser.parse_args()
+
+    epochs_output_path = run_epoching(
+        data_path=args.data_path,
+        output_path=args.output_path,
+        max_workers=args.max_workers,
+        use_cache=not args.no_cache,
+    )
+    print(f"epochs written to {epochs_output_path}")
@@ -0,0 +1,244 @@
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import mne
+import numpy as np
+import scipy.stats
+from artifact_rejection import reject_artifacts
+from batch_qc import find_block_files
+from epoching import (
+    EPOCH_TMAX,
+    EPOCH_TMIN,
+    LANGUAGES,
+    find_epoch_windows,
+    load_block_trials,
+)
+from utils import CHANNELS, DATA_PATH, preprocess_data
+
+ERP_OUTPUT_PATH = Path.cwd().parent / "erp"
+STATE_FILE_NAME = "erp_state.npz"
+RESULTS_FILE_NAME = "erp.npz"
+
+CONFIDENCE_LEVEL = 0.95
+
+
+def get_empty_state(sample_count, sampling_frequency):
+    return {
+        "participant_ids": np.array([], dtype=str),
+        "counts": np.zeros(len(LANGUAGES), dtype=np.int64),
+        "means": np.zeros((len(LANGUAGES), len(CHANNELS), sample_count)),
+        "sums_of_squares": np.zeros((len(LANGUAGES), len(CHANNELS), sample_count)),
+        "epoch_counts": np.zeros(len(LANGUAGES), dtype=np.int64),
+        "sampling_frequency": np.float64(sampling_frequency),
+        "tmin": np.float64(EPOCH_TMIN),
+        "tmax": np.float64(EPOCH_TMAX),
+    }
+
+
+def load_state(state_path):
+    if not state_path.is_file():
+        return None
+
+    with np.load(state_path) as state:
+        return dict(state)
+
+
+def save_state(state, state_path):
+    state_path.parent.mkdir(parents=True, exist_ok=True)
+
+    temporary_path = state_path.with_name(f".{state_path.name}")
+    with open(temporary_path, "wb") as file:
+        np.savez(file, **state)
+    temporary_path.replace(state_path)
+
+
+def average_participant(participant_path, use_cache=True, do_reject_artifacts=True):
+    sums = None
+    epoch_counts = np.zeros(len(LANGUAGES), dtype=np.int64)
+    sampling_frequency = None
+
+    for file_to_check in sorted(participant_path.glob("*_raw.fif")):
+        raw_data = preprocess_data(file_to_check, use_cache=use_cache)
+        trials, starts, sample_count = find_epoch_windows(raw_data)
+        sampling_frequency = raw_data.info["sfreq"]
+
+        block = int(file_to_check.name.removesuffix("_raw.fif"))
+        block_trials = load_block_trials(participant_path, block)
+        if block_trials is None:
+            languages = np.full(len(trials), block % len(LANGUAGES))
+        else:
+            is_planned = trials < len(block_trials)
+            trials, starts = trials[is_planned], starts[is_planned]
+            languages = block_trials["language"][trials]
+
+        windows = starts[:, None] + np.arange(sample_count)[None, :]
+        epochs = raw_data.get_data()[:, windows].transpose(1, 0, 2)
+        if do_reject_artifacts and len(epochs) > 0:
+            is_kept = ~reject_artifacts(epochs, sampling_frequency)["is_rejected"]
+            epochs, languages = epochs[is_kept], languages[is_kept]
+
+        if sums is None:
+            sums = np.zeros((len(LANGUAGES), len(CHANNELS), sample_count))
+        for language in range(len(LANGUAGES)):
+            sums[language] += epochs[languages == language].sum(axis=0)
+        epoch_counts += np.bincount(languages, minlength=len(LANGUAGES))
+
+    if sums is None:
+        return None
+
+    return {
+        "participant_id": participant_path.name,
+        "means": sums / np.maximum(epoch_counts, 1)[:, None, None],
+        "epoch_counts": epoch_counts,
+        "sampling_frequency": sampling_frequency,
+    }
+
+
+def add_participant(state, participant_average):
+    if state["means"].shape[2] != participant_average["means"].shape[2] or (
+        state["sampling_frequency"] != participant_average["sampling_frequency"]
+    ):
+        raise ValueError(
+            f"Participant {participant_average['participant_id']} epochs do not "
+            "match the aggregated ones"
+        )
+
+    # Welford's update, with each participant's average as one observation, so
+    # that the variance is across participants rather than across epochs.
+    has_epochs = participant_average["epoch_counts"] > 0
+    state["counts"] += has_epochs
+
+    delta = participant_average["means"] - state["means"]
+    state["means"] += np.where(
+        has_epochs[:, None, None],
+        delta / np.maximum(state["counts"], 1)[:, None, None],
+        0,
+    )
+    state["sums_of_squares"] += np.where(
+        has_epochs[:, None, None],
+        delta * (participant_average["means"] - state["means"]),
+        0,
+    )
+
+    state["epoch_counts"] += participant_average["epoch_counts"]
+    state["participant_ids"] = np.append(
+        state["participant_ids"], participant_average["participant_id"]
+    )
+
+    return state
+
+
+def get_results(state, confidence_level=CONFIDENCE_LEVEL):
+    counts = state["counts"][:, None, None]
+    variances = state["sums_of_squares"] / np.maximum(counts - 1, 1)
+    standard_errors = np.where(
+        counts > 1, np.sqrt(variances / np.maximum(counts, 1)), np.nan
+    )
+    critical_values = scipy.stats.t.ppf(
+        (1 + confidence_level) / 2, np.maximum(counts - 1, 1)
+    )
+
+    sample_count = state["means"].shape[2]
+
+    return {
+        "languages": np.array(LANGUAGES),
+        "channels": np.array(CHANNELS),
+        "times": state["tmin"] + np.arange(sample_count) / state["sampling_frequency"],
+        "means": state["means"],
+        "standard_deviations": np.where(counts > 1, np.sqrt(variances), np.nan),
+        "confidence_interval_lows": state["means"] - critical_values * standard_errors,
+        "confidence_interval_highs": state["means"] + critical_values * standard_errors,
+        "confidence_level": np.float64(confidence_level),
+        "participant_counts": state["counts"],
+        "epoch_counts": state["epoch_counts"],
+    }
+
+
+def run_erp_aggregation(
+    data_path=DATA_PATH,
+    output_path=ERP_OUTPUT_PATH,
+    max_workers=None,
+    use_cache=True,
+    do_rebuild=False,
+):
+    state_path = output_path / STATE_FILE_NAME
+    state = None if do_rebuild else load_state(state_path)
+    aggregated_participant_ids = (
+        set() if state is None else set(state["participant_ids"].tolist())
+    )
+
+    participant_paths = sorted(
+        {
+            file_to_check.parent
+            for file_to_check in find_block_files(data_path)
+            if file_to_check.parent.name not in aggregated_participant_ids
+        }
+    )
+
+    with ProcessPoolExecutor(
+        max_workers=max_workers or os.cpu_count(), initializer=_init_worker
+    ) as executor:
+        # Averages are folded in participant order, so the state does not
+        # depend on which worker finishes first.
+        participant_averages = executor.map(
+            average_participant,
+            participant_paths,
+            [use_cache] * len(participant_paths),
+        )
+        for participant_path, participant_average in zip(
+            participant_paths, participant_averages
+        ):
+            if participant_average is None:
+                continue
+
+            if state is None:
+                state = get_empty_state(
+                    participant_average["means"].shape[2],
+                    participant_average["sampling_frequency"],
+                )
+            state = add_participant(state, participant_average)
+            save_state(state, state_path)
+
+            print(f"{participant_path} - {participant_average['epoch_counts']}")
+
+    if state is None:
+        raise ValueError(f"No participants with epochs in {data_path}")
+
+    results_path = output_path / RESULTS_FILE_NAME
+    np.savez(results_path, **get_results(state))
+
+    return results_path
+
+
+def load_results(results_path):
+    with np.load(results_path) as results:
+        return dict(results)
+
+
+def _init_worker():
+    mne.set_log_level("ERROR")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Aggregate sentence ERPs.")
+    parser.add_argument("--data-path", type=Path, default=DATA_PATH)
+    parser.add_argument("--output-path", type=Path, default=ERP_OUTPUT_PATH)
+    parser.add_argument("--max-workers", type=int, default=None)
+    parser.add_argument("--no-cache", action="store_true")
+    parser.add_argument(
+        "--rebuild",
+        action="store_true",
+        help="aggregate every participant again instead of only new ones",
+    )
+    args = parser.parse_args()
+
+    results_path = run_erp_aggregation(
+        data_path=args.data_path,
+        output_path=args.output_path,
+        max_workers=args.max_workers,
+        use_cache=not args.no_cache,
+        do_rebuild=args.rebuild,
+    )
+    print(f"results written to {results_path}")
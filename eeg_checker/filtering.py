@@ -0,0 +1,115 @@
+from functools import lru_cache
+
+import mne
+import numpy as np
+import scipy.fft
+
+# Samples per second over all channels that filter_arrays should sustain even on a
+# single core for the default bandpass and notch, see benchmark_filtering.py.
+TARGET_THROUGHPUT_SAMPLES_PER_SECOND = 15_000_000
+
+NOTCH_WIDTH_DIVISOR = 200
+NOTCH_TRANSITION_BANDWIDTH = 1
+
+
+@lru_cache
+def get_bandpass_kernel(sampling_frequency, l_freq, h_freq):
+    kernel = mne.filter.create_filter(
+        None, sampling_frequency, l_freq=l_freq, h_freq=h_freq, verbose="error"
+    )
+    kernel.setflags(write=False)
+
+    return kernel
+
+
+@lru_cache
+def get_notch_kernel(sampling_frequency, freqs):
+    freqs = np.array(freqs, dtype=float)
+    notch_widths = freqs / NOTCH_WIDTH_DIVISOR
+    half_transition_bandwidth = NOTCH_TRANSITION_BANDWIDTH / 2
+
+    kernel = mne.filter.create_filter(
+        None,
+        sampling_frequency,
+        l_freq=freqs + notch_widths / 2 + half_transition_bandwidth,
+        h_freq=freqs - notch_widths / 2 - half_transition_bandwidth,
+        l_trans_bandwidth=half_transition_bandwidth,
+        h_trans_bandwidth=half_transition_bandwidth,
+        verbose="error",
+    )
+    kernel.setflags(write=False)
+
+    return kernel
+
+
+@lru_cache
+def get_combined_kernel(sampling_frequency, l_freq, h_freq, notch_freqs):
+    kernel = np.convolve(
+        get_bandpass_kernel(sampling_frequency, l_freq, h_freq),
+        get_notch_kernel(sampling_frequency, notch_freqs),
+    )
+    kernel.setflags(write=False)
+
+    return kernel
+
+
+@lru_cache(maxsize=32)
+def get_kernel_spectrum(kernel_bytes, fft_length):
+    return scipy.fft.rfft(np.frombuffer(kernel_bytes), fft_length)
+
+
+def apply_kernel(data, kernel):
+    data = np.asarray(data, dtype=np.float64)
+    edge_length = min(len(kernel), data.shape[-1]) - 1
+    delay = (len(kernel) - 1) // 2
+
+    # Odd reflection at the edges, as MNE's "reflect_limited" padding does.
+    padded = np.pad(
+        data,
+        [(0, 0)] * (data.ndim - 1) + [(edge_length, edge_length)],
+        mode="reflect",
+        reflect_type="odd",
+    )
+    fft_length = scipy.fft.next_fast_len(padded.shape[-1] + len(kernel) - 1, real=True)
+    filtered = scipy.fft.irfft(
+        scipy.fft.rfft(padded, fft_length, axis=-1, workers=-1)
+        * get_kernel_spectrum(kernel.tobytes(), fft_length),
+        fft_length,
+        axis=-1,
+        workers=-1,
+    )
+    start = delay + edge_length
+
+    return filtered[..., start : start + data.shape[-1]]
+
+
+def filter_array(data, sampling_frequency, l_freq, h_freq, notch_freqs):
+    kernel = get_combined_kernel(
+        float(sampling_frequency),
+        float(l_freq),
+        float(h_freq),
+        tuple(float(freq) for freq in notch_freqs),
+    )
+
+    return apply_kernel(data, kernel)
+
+
+def filter_arrays(arrays, sampling_frequency, l_freq, h_freq, notch_freqs):
+    filtered = [None] * len(arrays)
+
+    indices_by_shape = {}
+    for idx, array in enumerate(arrays):
+        indices_by_shape.setdefault(np.shape(array), []).append(idx)
+
+    for indices in indices_by_shape.values():
+        batch = filter_array(
+            np.stack([arrays[idx] for idx in indices]),
+            sampling_frequency,
+            l_freq,
+            h_freq,
+            notch_freqs,
+        )
+        for batch_idx, idx in enumerate(indices):
+            filtered[idx] = batch[batch_idx]
+
+    return filtered
@@ -2,6 +2,8 @@ from pathlib import Path
 
 import mne
 import numpy as np
+from cache import load_or_compute
+from filtering import filter_array, get_combined_kernel
 
 CHANNELS = [
     "P8",
@@ -45,15 +47,96 @@ SAMPLING_FREQUENCY = 250
 MAX_FREQUENCY = SAMPLING_FREQUENCY // 2
 BANDSTOP_FREQUENCY = np.arange(50, MAX_FREQUENCY, 50)
 
+DATA_PATH = Path.cwd().parent / "data"
+
+
+def get_filter_padding(sampling_frequency):
+    kernel = get_combined_kernel(
+        float(sampling_frequency),
+        float(LOWPASS_FREQUENCY),
+        float(HIGHPASS_FREQUENCY),
+        tuple(float(freq) for freq in BANDSTOP_FREQUENCY),
+    )
+
+    return (len(kernel) - 1) / 2 / sampling_frequency
 
-def preprocess_data(file_to_check):
-    data_path = Path.cwd().parent / "data" / file_to_check
-    raw_data = mne.io.read_raw_fif(data_path)
-    raw_data.load_data()
 
+def read_data(file_to_check):
+    raw_data = mne.io.read_raw_fif(DATA_PATH / file_to_check, preload=False)
     raw_data.pick(CHANNELS)
+
+    return raw_data
+
+
+def scale_data(raw_data):
+    raw_data.load_data()
     raw_data.apply_function(fun=lambda x: x * VOLTS_IN_MICROVOLT)
+
+    return raw_data
+
+
+def load_data(file_to_check):
+    return scale_data(read_data(file_to_check))
+
+
+def filter_data(raw_data):
+    sampling_frequency = raw_data.info["sfreq"]
+    raw_data.apply_function(
+        fun=lambda x: filter_array(
+            x,
+            sampling_frequency,
+            LOWPASS_FREQUENCY,
+            HIGHPASS_FREQUENCY,
+            BANDSTOP_FREQUENCY,
+        ),
+        channel_wise=False,
+    )
+
+    return raw_data
+
+
+def filter_data_with_mne(raw_data):
     raw_data.filter(l_freq=LOWPASS_FREQUENCY, h_freq=HIGHPASS_FREQUENCY)
     raw_data.notch_filter(BANDSTOP_FREQUENCY)
 
     return raw_data
+
+
+def preprocess_window(file_to_check, tmin=None, tmax=None):
+    raw_data = read_data(file_to_check)
+    if tmin is None and tmax is None:
+        return filter_data(scale_data(raw_data))
+
+    tmin = 0 if tmin is None else tmin
+    tmax = raw_data.times[-1] if tmax is None else min(tmax, raw_data.times[-1])
+
+    padding = get_filter_padding(raw_data.info["sfreq"])
+    padded_tmin = max(0, tmin - padding)
+    raw_data.crop(tmin=padded_tmin, tmax=min(raw_data.times[-1], tmax + padding))
+
+    filter_data(scale_data(raw_data))
+
+    return raw_data.crop(tmin=tmin - padded_tmin, tmax=tmax - padded_tmin)
+
+
+def get_preprocessing_parameters():
+    return {
+        "channels": CHANNELS,
+        "volts_in_microvolt": VOLTS_IN_MICROVOLT,
+        "lowpass_frequency": LOWPASS_FREQUENCY,
+        "highpass_frequency": HIGHPASS_FREQUENCY,
+        "bandstop_frequency": BANDSTOP_FREQUENCY.tolist(),
+        "sampling_frequency": SAMPLING_FREQUENCY,
+        "filter": "combined_fir_kernel",
+    }
+
+
+def preprocess_data(file_to_check, tmin=None, tmax=None, use_cache=True):
+    if not use_cache:
+        return preprocess_window(file_to_check, tmin, tmax)
+
+    return load_or_compute(
+        DATA_PATH / file_to_check,
+        {**get_preprocessing_parameters(), "tmin": tmin, "tmax": tmax},
+        lambda: preprocess_window(file_to_check, tmin, tmax),
+    )
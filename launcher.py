@@ -0,0 +1,83 @@
+import argparse
+import json
+import logging
+from datetime import datetime
+from pathlib import Path
+
+from src.constants import MULTI_STATION_RUNS_DIR_PATH
+from src.multi_station import MultiStationLauncher, compare_timing, load_stations
+
+
+def main() -> bool:
+    parser = argparse.ArgumentParser(
+        description="Runs stations simulated or windowed, one of --simulation and "
+        "--debug-mode is required"
+    )
+    parser.add_argument(
+        "stations",
+        type=Path,
+        help="JSON list of stations, each with name, brainaccess_cap_name and "
+        "participant_id",
+    )
+    parser.add_argument("--debug-mode", action="store_true")
+    parser.add_argument("--mock-headset", action="store_true")
+    parser.add_argument("--streaming-recording", action="store_true")
+    parser.add_argument("--shared-memory-stream", action="store_true")
+    parser.add_argument("--simulation", action="store_true")
+    parser.add_argument("--fast-startup", action="store_true")
+    parser.add_argument(
+        "--baseline",
+        type=Path,
+        help="timing summary of an earlier run, e.g. with a single station, to "
+        "compare to",
+    )
+    args = parser.parse_args()
+
+    stations = load_stations(args.stations)
+
+    run_path = MULTI_STATION_RUNS_DIR_PATH / f"{datetime.now():%Y%m%d_%H%M%S}"
+    run_path.mkdir(parents=True)
+
+    logger = logging.getLogger("launcher")
+    logger.setLevel(logging.INFO)
+    logger.addHandler(logging.FileHandler(run_path / "launcher.log"))
+
+    launcher = MultiStationLauncher(
+        stations=stations,
+        run_path=run_path,
+        run_kwargs={
+            "do_use_debug_mode": args.debug_mode,
+            "do_use_mock_headset": args.mock_headset,
+            "do_use_streaming_recording": args.streaming_recording,
+            "do_use_shared_memory_stream": args.shared_memory_stream,
+            "do_use_simulation": args.simulation,
+            "do_use_fast_startup": args.fast_startup,
+        },
+        logger=logger,
+    )
+    exit_codes = launcher.run()
+
+    try:
+        timing_summary = launcher.dashboard.summarize_timing()
+    except FileNotFoundError as error:
+        print(f"FAIL {error}")
+        return False
+
+    timing_summary_path = run_path / "timing_summary.json"
+    with open(timing_summary_path, "w", encoding="utf-8") as file:
+        json.dump(timing_summary, file, indent=2)
+    print(f"timing summary written to {timing_summary_path}")
+
+    is_ok = all(exit_code == 0 for exit_code in exit_codes.values())
+    if args.baseline is not None:
+        with open(args.baseline, encoding="utf-8") as file:
+            regressions = compare_timing(timing_summary, json.load(file))
+        for regression in regressions:
+            print(f"FAIL {regression}")
+        is_ok &= not regressions
+
+    return is_ok
+
+
+if __name__ == "__main__":
+    raise SystemExit(0 if main() else 1)
@@ -2,6 +2,10 @@ from src.run import run
 
 DO_USE_DEBUG_MODE = True
 DO_USE_MOCK_HEADSET = True
+DO_USE_STREAMING_RECORDING = False
+DO_USE_SHARED_MEMORY_STREAM = False
+DO_USE_SIMULATION = False
+DO_USE_FAST_STARTUP = False
 
 BRAINACCESS_CAP_NAME = "BA MAXI 011"
 
@@ -11,4 +15,8 @@ if __name__ == "__main__":
         brainaccess_cap_name=BRAINACCESS_CAP_NAME,
         do_use_debug_mode=DO_USE_DEBUG_MODE,
         do_use_mock_headset=DO_USE_MOCK_HEADSET,
+        do_use_streaming_recording=DO_USE_STREAMING_RECORDING,
+        do_use_shared_memory_stream=DO_USE_SHARED_MEMORY_STREAM,
+        do_use_simulation=DO_USE_SIMULATION,
+        do_use_fast_startup=DO_USE_FAST_STARTUP,
     )
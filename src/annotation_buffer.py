@@ -0,0 +1,138 @@
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime
+
+import mne
+import numpy as np
+from numpy.typing import NDArray
+
+from .constants import ANNOTATION_BUFFER_CAPACITY
+
+UNSET = -1
+
+ANNOTATION_RECORD_DTYPE = np.dtype(
+    [
+        ("timestamp_ns", np.int64),
+        ("sample_index", np.int64),
+        ("description", np.uint16),
+    ]
+)
+
+
+@dataclass(frozen=True, kw_only=True)
+class BufferedAnnotations:
+    records: NDArray[np.void]
+    descriptions: tuple[str, ...]
+
+    def resolve_sample_indices(
+        self, *, started_at_ns: int, sampling_frequency: float, sample_count: int
+    ) -> NDArray[np.int64]:
+        interpolated = np.rint(
+            (self.records["timestamp_ns"] - started_at_ns) * sampling_frequency / 1e9
+        ).astype(np.int64)
+        sample_indices = np.where(
+            self.records["sample_index"] == UNSET,
+            interpolated,
+            self.records["sample_index"],
+        )
+
+        # Annotations made right as the block stops still belong to its last sample.
+        return np.clip(sample_indices, 0, sample_count - 1)
+
+    def to_mne(
+        self,
+        sample_indices: NDArray[np.int64],
+        sampling_frequency: float,
+        *,
+        first_time: float = 0.0,
+        orig_time: datetime | None = None,
+    ) -> mne.Annotations:
+        # Without orig_time MNE counts onsets from the first sample itself.
+        onset = sample_indices / sampling_frequency
+        if orig_time is not None:
+            onset += first_time
+
+        return mne.Annotations(
+            onset=onset,
+            duration=np.zeros(len(sample_indices)),
+            description=self.get_descriptions(),
+            orig_time=orig_time,
+        )
+
+    def to_array(self, sample_indices: NDArray[np.int64]) -> NDArray[np.void]:
+        descriptions = self.get_descriptions()
+        array = np.zeros(
+            len(self.records),
+            dtype=[
+                ("timestamp_ns", np.int64),
+                ("sample_index", np.int64),
+                ("description", f"U{max(map(len, descriptions), default=1)}"),
+            ],
+        )
+        array["timestamp_ns"] = self.records["timestamp_ns"]
+        array["sample_index"] = sample_indices
+        array["description"] = descriptions
+
+        return array
+
+    def get_descriptions(self) -> list[str]:
+        return [self.descriptions[code] for code in self.records["description"]]
+
+
+class AnnotationBuffer:
+    def __init__(
+        self,
+        *,
+        capacity: int = ANNOTATION_BUFFER_CAPACITY,
+        get_sample_index: Callable[[], int] | None = None,
+    ):
+        self._records = np.zeros(capacity, dtype=ANNOTATION_RECORD_DTYPE)
+        self._count = 0
+        self._get_sample_index = get_sample_index
+
+        self._descriptions: list[str] = []
+        self._description_codes: dict[str, int] = {}
+
+        self._lock = threading.Lock()
+
+    def append(self, description: str, *, timestamp_ns: int | None = None) -> int:
+        if timestamp_ns is None:
+            timestamp_ns = time.perf_counter_ns()
+        sample_index = (
+            UNSET if self._get_sample_index is None else self._get_sample_index()
+        )
+
+        with self._lock:
+            if self._count == len(self._records):
+                self._records = np.concatenate(
+                    [self._records, np.zeros_like(self._records)]
+                )
+
+            record = self._records[self._count]
+            record["timestamp_ns"] = timestamp_ns
+            record["sample_index"] = sample_index
+            record["description"] = self._get_description_code(description)
+            self._count += 1
+
+        return sample_index
+
+    def drain(self) -> BufferedAnnotations:
+        with self._lock:
+            annotations = BufferedAnnotations(
+                records=self._records[: self._count].copy(),
+                descriptions=tuple(self._descriptions),
+            )
+            self._count = 0
+
+        return annotations
+
+    def _get_description_code(self, description: str) -> int:
+        code = self._description_codes.get(description)
+        if code is None:
+            code = len(self._descriptions)
+            self._descriptions.append(description)
+            self._description_codes[description] = code
+
+        return code
@@ -1,4 +1,6 @@
-import itertools
+import gc
+import time
+from collections.abc import Callable
 from copy import copy
 from logging import Logger
 from pathlib import Path
@@ -12,6 +14,7 @@ from data_acquisition.sequencers import (
     BlockScreenSequencer,
     PredefinedScreenSequencer,
     ScreenSequencer,
+    SimpleScreenSequencer,
 )
 
 from .config import Config
@@ -20,9 +23,32 @@ from .constants import (
     NON_SENTENCE_SCREEN_TEXT_COLOR,
     START_EXPRIMENT_SCREEN_ADVANCE_KEY,
     START_EXPRIMENT_SCREEN_TEXT,
+    TIMING_RECORDER_EXTRA_SCREEN_COUNT_PER_BLOCK,
 )
+from .deadline_scheduler import DeadlineScheduler
 from .sentence_sequencer import SentenceSequencer
 from .sentences import Sentences, load_sentences
+from .session_plan import SessionPlan, compile_session_plan
+from .signal_quality_monitor import SignalQualityMonitor
+from .startup_timer import StartupTimer
+from .text_layout_cache import SentenceLayouts, TextLayoutKey, load_sentence_layouts
+from .timing_recorder import UNSET, EventSource, ScreenType, TimingRecorder
+
+
+class _LazySentenceSequencer(SimpleScreenSequencer[None]):
+    def __init__(
+        self, *, gui: Gui, build: Callable[[], SentenceSequencer], logger: Logger
+    ):
+        super().__init__(gui=gui, logger=logger)
+
+        self._build = build
+        self._sequencer: SentenceSequencer | None = None
+
+    def _get_next(self) -> EventfulScreen[None]:
+        if self._sequencer is None:
+            self._sequencer = self._build()
+
+        return self._sequencer._get_next()  # pyright: ignore[reportPrivateUsage]
 
 
 class AppSequencerBuilder:
@@ -34,18 +60,67 @@ class AppSequencerBuilder:
         headset: EEGHeadset,
         participant_id: str,
         logger: Logger,
+        signal_quality_monitor: SignalQualityMonitor | None = None,
+        startup_timer: StartupTimer | None = None,
+        text_layout_key: TextLayoutKey | None = None,
+        data_path: Path = Path("data"),
+        clock: Callable[[], int] = time.perf_counter_ns,
+        wait_for_headset_start: Callable[[], None] | None = None,
     ):
         self._gui = gui
         self._config = config
         self._headset = headset
         self._participant_id = participant_id
         self._logger = logger
+        self._signal_quality_monitor = signal_quality_monitor
+        self._startup_timer = startup_timer
+        self._text_layout_key = text_layout_key
+        self._wait_for_headset_start = wait_for_headset_start
+        self._sentence_layouts: SentenceLayouts | None = None
+        self._eeg_save_dir = data_path / participant_id
+
+        self._timing_recorder = TimingRecorder(
+            capacity=config.block_count
+            * (
+                2 * (config.sentence_count + config.spare_trial_count)
+                + TIMING_RECORDER_EXTRA_SCREEN_COUNT_PER_BLOCK
+            ),
+            clock=clock,
+        )
+        self._start_experiment_timing_row = UNSET
+
+        # One scheduler for the whole session, so it keeps its latency
+        # estimates from block to block.
+        self._deadline_scheduler = (
+            DeadlineScheduler(
+                timing_recorder=self._timing_recorder,
+                refresh_rate_hz=config.display_refresh_rate_hz,
+                clock=clock,
+            )
+            if config.do_use_deadline_scheduling
+            else None
+        )
 
     def set_up_app_sequencer(self) -> ScreenSequencer[None]:
         self._set_up_save_directory()
 
         sentences = load_sentences()
-        sequencers = self._build_sequencers_from_sentences(sentences)
+        session_plan = compile_session_plan(
+            config=self._config, sentences=sentences, seed=self._config.seed
+        )
+        session_plan.save(self._eeg_save_dir / "session_plan.npz")
+        self._logger.info(f"session plan compiled - seed {session_plan.seed}")
+
+        if self._text_layout_key is not None:
+            self._sentence_layouts = load_sentence_layouts(
+                sentences, key=self._text_layout_key
+            )
+            self._logger.info(
+                f"sentence layouts loaded - {self._text_layout_key.display_width}x"
+                f"{self._text_layout_key.display_height}"
+            )
+
+        sequencers = self._build_sequencers_from_session_plan(session_plan, sentences)
 
         start_experiment_screen_sequencer = (
             self._build_start_experiment_screen_sequencer()
@@ -54,44 +129,81 @@ class AppSequencerBuilder:
             sequencers=[start_experiment_screen_sequencer, sequencers[0]]
         )
 
+        if self._config.do_disable_gc_during_blocks:
+            # Everything built so far lives for the whole session, so it is moved
+            # out of the reach of the collections run between blocks.
+            gc.collect()
+            gc.freeze()
+
         return BlockScreenSequencer(
             sequencers=sequencers,
             block_start_callback=lambda _: self._headset.start(),
-            block_end_callback=lambda block_number: self._headset.stop_and_save_at_path(
-                self._eeg_save_dir / f"{block_number}_raw.fif"
+            block_end_callback=lambda block_number: self._end_block(
+                block_number, session_plan
             ),
             logger=self._logger,
         )
 
+    def write_timing_report(self) -> None:
+        self._timing_recorder.save(self._eeg_save_dir / "timing.npy")
+        self._timing_recorder.write_report(self._eeg_save_dir / "timing_report.json")
+
+    def _end_block(self, block_number: int, session_plan: SessionPlan) -> None:
+        self._headset.stop_and_save_at_path(
+            self._eeg_save_dir / f"{block_number}_raw.fif"
+        )
+        # Saved again, since the sentence sequencer marks the trials cut off by a
+        # pause in the plan.
+        session_plan.save(self._eeg_save_dir / "session_plan.npz")
+
     def _set_up_save_directory(self) -> None:
-        self._eeg_save_dir = Path("data") / self._participant_id
         self._eeg_save_dir.mkdir(parents=True)
 
-    def _build_sequencers_from_sentences(
-        self, sentences: Sentences
+    def _build_sequencers_from_session_plan(
+        self, session_plan: SessionPlan, sentences: Sentences
     ) -> list[ScreenSequencer[None]]:
         sequencers: list[ScreenSequencer[None]] = []
 
-        sentences_in_blocks = itertools.islice(
-            itertools.cycle([sentences.polish, sentences.english]),
-            self._config.block_count,
-        )
+        for idx in range(self._config.block_count):
+            if self._config.do_build_sequencers_lazily:
+                # A block's screens and event managers are only built once the
+                # block begins, so none of it delays the first screen.
+                sequencers.append(
+                    _LazySentenceSequencer(
+                        gui=self._gui,
+                        build=lambda idx=idx: self._build_sentence_sequencer(
+                            idx, session_plan, sentences
+                        ),
+                        logger=self._logger,
+                    )
+                )
+            else:
+                sequencers.append(
+                    self._build_sentence_sequencer(idx, session_plan, sentences)
+                )
 
-        for idx, sentences_in_block in enumerate(sentences_in_blocks):
-            config = copy(self._config)
-            config.do_show_continue_screen = idx != 0
-
-            sequencer = SentenceSequencer(
-                gui=self._gui,
-                eeg_headset=self._headset,
-                config=config,
-                sentences=sentences_in_block,
-                logger=self._logger,
-            )
+        return sequencers
 
-            sequencers.append(sequencer)
+    def _build_sentence_sequencer(
+        self, idx: int, session_plan: SessionPlan, sentences: Sentences
+    ) -> SentenceSequencer:
+        config = copy(self._config)
+        config.do_show_continue_screen = idx != 0
 
-        return sequencers
+        return SentenceSequencer(
+            gui=self._gui,
+            eeg_headset=self._headset,
+            config=config,
+            session_plan=session_plan,
+            sentences=sentences,
+            block_index=idx,
+            timing_recorder=self._timing_recorder,
+            logger=self._logger,
+            signal_quality_monitor=self._signal_quality_monitor,
+            deadline_scheduler=self._deadline_scheduler,
+            sentence_layouts=self._sentence_layouts,
+            wait_for_headset_start=self._wait_for_headset_start,
+        )
 
     def _build_start_experiment_screen_sequencer(
         self,
@@ -106,12 +218,28 @@ class AppSequencerBuilder:
         event_manager = KeyPressEventManager(
             gui=self._gui, key=START_EXPRIMENT_SCREEN_ADVANCE_KEY
         )
-        event_manager.register_callback(
-            lambda _: self._logger.info(
-                "experiment start - participant pressed start key"
-            )
-        )
+        event_manager.register_callback(self._start_experiment_screen_end_callback)
 
-        eventful_screen = EventfulScreen(screen=screen, event_manager=event_manager)
+        eventful_screen = EventfulScreen(
+            screen=screen,
+            event_manager=event_manager,
+            screen_show_callback=self._start_experiment_screen_show_callback,
+        )
 
         return PredefinedScreenSequencer(screens=[eventful_screen], logger=self._logger)
+
+    def _start_experiment_screen_show_callback(self) -> None:
+        self._start_experiment_timing_row = self._timing_recorder.begin(
+            block=0, screen_type=ScreenType.START_EXPERIMENT
+        )
+        self._timing_recorder.mark_shown(self._start_experiment_timing_row)
+
+        if self._startup_timer is not None:
+            self._startup_timer.mark("start screen shown")
+            self._startup_timer.log(self._logger)
+
+    def _start_experiment_screen_end_callback(self, _: None) -> None:
+        self._timing_recorder.mark_event(
+            self._start_experiment_timing_row, EventSource.KEY
+        )
+        self._logger.info("experiment start - participant pressed start key")
@@ -0,0 +1,292 @@
+import time
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from logging import Logger
+from pathlib import Path
+from threading import BoundedSemaphore
+
+import mne
+import numpy as np
+from data_acquisition.eeg_headset import EEGHeadset
+
+from .annotation_buffer import AnnotationBuffer, BufferedAnnotations
+from .block_segment import FIF_BUFFER_SIZE_SECONDS
+from .compressed_block import (
+    COMPRESSED_BLOCK_SUFFIX,
+    read_compressed_block,
+    write_compressed_block,
+)
+from .constants import (
+    BACKGROUND_SAVE_MAX_PENDING_COUNT,
+    COMPRESSED_STORAGE_CHUNK_SECONDS,
+    COMPRESSED_STORAGE_COMPRESSION_LEVEL,
+)
+from .streaming_eeg_headset import StreamingEEGHeadset, save_block_segment_at_path
+
+
+class BlockSaveError(Exception):
+    pass
+
+
+@dataclass(frozen=True, kw_only=True)
+class BlockSaveMetrics:
+    path: Path
+    queued_millis: float
+    write_millis: float
+    annotate_millis: float
+    verify_millis: float
+    compress_millis: float
+    file_size_bytes: int
+
+
+@dataclass(frozen=True, kw_only=True)
+class _StoppedBlock:
+    annotations: BufferedAnnotations
+    started_at_ns: int
+    segment_path: Path | None
+    headset_path: Path | None
+    stop_started_at: float
+    stop_ended_at: float
+
+
+class BackgroundSavingHeadset(EEGHeadset):
+    def __init__(
+        self,
+        *,
+        headset: EEGHeadset,
+        logger: Logger,
+        max_pending_save_count: int = BACKGROUND_SAVE_MAX_PENDING_COUNT,
+        get_sample_index: Callable[[], int] | None = None,
+        do_use_compressed_storage: bool = False,
+        compressed_storage_scale: float | None = None,
+    ):
+        self._headset = headset
+        self._logger = logger
+        self._do_use_compressed_storage = do_use_compressed_storage
+        self._compressed_storage_scale = compressed_storage_scale
+        self._annotation_buffer = AnnotationBuffer(get_sample_index=get_sample_index)
+        self._has_sample_index = get_sample_index is not None
+        self._block_started_at_ns = 0
+
+        # The headset is started and stopped on a worker of its own, so that the
+        # next block only waits for the previous one to stop and not for it to
+        # be written, verified and compressed.
+        self._control_executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="headset-control"
+        )
+        self._save_executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="block-save"
+        )
+        self._pending_save_slots = BoundedSemaphore(max_pending_save_count)
+        self._pending_saves: list[Future[BlockSaveMetrics]] = []
+        self._pending_start: Future[None] | None = None
+
+        self.save_metrics: list[BlockSaveMetrics] = []
+
+    def start(self) -> None:
+        self._pending_start = self._control_executor.submit(self._start)
+
+    def annotate(self, annotation: str) -> None:
+        # Only buffered, so that stimulus callbacks do no headset I/O. The
+        # annotations of a block go into its FIF file when it is saved.
+        sample_index = self._annotation_buffer.append(annotation)
+
+        # A streaming recording also gets the annotation at the same sample index,
+        # to write to its segment from the stream's thread, so it survives a crash.
+        if isinstance(self._headset, StreamingEEGHeadset) and self._has_sample_index:
+            self._headset.annotate_at_sample(sample_index, annotation)
+
+    def stop_and_save_at_path(self, path: Path) -> None:
+        annotations = self._annotation_buffer.drain()
+
+        self._pending_save_slots.acquire()
+        queued_at = time.perf_counter()
+        stop = self._control_executor.submit(self._stop, path, annotations)
+        future = self._save_executor.submit(self._save, path, stop, queued_at)
+        future.add_done_callback(lambda _: self._pending_save_slots.release())
+        self._pending_saves.append(future)
+
+    def disconnect(self) -> None:
+        try:
+            self.wait_for_pending_saves()
+        finally:
+            self._control_executor.shutdown()
+            self._save_executor.shutdown()
+            self._headset.disconnect()
+
+    def wait_for_pending_saves(self) -> list[BlockSaveMetrics]:
+        pending_saves, self._pending_saves = self._pending_saves, []
+
+        failures: list[str] = []
+        for future in pending_saves:
+            try:
+                self.save_metrics.append(future.result())
+            except Exception as error:
+                self._logger.exception("block save - failed")
+                failures.append(str(error))
+
+        if failures:
+            raise BlockSaveError(f"Failed to save blocks: {'; '.join(failures)}")
+
+        return self.save_metrics
+
+    def wait_for_pending_start(self) -> None:
+        if self._pending_start is not None:
+            self._pending_start.result()
+            self._pending_start = None
+
+    def _start(self) -> None:
+        self._headset.start()
+        self._block_started_at_ns = time.perf_counter_ns()
+
+    def _stop(self, path: Path, annotations: BufferedAnnotations) -> _StoppedBlock:
+        stop_started_at = time.perf_counter()
+
+        segment_path = None
+        headset_path = None
+        if isinstance(self._headset, StreamingEEGHeadset):
+            # Only the recording is stopped here, the segment is converted to
+            # FIF with the rest of the save.
+            segment_path = self._headset.stop_recording()
+        else:
+            # The headset writes its own FIF file and takes no annotations at
+            # sample indices, so the save writes the block's file from it.
+            headset_path = path.with_name(f".{path.name}")
+            self._headset.stop_and_save_at_path(headset_path)
+
+        return _StoppedBlock(
+            annotations=annotations,
+            started_at_ns=self._block_started_at_ns,
+            segment_path=segment_path,
+            headset_path=headset_path,
+            stop_started_at=stop_started_at,
+            stop_ended_at=time.perf_counter(),
+        )
+
+    def _save(
+        self, path: Path, stop: Future[_StoppedBlock], queued_at: float
+    ) -> BlockSaveMetrics:
+        stopped_block = stop.result()
+        write_started_at = time.perf_counter()
+        if stopped_block.segment_path is not None:
+            save_block_segment_at_path(stopped_block.segment_path, path)
+        if stopped_block.headset_path is not None:
+            self._save_with_annotations(stopped_block.headset_path, path, stopped_block)
+        annotate_started_at = time.perf_counter()
+        raw = self._read(path)
+        self._write_annotation_timestamps(
+            path, raw, stopped_block.annotations, stopped_block.started_at_ns
+        )
+        verify_started_at = time.perf_counter()
+        self._verify(path, raw, len(stopped_block.annotations.records))
+        compress_started_at = time.perf_counter()
+        if self._do_use_compressed_storage:
+            path = self._compress(path)
+        compress_ended_at = time.perf_counter()
+
+        metrics = BlockSaveMetrics(
+            path=path,
+            queued_millis=(stopped_block.stop_started_at - queued_at) * 1000,
+            write_millis=(
+                stopped_block.stop_ended_at
+                - stopped_block.stop_started_at
+                + annotate_started_at
+                - write_started_at
+            )
+            * 1000,
+            annotate_millis=(verify_started_at - annotate_started_at) * 1000,
+            verify_millis=(compress_started_at - verify_started_at) * 1000,
+            compress_millis=(compress_ended_at - compress_started_at) * 1000,
+            file_size_bytes=path.stat().st_size,
+        )
+        self._logger.info(
+            f"block save - {path} - queued {metrics.queued_millis:.1f} ms, "
+            f"written {metrics.write_millis:.1f} ms, "
+            f"annotated {metrics.annotate_millis:.1f} ms, "
+            f"verified {metrics.verify_millis:.1f} ms, "
+            f"compressed {metrics.compress_millis:.1f} ms, "
+            f"{metrics.file_size_bytes} bytes"
+        )
+
+        return metrics
+
+    def _read(self, path: Path) -> mne.io.Raw:
+        if not path.is_file() or path.stat().st_size == 0:
+            raise BlockSaveError(f"{path} was not written")
+
+        return mne.io.read_raw_fif(path, preload=False, verbose="error")
+
+    def _save_with_annotations(
+        self, headset_path: Path, path: Path, stopped_block: _StoppedBlock
+    ) -> None:
+        raw = self._read(headset_path)
+        sample_indices = stopped_block.annotations.resolve_sample_indices(
+            started_at_ns=stopped_block.started_at_ns,
+            sampling_frequency=raw.info["sfreq"],
+            sample_count=raw.n_times,
+        )
+
+        # All annotations of the block go in with the one write of its file.
+        raw.set_annotations(
+            raw.annotations
+            + stopped_block.annotations.to_mne(
+                sample_indices,
+                raw.info["sfreq"],
+                first_time=raw.first_time,
+                orig_time=raw.annotations.orig_time,
+            )
+        )
+        raw.save(
+            path,
+            buffer_size_sec=FIF_BUFFER_SIZE_SECONDS,
+            overwrite=True,
+            verbose="error",
+        )
+        headset_path.unlink()
+
+    def _write_annotation_timestamps(
+        self,
+        path: Path,
+        raw: mne.io.Raw,
+        annotations: BufferedAnnotations,
+        started_at_ns: int,
+    ) -> None:
+        # Kept next to the FIF file to check against the timing log.
+        sample_indices = annotations.resolve_sample_indices(
+            started_at_ns=started_at_ns,
+            sampling_frequency=raw.info["sfreq"],
+            sample_count=raw.n_times,
+        )
+        np.save(
+            path.with_name(f"{path.stem}_annotations.npy"),
+            annotations.to_array(sample_indices),
+        )
+
+    def _verify(self, path: Path, raw: mne.io.Raw, annotation_count: int) -> None:
+        if raw.n_times == 0:
+            raise BlockSaveError(f"{path} contains no samples")
+        if len(raw.annotations) < annotation_count:
+            raise BlockSaveError(
+                f"{path} contains {len(raw.annotations)} of "
+                f"{annotation_count} annotations"
+            )
+
+    def _compress(self, path: Path) -> Path:
+        raw = mne.io.read_raw_fif(path, preload=False, verbose="error")
+        compressed_path = path.with_suffix(COMPRESSED_BLOCK_SUFFIX)
+        write_compressed_block(
+            raw,
+            compressed_path,
+            chunk_seconds=COMPRESSED_STORAGE_CHUNK_SECONDS,
+            scale=self._compressed_storage_scale,
+            compression_level=COMPRESSED_STORAGE_COMPRESSION_LEVEL,
+        )
+
+        if not read_compressed_block(compressed_path).matches(raw):
+            raise BlockSaveError(f"{compressed_path} does not match {path}")
+
+        # The FIF file is only removed once the compressed copy has been checked.
+        path.unlink()
+
+        return compressed_path
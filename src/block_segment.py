@@ -0,0 +1,271 @@
+import json
+import struct
+import sys
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import mne
+import numpy as np
+from numpy.typing import NDArray
+
+BLOCK_SEGMENT_SUFFIX = ".seg"
+SEGMENT_MAGIC = b"EEGSEG01"
+SAMPLES_RECORD_TAG = b"S"
+ANNOTATION_RECORD_TAG = b"A"
+
+# Fewer, larger buffers make conversion much faster than the one-second default.
+FIF_BUFFER_SIZE_SECONDS = 10
+
+_HEADER_LENGTH = struct.Struct("<I")
+_RECORD_HEADER = struct.Struct("<cI")
+_ANNOTATION_SAMPLE_INDEX = struct.Struct("<q")
+_SAMPLE_ITEM_SIZE = np.dtype(np.float32).itemsize
+
+
+class BlockSegmentWriter:
+    def __init__(
+        self,
+        *,
+        path: Path,
+        channel_names: list[str],
+        sampling_frequency: int,
+        chunk_sample_count: int,
+    ):
+        self.path = path
+
+        self._chunk = np.empty(
+            (len(channel_names), chunk_sample_count), dtype=np.float32
+        )
+        self._chunk_fill = 0
+        self._lock = threading.Lock()
+
+        header = json.dumps(
+            {"channel_names": channel_names, "sampling_frequency": sampling_frequency}
+        ).encode("utf-8")
+
+        self._file = open(path, "xb")
+        self._file.write(SEGMENT_MAGIC + _HEADER_LENGTH.pack(len(header)) + header)
+        self._file.flush()
+
+    def write_samples(self, samples: NDArray[np.float32]) -> None:
+        chunk_sample_count = self._chunk.shape[1]
+
+        with self._lock:
+            offset = 0
+            while offset < samples.shape[1]:
+                count = min(
+                    chunk_sample_count - self._chunk_fill, samples.shape[1] - offset
+                )
+                self._chunk[:, self._chunk_fill : self._chunk_fill + count] = samples[
+                    :, offset : offset + count
+                ]
+                self._chunk_fill += count
+                offset += count
+
+                if self._chunk_fill == chunk_sample_count:
+                    self._flush_chunk()
+
+    def write_annotation(self, sample_index: int, description: str) -> None:
+        payload = _ANNOTATION_SAMPLE_INDEX.pack(sample_index) + description.encode(
+            "utf-8"
+        )
+
+        with self._lock:
+            self._write_record(ANNOTATION_RECORD_TAG, payload)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._chunk_fill:
+                self._flush_chunk()
+            self._file.close()
+
+    def _flush_chunk(self) -> None:
+        self._write_record(
+            SAMPLES_RECORD_TAG, self._chunk[:, : self._chunk_fill].tobytes()
+        )
+        self._chunk_fill = 0
+
+    def _write_record(self, tag: bytes, payload: bytes) -> None:
+        self._file.write(_RECORD_HEADER.pack(tag, len(payload)))
+        self._file.write(payload)
+        self._file.flush()
+
+
+@dataclass(frozen=True, kw_only=True)
+class BlockSegment:
+    path: Path
+    channel_names: list[str]
+    sampling_frequency: int
+    sample_count: int
+    chunk_offsets: NDArray[np.int64]
+    chunk_start_samples: NDArray[np.int64]
+    annotation_sample_indices: list[int]
+    annotation_descriptions: list[str]
+
+    def read_samples(self, start: int, stop: int) -> NDArray[np.float32]:
+        channel_count = len(self.channel_names)
+        samples = np.empty((channel_count, stop - start), dtype=np.float32)
+
+        first_chunk = int(np.searchsorted(self.chunk_start_samples, start, "right")) - 1
+        with open(self.path, "rb") as file:
+            for chunk in range(first_chunk, len(self.chunk_offsets)):
+                chunk_start = int(self.chunk_start_samples[chunk])
+                chunk_stop = int(self.chunk_start_samples[chunk + 1])
+                if chunk_start >= stop:
+                    break
+
+                file.seek(int(self.chunk_offsets[chunk]))
+                chunk_samples = np.fromfile(
+                    file,
+                    dtype=np.float32,
+                    count=channel_count * (chunk_stop - chunk_start),
+                ).reshape(channel_count, -1)
+
+                copy_start = max(start, chunk_start)
+                copy_stop = min(stop, chunk_stop)
+                samples[:, copy_start - start : copy_stop - start] = chunk_samples[
+                    :, copy_start - chunk_start : copy_stop - chunk_start
+                ]
+
+        return samples
+
+
+def read_block_segment(path: Path) -> BlockSegment:
+    chunk_offsets: list[int] = []
+    chunk_start_samples = [0]
+    annotation_sample_indices: list[int] = []
+    annotation_descriptions: list[str] = []
+
+    with open(path, "rb") as file:
+        if file.read(len(SEGMENT_MAGIC)) != SEGMENT_MAGIC:
+            raise ValueError(f"{path} is not a block segment file")
+
+        (header_length,) = _HEADER_LENGTH.unpack(file.read(_HEADER_LENGTH.size))
+        header: dict[str, Any] = json.loads(file.read(header_length))
+        channel_count = len(header["channel_names"])
+        file_size = path.stat().st_size
+
+        # A crash can leave the last record truncated, so only complete ones count.
+        while True:
+            record_header = file.read(_RECORD_HEADER.size)
+            if len(record_header) < _RECORD_HEADER.size:
+                break
+
+            tag, payload_length = _RECORD_HEADER.unpack(record_header)
+            payload_offset = file.tell()
+            if payload_offset + payload_length > file_size:
+                break
+
+            if tag == SAMPLES_RECORD_TAG:
+                chunk_offsets.append(payload_offset)
+                chunk_start_samples.append(
+                    chunk_start_samples[-1]
+                    + payload_length // (channel_count * _SAMPLE_ITEM_SIZE)
+                )
+                file.seek(payload_length, 1)
+            elif tag == ANNOTATION_RECORD_TAG:
+                payload = file.read(payload_length)
+                (sample_index,) = _ANNOTATION_SAMPLE_INDEX.unpack_from(payload)
+                annotation_sample_indices.append(sample_index)
+                annotation_descriptions.append(
+                    payload[_ANNOTATION_SAMPLE_INDEX.size :].decode("utf-8")
+                )
+            else:
+                break
+
+    return BlockSegment(
+        path=path,
+        channel_names=header["channel_names"],
+        sampling_frequency=header["sampling_frequency"],
+        sample_count=chunk_start_samples[-1],
+        chunk_offsets=np.array(chunk_offsets, dtype=np.int64),
+        chunk_start_samples=np.array(chunk_start_samples, dtype=np.int64),
+        annotation_sample_indices=annotation_sample_indices,
+        annotation_descriptions=annotation_descriptions,
+    )
+
+
+class _BlockSegmentRaw(mne.io.BaseRaw):
+    def __init__(self, segment: BlockSegment):
+        info = mne.create_info(
+            segment.channel_names, segment.sampling_frequency, ch_types="eeg"
+        )
+        super().__init__(
+            info,
+            preload=False,
+            last_samps=[segment.sample_count - 1],
+            filenames=[segment.path],
+            raw_extras=[{"segment": segment}],
+            orig_format="single",
+            verbose="error",
+        )
+
+    def _read_segment_file(
+        self,
+        data: NDArray[np.float64],
+        idx: Any,
+        fi: int,
+        start: int,
+        stop: int,
+        cals: NDArray[np.float64],
+        mult: NDArray[np.float64] | None,
+    ) -> None:
+        segment: BlockSegment = self._raw_extras[fi]["segment"]
+        samples = segment.read_samples(start, stop)
+
+        if mult is not None:
+            data[:] = mult @ samples[idx]
+        else:
+            np.multiply(samples[idx], cals.reshape(-1, 1), out=data, casting="unsafe")
+
+
+def convert_block_segment_to_fif(segment_path: Path, fif_path: Path) -> None:
+    segment = read_block_segment(segment_path)
+    if segment.sample_count == 0:
+        raise ValueError(f"{segment_path} contains no samples")
+
+    raw = _BlockSegmentRaw(segment)
+    raw.set_annotations(
+        mne.Annotations(
+            # Annotations made right as the block stops belong to its last sample.
+            onset=np.minimum(
+                segment.annotation_sample_indices, segment.sample_count - 1
+            )
+            / segment.sampling_frequency,
+            duration=np.zeros(len(segment.annotation_descriptions)),
+            description=segment.annotation_descriptions,
+        )
+    )
+    raw.save(
+        fif_path,
+        buffer_size_sec=FIF_BUFFER_SIZE_SECONDS,
+        overwrite=True,
+        verbose="error",
+    )
+
+
+if __name__ == "__main__":
+    # Segments are converted and removed when their block is saved, so any
+    # left behind were recorded by a session that did not finish. They go where
+    # that session would have saved them, next to the segment directory.
+    for segment_dir_path in map(Path, sys.argv[1:]):
+        for path in sorted(segment_dir_path.glob(f"*{BLOCK_SEGMENT_SUFFIX}")):
+            participant_id, block_index = path.stem.rsplit("_", 1)
+            fif_path = (
+                segment_dir_path.parent / participant_id / f"{block_index}_raw.fif"
+            )
+            if fif_path.exists():
+                print(f"skipped {path} - {fif_path} already exists")
+                continue
+
+            try:
+                fif_path.parent.mkdir(parents=True, exist_ok=True)
+                convert_block_segment_to_fif(path, fif_path)
+            except ValueError as error:
+                print(f"skipped {path} - {error}")
+                continue
+
+            path.unlink()
+            print(f"recovered {fif_path}")
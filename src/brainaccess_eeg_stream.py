@@ -0,0 +1,81 @@
+from collections.abc import Mapping
+from logging import Logger
+
+import numpy as np
+from brainaccess import core
+from brainaccess.core import eeg_channel
+from brainaccess.core.eeg_manager import EEGManager
+from numpy.typing import NDArray
+
+from .eeg_stream import EEGStream
+
+
+class BrainAccessEEGStream(EEGStream):
+    def __init__(
+        self,
+        *,
+        device_name: str,
+        device_channels: Mapping[int, str],
+        logger: Logger,
+    ):
+        self._logger = logger
+
+        core.init()
+        self._manager = EEGManager()
+        try:
+            # Failing connections raise, an incompatible stream only warns.
+            if self._manager.connect(device_name) == 2:
+                raise RuntimeError(
+                    f"The stream of {device_name} is incompatible, update its firmware"
+                )
+        except Exception:
+            self._manager.destroy()
+            core.close()
+            raise
+
+        super().__init__(
+            channel_names=list(device_channels.values()),
+            sampling_frequency=self._manager.get_sample_frequency(),
+        )
+
+        self._channels = [
+            eeg_channel.ELECTRODE_MEASUREMENT + electrode
+            for electrode in device_channels
+        ]
+        self._channel_indices: list[int] | None = None
+        self._manager.set_callback_chunk(self._on_chunk)
+        self._logger.info(f"brainaccess eeg stream - connected to {device_name}")
+
+    def start(self) -> None:
+        for channel in self._channels:
+            self._manager.set_channel_enabled(channel, True)
+        self._manager.load_config()
+        self._manager.start_stream()
+
+        # Chunks only have the enabled channels, at positions known once the
+        # stream has started. Ones that come before that are dropped.
+        self._channel_indices = [
+            self._manager.get_channel_index(channel) for channel in self._channels
+        ]
+        self._logger.info("brainaccess eeg stream - started")
+
+    def stop(self) -> None:
+        self._manager.stop_stream()
+        self._channel_indices = None
+        self._logger.info("brainaccess eeg stream - stopped")
+
+    def close(self) -> None:
+        self._manager.destroy()
+        core.close()
+
+    def _on_chunk(self, chunk: list[NDArray[np.generic]], chunk_size: int) -> None:
+        channel_indices = self._channel_indices
+        if channel_indices is None:
+            return
+
+        # Copied out, since the chunk is only valid during the callback.
+        samples = np.empty((len(channel_indices), chunk_size), dtype=np.float32)
+        for row, channel_index in enumerate(channel_indices):
+            samples[row] = chunk[channel_index]
+
+        self._publish(samples)
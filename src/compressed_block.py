@@ -0,0 +1,334 @@
+import json
+import struct
+import sys
+import zlib
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+import mne
+import numpy as np
+from numpy.typing import NDArray
+
+COMPRESSED_BLOCK_SUFFIX = ".eegz"
+COMPRESSED_BLOCK_SIDECAR_SUFFIX = ".json"
+COMPRESSED_BLOCK_FORMAT_VERSION = 1
+
+# Byte planes with more bits of entropy per byte than this are stored as they are,
+# since zlib cannot shrink them and is slowest on exactly such data.
+INCOMPRESSIBLE_ENTROPY_BITS = 7.5
+
+_ITEM_SIZE = 4
+_PLANE_HEADER = struct.Struct("<?I")
+
+
+def _get_entropy_bits(plane: NDArray[np.uint8]) -> float:
+    probabilities = np.bincount(plane, minlength=256) / len(plane)
+    probabilities = probabilities[probabilities > 0]
+
+    return float(-(probabilities * np.log2(probabilities)).sum())
+
+
+def _encode_chunk(
+    samples: NDArray[np.float64], *, scale: float | None, compression_level: int
+) -> bytes:
+    # Consecutive samples differ mostly in their low bits, so deltas along time
+    # (XOR for floats, to stay lossless) split into byte planes leave the high
+    # planes almost constant for zlib.
+    if scale is None:
+        values = np.ascontiguousarray(samples, dtype=np.float32).view(np.uint32)
+        deltas = values.copy()
+        deltas[:, 1:] ^= values[:, :-1]
+    else:
+        scaled = np.rint(samples / scale)
+        if not np.all(np.abs(scaled) <= np.iinfo(np.int32).max):
+            raise ValueError(f"Samples do not fit 32-bit integers at scale {scale}")
+        values = scaled.astype(np.int32)
+        signed_deltas = np.diff(values, axis=1, prepend=np.int32(0))
+        # Zigzag encoding maps small negative deltas to small unsigned values, so
+        # the high byte planes hold zeros rather than sign bits.
+        deltas = ((signed_deltas << 1) ^ (signed_deltas >> 31)).view(np.uint32)
+
+    payload = bytearray()
+    for plane in deltas.view(np.uint8).reshape(-1, _ITEM_SIZE).T:
+        is_compressed = _get_entropy_bits(plane) < INCOMPRESSIBLE_ENTROPY_BITS
+        plane_bytes = plane.tobytes()
+        if is_compressed:
+            plane_bytes = zlib.compress(plane_bytes, compression_level)
+
+        payload += _PLANE_HEADER.pack(is_compressed, len(plane_bytes))
+        payload += plane_bytes
+
+    return bytes(payload)
+
+
+def _read_raw_samples(
+    raw: mne.io.BaseRaw, start: int, stop: int
+) -> NDArray[np.float64]:
+    return np.asarray(raw.get_data(start=start, stop=stop), dtype=np.float64)
+
+
+def _get_stored_samples(
+    samples: NDArray[np.float64], *, scale: float | None
+) -> NDArray[np.float32]:
+    if scale is None:
+        return samples.astype(np.float32)
+
+    return (np.rint(samples / scale).astype(np.int32) * scale).astype(np.float32)
+
+
+def _decode_chunk(
+    payload: bytes, *, channel_count: int, sample_count: int, scale: float | None
+) -> NDArray[np.float32]:
+    values = np.empty((channel_count * sample_count, _ITEM_SIZE), dtype=np.uint8)
+
+    offset = 0
+    for plane in range(_ITEM_SIZE):
+        is_compressed, length = _PLANE_HEADER.unpack_from(payload, offset)
+        offset += _PLANE_HEADER.size
+        plane_bytes = payload[offset : offset + length]
+        offset += length
+
+        values[:, plane] = np.frombuffer(
+            zlib.decompress(plane_bytes) if is_compressed else plane_bytes,
+            dtype=np.uint8,
+        )
+
+    if scale is None:
+        deltas = values.view(np.uint32).reshape(channel_count, sample_count)
+        return np.bitwise_xor.accumulate(deltas, axis=1).view(np.float32)
+
+    deltas = values.view(np.uint32).reshape(channel_count, sample_count)
+    signed_deltas = (deltas >> 1).view(np.int32) ^ -(deltas & 1).view(np.int32)
+    return (np.cumsum(signed_deltas, axis=1, dtype=np.int32) * scale).astype(np.float32)
+
+
+def write_compressed_block(
+    raw: mne.io.BaseRaw,
+    path: Path,
+    *,
+    chunk_seconds: float,
+    scale: float | None = None,
+    compression_level: int = 6,
+) -> None:
+    sampling_frequency = float(raw.info["sfreq"])
+    chunk_sample_count = max(1, int(chunk_seconds * sampling_frequency))
+    sidecar_path = path.with_suffix(COMPRESSED_BLOCK_SIDECAR_SUFFIX)
+
+    chunk_offsets: list[int] = []
+    chunk_sizes: list[int] = []
+    with open(path, "wb") as file:
+        for start in range(0, raw.n_times, chunk_sample_count):
+            stop = min(start + chunk_sample_count, raw.n_times)
+            payload = _encode_chunk(
+                _read_raw_samples(raw, start, stop),
+                scale=scale,
+                compression_level=compression_level,
+            )
+            chunk_offsets.append(file.tell())
+            chunk_sizes.append(len(payload))
+            file.write(payload)
+
+    annotations = raw.annotations
+    annotation_sample_indices = raw.time_as_index(
+        annotations.onset, use_rounding=True, origin=annotations.orig_time
+    )
+    meas_date: datetime | None = raw.info["meas_date"]
+
+    sidecar = {
+        "format_version": COMPRESSED_BLOCK_FORMAT_VERSION,
+        "channel_names": raw.ch_names,
+        "channel_types": raw.get_channel_types(),
+        "sampling_frequency": sampling_frequency,
+        "meas_date": None if meas_date is None else meas_date.isoformat(),
+        "first_sample": int(raw.first_samp),
+        "sample_count": int(raw.n_times),
+        "scale": scale,
+        "chunk_sample_count": chunk_sample_count,
+        "chunk_offsets": chunk_offsets,
+        "chunk_sizes": chunk_sizes,
+        "annotations": {
+            "sample_indices": annotation_sample_indices.tolist(),
+            "durations": annotations.duration.tolist(),
+            "descriptions": annotations.description.tolist(),
+        },
+    }
+    with open(sidecar_path, "w", encoding="utf-8") as file:
+        json.dump(sidecar, file)
+
+
+@dataclass(frozen=True, kw_only=True)
+class CompressedBlock:
+    path: Path
+    channel_names: list[str]
+    channel_types: list[str]
+    sampling_frequency: float
+    meas_date: datetime | None
+    first_sample: int
+    sample_count: int
+    scale: float | None
+    chunk_sample_count: int
+    chunk_offsets: list[int]
+    chunk_sizes: list[int]
+    annotation_sample_indices: list[int]
+    annotation_durations: list[float]
+    annotation_descriptions: list[str]
+
+    def read_samples(self, start: int, stop: int) -> NDArray[np.float32]:
+        start = max(start, 0)
+        stop = min(stop, self.sample_count)
+        samples = np.empty((len(self.channel_names), stop - start), dtype=np.float32)
+        if stop <= start:
+            return samples
+
+        first_chunk = start // self.chunk_sample_count
+        last_chunk = (stop - 1) // self.chunk_sample_count
+        with open(self.path, "rb") as file:
+            for chunk in range(first_chunk, last_chunk + 1):
+                chunk_start = chunk * self.chunk_sample_count
+                chunk_stop = min(
+                    chunk_start + self.chunk_sample_count, self.sample_count
+                )
+
+                file.seek(self.chunk_offsets[chunk])
+                chunk_samples = _decode_chunk(
+                    file.read(self.chunk_sizes[chunk]),
+                    channel_count=len(self.channel_names),
+                    sample_count=chunk_stop - chunk_start,
+                    scale=self.scale,
+                )
+
+                copy_start = max(start, chunk_start)
+                copy_stop = min(stop, chunk_stop)
+                samples[:, copy_start - start : copy_stop - start] = chunk_samples[
+                    :, copy_start - chunk_start : copy_stop - chunk_start
+                ]
+
+        return samples
+
+    def read_time_range(self, tmin: float, tmax: float) -> NDArray[np.float32]:
+        return self.read_samples(
+            int(round(tmin * self.sampling_frequency)),
+            int(round(tmax * self.sampling_frequency)) + 1,
+        )
+
+    def matches(self, raw: mne.io.BaseRaw) -> bool:
+        if (
+            self.first_sample != raw.first_samp
+            or self.sample_count != raw.n_times
+            or len(self.annotation_descriptions) != len(raw.annotations)
+        ):
+            return False
+
+        # Every chunk is decoded again and compared with what it should have
+        # stored, so a broken encoder cannot go unnoticed.
+        for start in range(0, self.sample_count, self.chunk_sample_count):
+            stop = min(start + self.chunk_sample_count, self.sample_count)
+            expected = _get_stored_samples(
+                _read_raw_samples(raw, start, stop), scale=self.scale
+            )
+            if not np.array_equal(self.read_samples(start, stop), expected):
+                return False
+
+        return True
+
+    def to_raw(self) -> mne.io.BaseRaw:
+        raw = _CompressedBlockRaw(self)
+        if self.meas_date is not None:
+            raw.set_meas_date(self.meas_date)
+        raw.set_annotations(
+            mne.Annotations(
+                onset=np.array(self.annotation_sample_indices, dtype=np.float64)
+                / self.sampling_frequency,
+                duration=self.annotation_durations,
+                description=self.annotation_descriptions,
+            )
+        )
+
+        return raw
+
+
+def read_compressed_block(path: Path) -> CompressedBlock:
+    with open(
+        path.with_suffix(COMPRESSED_BLOCK_SIDECAR_SUFFIX), encoding="utf-8"
+    ) as file:
+        sidecar: dict[str, Any] = json.load(file)
+
+    if sidecar["format_version"] != COMPRESSED_BLOCK_FORMAT_VERSION:
+        raise ValueError(
+            f"{path} has unsupported format version {sidecar['format_version']}"
+        )
+
+    return CompressedBlock(
+        path=path,
+        channel_names=sidecar["channel_names"],
+        channel_types=sidecar["channel_types"],
+        sampling_frequency=sidecar["sampling_frequency"],
+        meas_date=(
+            None
+            if sidecar["meas_date"] is None
+            else datetime.fromisoformat(sidecar["meas_date"])
+        ),
+        first_sample=sidecar["first_sample"],
+        sample_count=sidecar["sample_count"],
+        scale=sidecar["scale"],
+        chunk_sample_count=sidecar["chunk_sample_count"],
+        chunk_offsets=sidecar["chunk_offsets"],
+        chunk_sizes=sidecar["chunk_sizes"],
+        annotation_sample_indices=sidecar["annotations"]["sample_indices"],
+        annotation_durations=sidecar["annotations"]["durations"],
+        annotation_descriptions=sidecar["annotations"]["descriptions"],
+    )
+
+
+class _CompressedBlockRaw(mne.io.BaseRaw):
+    def __init__(self, block: CompressedBlock):
+        info = mne.create_info(block.channel_names, block.sampling_frequency)
+        info.set_channel_types(
+            dict(zip(block.channel_names, block.channel_types)),
+            on_unit_change="ignore",
+        )
+        super().__init__(
+            info,
+            preload=False,
+            first_samps=[block.first_sample],
+            last_samps=[block.first_sample + block.sample_count - 1],
+            filenames=[block.path],
+            raw_extras=[{"block": block}],
+            orig_format="single",
+            verbose="error",
+        )
+
+    def _read_segment_file(
+        self,
+        data: NDArray[np.float64],
+        idx: Any,
+        fi: int,
+        start: int,
+        stop: int,
+        cals: NDArray[np.float64],
+        mult: NDArray[np.float64] | None,
+    ) -> None:
+        block: CompressedBlock = self._raw_extras[fi]["block"]
+        # MNE asks for samples counted from the recording start, not the block.
+        samples = block.read_samples(
+            start - block.first_sample, stop - block.first_sample
+        )
+
+        if mult is not None:
+            data[:] = mult @ samples[idx]
+        else:
+            np.multiply(samples[idx], cals.reshape(-1, 1), out=data, casting="unsafe")
+
+
+def convert_compressed_block_to_fif(path: Path, fif_path: Path) -> None:
+    read_compressed_block(path).to_raw().save(fif_path, overwrite=True, verbose="error")
+
+
+if __name__ == "__main__":
+    for participant_path in map(Path, sys.argv[1:]):
+        for path in sorted(participant_path.glob(f"*{COMPRESSED_BLOCK_SUFFIX}")):
+            fif_path = path.with_suffix(".fif")
+            convert_compressed_block_to_fif(path, fif_path)
+            print(f"exported {fif_path}")
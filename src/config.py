@@ -4,8 +4,17 @@ from data_acquisition.gui.event_types import Key
 
 from .constants import (
     BLOCK_COUNT,
+    COMPRESSED_STORAGE_SCALE,
     CONTINUE_SCREEN_ADVANCE_KEY,
     CONTINUE_SCREEN_TEXT,
+    DISPLAY_REFRESH_RATE_HZ,
+    DO_BUILD_SEQUENCERS_LAZILY,
+    DO_DISABLE_GC_DURING_BLOCKS,
+    DO_PREFETCH_SCREENS,
+    DO_REUSE_EVENT_MANAGERS,
+    DO_USE_COMPRESSED_STORAGE,
+    DO_USE_DEADLINE_SCHEDULING,
+    DO_USE_TEXT_LAYOUT_CACHE,
     FIXATION_CROSS_TIMEOUT_RANGE_MILLIS,
     PAUSE_SCREEN_END_ANNOTATION,
     PAUSE_SCREEN_START_ANNOTATION,
@@ -14,11 +23,14 @@ from .constants import (
     RELAX_SCREEN_END_ANNOTATION,
     RELAX_SCREEN_START_ANNOTATION,
     RELAX_SCREEN_TIMEOUT_MILLIS,
+    SENTENCE_LENGTH_STRATUM_COUNT,
     SENTENCE_SCREEN_ADVANCE_KEY,
     SENTENCE_SCREEN_END_ANNOTATION,
     SENTENCE_SCREEN_START_ANNOTATION,
     SENTENCE_SCREEN_TIMEOUT_MILLIS,
     SENTENCES_IN_BLOCK_COUNT,
+    SESSION_PLAN_SEED,
+    SPARE_TRIALS_IN_BLOCK_COUNT,
 )
 
 fixation_cross_timeout_range_start_millis, fixation_cross_timeout_range_end_millis = (
@@ -30,6 +42,20 @@ fixation_cross_timeout_range_start_millis, fixation_cross_timeout_range_end_mill
 class Config:
     block_count: int = BLOCK_COUNT
     sentence_count: int = SENTENCES_IN_BLOCK_COUNT
+    spare_trial_count: int = SPARE_TRIALS_IN_BLOCK_COUNT
+
+    seed: int | None = SESSION_PLAN_SEED
+    sentence_length_stratum_count: int = SENTENCE_LENGTH_STRATUM_COUNT
+    do_prefetch_screens: bool = DO_PREFETCH_SCREENS
+    do_reuse_event_managers: bool = DO_REUSE_EVENT_MANAGERS
+    do_disable_gc_during_blocks: bool = DO_DISABLE_GC_DURING_BLOCKS
+    do_build_sequencers_lazily: bool = DO_BUILD_SEQUENCERS_LAZILY
+    do_use_deadline_scheduling: bool = DO_USE_DEADLINE_SCHEDULING
+    display_refresh_rate_hz: float = DISPLAY_REFRESH_RATE_HZ
+    do_use_text_layout_cache: bool = DO_USE_TEXT_LAYOUT_CACHE
+
+    do_use_compressed_storage: bool = DO_USE_COMPRESSED_STORAGE
+    compressed_storage_scale: float | None = COMPRESSED_STORAGE_SCALE
 
     do_show_continue_screen: bool = True
     continue_screen_text: str = CONTINUE_SCREEN_TEXT
@@ -10,11 +10,61 @@ SURVEY_PARTICIPANT_ID_KEY = "participant_id"
 LOGGING_LEVEL = logging.INFO
 LOGGING_MESSAGE_FORMAT = "%(asctime)s.%(msecs)03d - %(message)s"
 LOGGING_DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+LOGGING_QUEUE_BATCH_SIZE = 256
+EVENT_LOG_FIELDS = ("event", "block", "trial", "sentence_id")
 
 BLOCK_COUNT = 6
 DEBUG_BLOCK_COUNT = 2
 SENTENCES_IN_BLOCK_COUNT = 50
 DEBUG_SENTENCES_IN_BLOCK_COUNT = 3
+# Planned after a block's sentences and shown in place of trials cut off by a pause.
+SPARE_TRIALS_IN_BLOCK_COUNT = 5
+
+FRAMEWORK_DISTRIBUTION_NAME = "data-acquisition-framework"
+
+SESSION_PLAN_SEED = None
+SENTENCE_LENGTH_STRATUM_COUNT = 1
+
+# Constructing a TextScreen is not known to render it, so prefetching is off
+# until the sentence onset latency logged at each block end shows it helps.
+DO_PREFETCH_SCREENS = False
+# Reused event managers rely on the framework re-arming them for every screen
+# they are shown with, which is not verified yet, so they are cloned by default.
+DO_REUSE_EVENT_MANAGERS = False
+DO_DISABLE_GC_DURING_BLOCKS = False
+DO_BUILD_SEQUENCERS_LAZILY = False
+
+# Timed screens are scheduled against absolute onsets on the display's frame
+# grid, see src/deadline_scheduler.py.
+DO_USE_DEADLINE_SCHEDULING = False
+DISPLAY_REFRESH_RATE_HZ = 60
+DEADLINE_LATENCY_ESTIMATE_WEIGHT = 0.2
+
+DEBUG_WINDOW_SIZE = (800, 600)
+
+# Sentences are handed to TextScreen already broken into lines, laid out ahead
+# of time for the display, see src/text_layout_cache.py. The font has to match
+# the one TextScreen renders with, None being the pygame default font.
+DO_USE_TEXT_LAYOUT_CACHE = False
+# Versions of the framework whose TextScreen has been checked to keep the line
+# breaks and to render with the font below. The cache refuses to run on others.
+TEXT_LAYOUT_VERIFIED_FRAMEWORK_VERSIONS: tuple[str, ...] = ()
+TEXT_LAYOUT_FONT_NAME: str | None = None
+TEXT_LAYOUT_FONT_SIZE = 48
+TEXT_LAYOUT_MAX_LINE_WIDTH_RATIO = 0.8
+TEXT_LAYOUT_CACHE_DIR_PATH = Path(__file__).parent / "assets" / ".text_layouts"
+TEXT_LAYOUT_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+# Imported in the background during the survey when fast startup is used,
+# relative names are resolved against this package.
+STARTUP_WARM_UP_MODULES = (
+    "mne",
+    "data_acquisition.gui",
+    "data_acquisition.screens",
+    "data_acquisition.experiment_runner",
+    ".app_sequencer_builder",
+    ".background_saving_headset",
+)
 
 NON_SENTENCE_SCREEN_BACKGROUND_COLOR = Color("black")
 NON_SENTENCE_SCREEN_TEXT_COLOR = Color("white")
@@ -41,3 +91,97 @@ PAUSE_UNPAUSE_KEY = Key.ESCAPE
 PAUSE_SCREEN_TEXT = "Naciśnij ESCAPE, aby kontynuować badanie."
 PAUSE_SCREEN_START_ANNOTATION = "PAUSE_START"
 PAUSE_SCREEN_END_ANNOTATION = "PAUSE_END"
+
+BACKGROUND_SAVE_MAX_PENDING_COUNT = 2
+
+# Blocks are kept as chunked, zlib-compressed arrays instead of FIF files, see
+# src/compressed_block.py. Without a scale samples are stored losslessly as
+# float32, with one they are rounded to integer multiples of it (in volts).
+DO_USE_COMPRESSED_STORAGE = False
+COMPRESSED_STORAGE_SCALE: float | None = None
+COMPRESSED_STORAGE_CHUNK_SECONDS = 10
+COMPRESSED_STORAGE_COMPRESSION_LEVEL = 1
+ANNOTATION_BUFFER_CAPACITY = 1024
+
+STREAMING_CHUNK_SAMPLE_COUNT = 250
+STREAMING_SEGMENT_DIR_PATH = Path("data") / ".segments"
+
+MOCK_EEG_CHANNEL_NAMES = [
+    "P8",
+    "O2",
+    "P4",
+    "C4",
+    "F8",
+    "F4",
+    "Oz",
+    "Cz",
+    "Fz",
+    "Pz",
+    "F3",
+    "O1",
+    "P7",
+    "C3",
+    "P3",
+    "F7",
+    "T8",
+    "FC6",
+    "CP6",
+    "CP2",
+    "PO4",
+    "FC2",
+    "AF4",
+    "POz",
+    "AFz",
+    "AF3",
+    "FC1",
+    "FC5",
+    "T7",
+    "CP1",
+    "CP5",
+    "PO3",
+]
+MOCK_EEG_SAMPLING_FREQUENCY = 250
+MOCK_EEG_CHUNK_SAMPLE_COUNT = 10
+MOCK_EEG_NOISE_AMPLITUDE = 10.0
+MOCK_EEG_LINE_NOISE_AMPLITUDE = 5.0
+MOCK_EEG_LINE_NOISE_FREQUENCY = 50
+
+SHARED_MEMORY_STREAM_NAME = "experiment_eeg"
+SHARED_MEMORY_STREAM_CAPACITY_SECONDS = 60
+SHARED_MEMORY_STREAM_ANNOTATION_CAPACITY = 4096
+
+MULTI_STATION_RUNS_DIR_PATH = Path("stations")
+MULTI_STATION_DASHBOARD_INTERVAL_SECONDS = 5
+# Raising priority needs root or CAP_SYS_NICE, so without them the stations
+# stay at the default, but the launcher can always lower its own.
+MULTI_STATION_STATION_NICE_INCREMENT = -5
+MULTI_STATION_LAUNCHER_NICE_INCREMENT = 5
+MULTI_STATION_TIMING_METRICS = (
+    ("fixation_cross", "timeout_drift_ms"),
+    ("fixation_cross", "onset_error_ms"),
+    ("sentence", "show_latency_ms"),
+    ("sentence", "onset_after_previous_event_ms"),
+)
+MULTI_STATION_TIMING_STATISTICS = ("std", "p99")
+# Onsets are quantized to frames, so smaller differences are mostly noise.
+MULTI_STATION_TIMING_TOLERANCE_MILLIS = 1000 / DISPLAY_REFRESH_RATE_HZ / 2
+
+SIGNAL_QUALITY_WINDOW_SAMPLE_COUNT = 250
+SIGNAL_QUALITY_UPDATE_INTERVAL_SAMPLE_COUNT = 125
+SIGNAL_QUALITY_LINE_NOISE_FREQUENCY = 50
+SIGNAL_QUALITY_FLAT_PEAK_TO_PEAK = 1.0
+SIGNAL_QUALITY_MAX_RMS = 100.0
+SIGNAL_QUALITY_MAX_LINE_NOISE_POWER = 50.0
+SIGNAL_QUALITY_SUMMARY_TEXT = (
+    "Jakość sygnału - płaskie: {flat}; zaszumione: {noisy}; 50 Hz: {line_noise}"
+)
+SIGNAL_QUALITY_NO_BAD_CHANNELS_TEXT = "brak"
+
+SIMULATION_KEY_PRESS_PROBABILITY = 0.7
+SIMULATION_PAUSE_PROBABILITY = 0.01
+SIMULATION_REACTION_TIME_MEDIAN_MILLIS = 1500
+SIMULATION_REACTION_TIME_SIGMA = 0.4
+SIMULATION_FRAMEWORK_VERSION = "0.5.0"
+
+TIMING_REPORT_PERCENTILES = (50, 90, 99)
+TIMING_RECORDER_EXTRA_SCREEN_COUNT_PER_BLOCK = 16
@@ -0,0 +1,131 @@
+import time
+from collections.abc import Callable
+
+from .constants import DEADLINE_LATENCY_ESTIMATE_WEIGHT
+from .timing_recorder import UNSET, EventSource, TimingRecorder
+
+
+class DeadlineScheduler:
+    def __init__(
+        self,
+        *,
+        timing_recorder: TimingRecorder,
+        refresh_rate_hz: float,
+        latency_estimate_weight: float = DEADLINE_LATENCY_ESTIMATE_WEIGHT,
+        clock: Callable[[], int] = time.perf_counter_ns,
+    ):
+        self._timing_recorder = timing_recorder
+        self._clock = clock
+        self._frame_ns = 1e9 / refresh_rate_hz
+        self._latency_estimate_weight = latency_estimate_weight
+
+        self._next_onset_ns: int | None = None
+        self._late_ns = 0
+        self._anchor_row = UNSET
+        self._show_latency_ns: float | None = None
+        self._switch_latency_ns: float | None = None
+        # Whatever the latencies do not explain, e.g. how the framework rounds
+        # timeouts to frames, shows up as onset error and is corrected for.
+        self._onset_error_ns = 0.0
+
+    def schedule(self, row: int, duration_millis: int) -> int:
+        now_ns = self._clock()
+
+        # Onsets are planned from the previous plan rather than from when screens
+        # were actually shown, so overheads do not add up over a block. Without
+        # a plan, e.g. after a key press, the chain starts again from this
+        # screen's onset, once it is known.
+        if self._next_onset_ns is None:
+            planned_onset_ns = now_ns + round(self._show_latency_ns or 0)
+            self._anchor_row = row
+        else:
+            planned_onset_ns = self._next_onset_ns
+        self._timing_recorder.mark_planned(row, planned_onset_ns)
+        duration_frame_count = self._get_frame_count(duration_millis)
+        self._next_onset_ns = planned_onset_ns + round(
+            duration_frame_count * self._frame_ns
+        )
+
+        # The timeout runs from when this screen is shown until the next one is
+        # requested, after which that one still has to be shown. It is cut to
+        # whole frames, so the next screen waits for the flip at its onset.
+        timeout_ns = (
+            self._next_onset_ns
+            - now_ns
+            - 2 * (self._show_latency_ns or 0)
+            - (self._switch_latency_ns or 0)
+            - self._onset_error_ns
+        )
+        timeout_frame_count = min(
+            int(timeout_ns // self._frame_ns), duration_frame_count
+        )
+
+        # A screen is never cut by more than a frame to catch up with the plan.
+        # Whatever lateness that leaves moves the rest of the chain back, and
+        # is only dropped once the chain starts again.
+        min_timeout_frame_count = max(0, duration_frame_count - 1)
+        if timeout_frame_count < min_timeout_frame_count:
+            late_ns = round(min_timeout_frame_count * self._frame_ns - timeout_ns)
+            self._next_onset_ns += late_ns
+            self._late_ns += late_ns
+            timeout_frame_count = min_timeout_frame_count
+
+        return self._get_timeout_millis(timeout_frame_count)
+
+    def get_timeouts_millis(self, duration_millis: int) -> list[int]:
+        duration_frame_count = self._get_frame_count(duration_millis)
+
+        return [
+            self._get_timeout_millis(timeout_frame_count)
+            for timeout_frame_count in range(
+                max(0, duration_frame_count - 1), duration_frame_count + 1
+            )
+        ]
+
+    def get_millis_after_plan(self) -> float:
+        if self._next_onset_ns is None:
+            return 0.0
+
+        return (self._clock() - self._next_onset_ns + self._late_ns) / 1e6
+
+    def reset(self) -> None:
+        self._next_onset_ns = None
+        self._late_ns = 0
+
+    def observe(self, row: int) -> None:
+        records = self._timing_recorder.records
+        record = records[row]
+        if row == self._anchor_row and self._next_onset_ns is not None:
+            self._next_onset_ns += int(record["shown_ns"] - record["planned_ns"])
+            self._timing_recorder.mark_planned(row, int(record["shown_ns"]))
+            self._anchor_row = UNSET
+        elif record["planned_ns"] != UNSET:
+            self._onset_error_ns = self._update_estimate(
+                self._onset_error_ns, record["shown_ns"] - record["planned_ns"]
+            )
+
+        self._show_latency_ns = self._update_estimate(
+            self._show_latency_ns, record["shown_ns"] - record["requested_ns"]
+        )
+
+        previous = records[row - 1] if row > 0 else None
+        if (
+            previous is not None
+            and previous["event_source"] == EventSource.TIMEOUT
+            and previous["event_ns"] != UNSET
+        ):
+            self._switch_latency_ns = self._update_estimate(
+                self._switch_latency_ns, record["requested_ns"] - previous["event_ns"]
+            )
+
+    def _update_estimate(self, estimate_ns: float | None, value_ns: int) -> float:
+        if estimate_ns is None:
+            return float(value_ns)
+
+        return estimate_ns + self._latency_estimate_weight * (value_ns - estimate_ns)
+
+    def _get_frame_count(self, duration_millis: int) -> int:
+        return round(duration_millis * 1_000_000 / self._frame_ns)
+
+    def _get_timeout_millis(self, frame_count: int) -> int:
+        return int(frame_count * self._frame_ns) // 1_000_000
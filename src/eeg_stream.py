@@ -0,0 +1,120 @@
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections.abc import Callable
+from logging import Logger
+
+import numpy as np
+from numpy.typing import NDArray
+
+from .constants import (
+    MOCK_EEG_CHANNEL_NAMES,
+    MOCK_EEG_CHUNK_SAMPLE_COUNT,
+    MOCK_EEG_LINE_NOISE_AMPLITUDE,
+    MOCK_EEG_LINE_NOISE_FREQUENCY,
+    MOCK_EEG_NOISE_AMPLITUDE,
+    MOCK_EEG_SAMPLING_FREQUENCY,
+)
+
+SamplesListener = Callable[[NDArray[np.float32]], None]
+
+
+class EEGStream(ABC):
+    def __init__(self, *, channel_names: list[str], sampling_frequency: int):
+        self.channel_names = channel_names
+        self.sampling_frequency = sampling_frequency
+
+        self._listeners: list[SamplesListener] = []
+        self._sample_count = 0
+
+    @property
+    def sample_count(self) -> int:
+        return self._sample_count
+
+    def subscribe(self, listener: SamplesListener) -> None:
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener: SamplesListener) -> None:
+        self._listeners.remove(listener)
+
+    @abstractmethod
+    def start(self) -> None: ...
+
+    @abstractmethod
+    def stop(self) -> None: ...
+
+    def close(self) -> None:
+        pass
+
+    def _publish(self, samples: NDArray[np.float32]) -> None:
+        self._sample_count += samples.shape[1]
+
+        for listener in self._listeners:
+            listener(samples)
+
+
+class MockEEGStream(EEGStream):
+    def __init__(
+        self,
+        *,
+        logger: Logger,
+        channel_names: list[str] = MOCK_EEG_CHANNEL_NAMES,
+        sampling_frequency: int = MOCK_EEG_SAMPLING_FREQUENCY,
+        chunk_sample_count: int = MOCK_EEG_CHUNK_SAMPLE_COUNT,
+        seed: int | None = None,
+    ):
+        super().__init__(
+            channel_names=channel_names, sampling_frequency=sampling_frequency
+        )
+
+        self._logger = logger
+        self._chunk_sample_count = chunk_sample_count
+        self._rng = np.random.default_rng(seed)
+
+        self._thread: threading.Thread | None = None
+        self._stop_event = threading.Event()
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._generate_in_real_time, name="mock-eeg-stream", daemon=True
+        )
+        self._thread.start()
+        self._logger.info("mock eeg stream - started")
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+
+        self._stop_event.set()
+        self._thread.join()
+        self._thread = None
+        self._logger.info("mock eeg stream - stopped")
+
+    def generate(self, sample_count: int) -> None:
+        time_seconds = (
+            np.arange(self._sample_count, self._sample_count + sample_count)
+            / self.sampling_frequency
+        )
+        line_noise = MOCK_EEG_LINE_NOISE_AMPLITUDE * np.sin(
+            2 * np.pi * MOCK_EEG_LINE_NOISE_FREQUENCY * time_seconds
+        )
+
+        samples = self._rng.standard_normal(
+            size=(len(self.channel_names), sample_count), dtype=np.float32
+        )
+        samples *= MOCK_EEG_NOISE_AMPLITUDE
+        samples += line_noise.astype(np.float32)
+
+        self._publish(samples)
+
+    def _generate_in_real_time(self) -> None:
+        chunk_duration_seconds = self._chunk_sample_count / self.sampling_frequency
+        next_chunk_at = time.perf_counter() + chunk_duration_seconds
+
+        while not self._stop_event.wait(max(0, next_chunk_at - time.perf_counter())):
+            self.generate(self._chunk_sample_count)
+            next_chunk_at += chunk_duration_seconds
@@ -0,0 +1,166 @@
+import atexit
+import json
+import logging
+import queue
+import threading
+import time
+from collections.abc import Callable
+from logging.handlers import QueueHandler
+from pathlib import Path
+
+from .constants import (
+    EVENT_LOG_FIELDS,
+    LOGGING_DATETIME_FORMAT,
+    LOGGING_MESSAGE_FORMAT,
+    LOGGING_QUEUE_BATCH_SIZE,
+)
+
+
+class EventQueueHandler(QueueHandler):
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The listener runs in this process, so the record can go on the queue as
+        # is and all formatting is left to the listener thread.
+        record.timestamp_ns = time.time_ns()
+        record.perf_counter_ns = time.perf_counter_ns()
+
+        return record
+
+
+class JsonLinesFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        event = {
+            "timestamp_ns": getattr(record, "timestamp_ns", int(record.created * 1e9)),
+            "perf_counter_ns": getattr(record, "perf_counter_ns", None),
+            "level": record.levelname,
+            "thread": record.threadName,
+            "message": record.getMessage(),
+        }
+        for field in EVENT_LOG_FIELDS:
+            if hasattr(record, field):
+                event[field] = getattr(record, field)
+        if record.exc_info:
+            event["exception"] = self.formatException(record.exc_info)
+
+        return json.dumps(event, ensure_ascii=False)
+
+
+class BatchFileHandler(logging.FileHandler):
+    def emit(self, record: logging.LogRecord) -> None:
+        if self.stream is None:
+            self.stream = self._open()
+
+        try:
+            self.stream.write(self.format(record) + self.terminator)
+        except Exception:
+            self.handleError(record)
+
+
+class EventLogListener:
+    def __init__(
+        self,
+        *,
+        log_queue: queue.SimpleQueue[logging.LogRecord | None],
+        level: int,
+        batch_size: int = LOGGING_QUEUE_BATCH_SIZE,
+        tear_down: Callable[[], None] | None = None,
+    ):
+        self._queue = log_queue
+        self._level = level
+        self._batch_size = batch_size
+        self._tear_down = tear_down
+
+        self._handlers: list[logging.Handler] = []
+        self._thread: threading.Thread | None = None
+
+    @property
+    def is_started(self) -> bool:
+        return self._thread is not None
+
+    def start(self, *, log_path: Path, event_log_path: Path) -> None:
+        # Whatever was logged before this waited on the queue and goes to the
+        # files first.
+        self._handlers = _build_handlers(
+            log_path=log_path, event_log_path=event_log_path, level=self._level
+        )
+        self._thread = threading.Thread(
+            target=self._write_batches, name="event-log", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._tear_down is not None:
+            self._tear_down()
+            self._tear_down = None
+
+        if self._thread is None:
+            return
+
+        self._queue.put(None)
+        self._thread.join()
+        self._thread = None
+
+        for handler in self._handlers:
+            handler.close()
+
+    def _write_batches(self) -> None:
+        is_stopped = False
+        while not is_stopped:
+            batch = [self._queue.get()]
+            while len(batch) < self._batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            for handler in self._handlers:
+                for record in batch:
+                    if record is None:
+                        is_stopped = True
+                    elif record.levelno >= handler.level:
+                        handler.handle(record)
+                handler.flush()
+
+
+def _build_handlers(
+    *, log_path: Path, event_log_path: Path, level: int
+) -> list[logging.Handler]:
+    handler = BatchFileHandler(log_path, encoding="utf-8")
+    handler.setLevel(level)
+    handler.setFormatter(
+        logging.Formatter(LOGGING_MESSAGE_FORMAT, datefmt=LOGGING_DATETIME_FORMAT)
+    )
+
+    event_handler = BatchFileHandler(event_log_path, encoding="utf-8")
+    event_handler.setLevel(level)
+    event_handler.setFormatter(JsonLinesFormatter())
+
+    return [handler, event_handler]
+
+
+def set_up_event_logging(*, logger: logging.Logger, level: int) -> EventLogListener:
+    log_queue: queue.SimpleQueue[logging.LogRecord | None] = queue.SimpleQueue()
+
+    queue_handler = EventQueueHandler(log_queue)
+    previous_excepthook = threading.excepthook
+
+    def log_thread_exception(args: threading.ExceptHookArgs) -> None:
+        logger.error(
+            f"uncaught exception in thread {args.thread.name if args.thread else ''}",
+            exc_info=args.exc_value,
+        )
+        previous_excepthook(args)
+
+    def tear_down() -> None:
+        logger.removeHandler(queue_handler)
+        # Left alone if something else has replaced it in the meantime.
+        if threading.excepthook is log_thread_exception:
+            threading.excepthook = previous_excepthook
+
+    listener = EventLogListener(log_queue=log_queue, level=level, tear_down=tear_down)
+    atexit.register(listener.stop)
+
+    logger.setLevel(level)
+    logger.addHandler(queue_handler)
+    threading.excepthook = log_thread_exception
+
+    return listener
@@ -0,0 +1,10 @@
+from importlib.metadata import PackageNotFoundError, version
+
+from .constants import FRAMEWORK_DISTRIBUTION_NAME
+
+
+def get_framework_version() -> str | None:
+    try:
+        return version(FRAMEWORK_DISTRIBUTION_NAME)
+    except PackageNotFoundError:
+        return None
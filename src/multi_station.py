@@ -0,0 +1,427 @@
+import json
+import logging
+import multiprocessing
+import multiprocessing.connection
+import multiprocessing.process
+import os
+import re
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from .constants import (
+    MULTI_STATION_DASHBOARD_INTERVAL_SECONDS,
+    MULTI_STATION_LAUNCHER_NICE_INCREMENT,
+    MULTI_STATION_STATION_NICE_INCREMENT,
+    MULTI_STATION_TIMING_METRICS,
+    MULTI_STATION_TIMING_STATISTICS,
+    MULTI_STATION_TIMING_TOLERANCE_MILLIS,
+    SHARED_MEMORY_STREAM_NAME,
+)
+
+_STATION_NAME_PATTERN = re.compile(r"[A-Za-z0-9_-]+")
+
+
+@dataclass(frozen=True, kw_only=True)
+class Station:
+    name: str
+    brainaccess_cap_name: str
+    participant_id: str
+
+
+def load_stations(path: Path) -> list[Station]:
+    with open(path, encoding="utf-8") as file:
+        stations = [Station(**station) for station in json.load(file)]
+
+    for station in stations:
+        if _STATION_NAME_PATTERN.fullmatch(station.name) is None:
+            raise ValueError(
+                f"Station name {station.name!r} can only contain letters, digits, "
+                "_ and -"
+            )
+    for attribute in ("name", "brainaccess_cap_name", "participant_id"):
+        values = [getattr(station, attribute) for station in stations]
+        if len(set(values)) != len(values):
+            raise ValueError(f"Every station needs its own {attribute}")
+
+    return stations
+
+
+def get_station_cpu_cores(station_count: int) -> list[set[int]]:
+    if not hasattr(os, "sched_getaffinity"):
+        return [set() for _ in range(station_count)]
+
+    # Every station gets its own contiguous group of cores. With fewer cores
+    # than stations, they are shared round-robin.
+    cores = sorted(os.sched_getaffinity(0))
+    if len(cores) < station_count:
+        return [{cores[index % len(cores)]} for index in range(station_count)]
+
+    return [
+        {int(core) for core in group}
+        for group in np.array_split(np.array(cores), station_count)
+    ]
+
+
+def _set_priority(increment: int, logger: logging.Logger) -> None:
+    if not hasattr(os, "nice"):
+        logger.warning("multi-station - process priority not supported")
+        return
+
+    # On Linux, the I/O priority of a process follows its nice value unless it
+    # is set explicitly, so this covers the acquisition I/O as well.
+    # Raising it needs root or CAP_SYS_NICE.
+    try:
+        os.nice(increment)
+    except PermissionError:
+        logger.warning(
+            f"multi-station - not permitted to change nice by {increment}, "
+            "which needs root"
+        )
+
+
+def _run_station(
+    *,
+    station: Station,
+    station_path: Path,
+    cpu_cores: set[int],
+    nice_increment: int,
+    run_kwargs: dict[str, bool],
+) -> None:
+    logger = logging.getLogger()
+
+    if cpu_cores:
+        os.sched_setaffinity(0, cpu_cores)
+    else:
+        logger.warning(f"multi-station - {station.name} not pinned to cpu cores")
+    _set_priority(nice_increment, logger)
+
+    # Logs and data are written relative to the working directory, which
+    # keeps the stations apart.
+    station_path.mkdir(parents=True, exist_ok=True)
+    os.chdir(station_path)
+
+    from .run import run
+
+    run(
+        brainaccess_cap_name=station.brainaccess_cap_name,
+        participant_id=station.participant_id,
+        shared_memory_stream_name=f"{SHARED_MEMORY_STREAM_NAME}_{station.name}",
+        **run_kwargs,
+    )
+
+
+@dataclass(kw_only=True)
+class _StationState:
+    event_log_path: Path
+    offset: int = 0
+    block: int | None = None
+    trial_count: int = 0
+    abs_onset_errors_ms: list[float] = field(default_factory=list[float])
+    warning_count: int = 0
+    error_count: int = 0
+    signal_quality: str = ""
+    last_event_timestamp_ns: int | None = None
+    exit_code: int | None = None
+
+
+class StationDashboard:
+    def __init__(self, *, stations: list[Station], station_paths: dict[str, Path]):
+        self._stations = stations
+        self._station_paths = station_paths
+        self._states = {
+            station.name: _StationState(
+                event_log_path=station_paths[station.name]
+                / "logs"
+                / f"{station.participant_id}.events.jsonl"
+            )
+            for station in stations
+        }
+
+    def set_exit_code(self, station_name: str, exit_code: int | None) -> None:
+        self._states[station_name].exit_code = exit_code
+
+    def update(self) -> None:
+        for state in self._states.values():
+            for event in self._read_new_events(state):
+                self._apply_event(state, event)
+
+    def get_snapshot(self) -> dict[str, dict[str, Any]]:
+        now_ns = time.time_ns()
+
+        return {
+            name: {
+                "status": self._get_status(state.exit_code),
+                "block": state.block,
+                "trial_count": state.trial_count,
+                "mean_abs_onset_error_ms": (
+                    float(np.mean(state.abs_onset_errors_ms))
+                    if state.abs_onset_errors_ms
+                    else None
+                ),
+                "max_abs_onset_error_ms": (
+                    max(state.abs_onset_errors_ms)
+                    if state.abs_onset_errors_ms
+                    else None
+                ),
+                "warning_count": state.warning_count,
+                "error_count": state.error_count,
+                "signal_quality": state.signal_quality,
+                "seconds_since_last_event": (
+                    None
+                    if state.last_event_timestamp_ns is None
+                    else (now_ns - state.last_event_timestamp_ns) / 1e9
+                ),
+            }
+            for name, state in self._states.items()
+        }
+
+    def render(self) -> str:
+        lines = [
+            f"{'station':<16} {'status':<12} {'block':>5} {'trials':>6} "
+            f"{'onset err':>10} {'warn':>5} {'err':>4} {'idle s':>7}  signal quality"
+        ]
+        for name, snapshot in self.get_snapshot().items():
+            lines.append(
+                f"{name:<16} {snapshot['status']:<12} "
+                f"{_format(snapshot['block'], 'd'):>5} "
+                f"{snapshot['trial_count']:>6} "
+                f"{_format(snapshot['max_abs_onset_error_ms'], '.2f'):>10} "
+                f"{snapshot['warning_count']:>5} {snapshot['error_count']:>4} "
+                f"{_format(snapshot['seconds_since_last_event'], '.1f'):>7}  "
+                f"{snapshot['signal_quality'] or '-'}"
+            )
+
+        return "\n".join(lines)
+
+    def summarize_timing(self) -> dict[str, dict[str, dict[str, float | None]]]:
+        # A station without a report would otherwise pass any comparison.
+        report_paths = {
+            station.name: self._station_paths[station.name]
+            / "data"
+            / station.participant_id
+            / "timing_report.json"
+            for station in self._stations
+        }
+        missing_names = [
+            name
+            for name, report_path in report_paths.items()
+            if not report_path.exists()
+        ]
+        if missing_names:
+            raise FileNotFoundError(f"No timing report from {', '.join(missing_names)}")
+
+        summary: dict[str, dict[str, dict[str, float | None]]] = {}
+        for name, report_path in report_paths.items():
+            with open(report_path, encoding="utf-8") as file:
+                summary[name] = summarize_timing_report(json.load(file))
+
+        return summary
+
+    @staticmethod
+    def _get_status(exit_code: int | None) -> str:
+        if exit_code is None:
+            return "running"
+
+        return "done" if exit_code == 0 else f"failed ({exit_code})"
+
+    @staticmethod
+    def _read_new_events(state: _StationState) -> list[dict[str, Any]]:
+        if not state.event_log_path.exists():
+            return []
+
+        with open(state.event_log_path, "rb") as file:
+            file.seek(state.offset)
+            data = file.read()
+
+        # The station may be in the middle of writing the last line.
+        data = data[: data.rfind(b"\n") + 1]
+        state.offset += len(data)
+
+        return [json.loads(line) for line in data.splitlines() if line]
+
+    @staticmethod
+    def _apply_event(state: _StationState, event: dict[str, Any]) -> None:
+        state.last_event_timestamp_ns = event["timestamp_ns"]
+        if event["level"] == "WARNING":
+            state.warning_count += 1
+        elif event["level"] in ("ERROR", "CRITICAL"):
+            state.error_count += 1
+
+        if event.get("block") is not None:
+            state.block = event["block"]
+
+        match event.get("event"):
+            case "sentence_start":
+                state.trial_count += 1
+            case "onset_error":
+                state.abs_onset_errors_ms.append(
+                    abs(float(event["message"].split(" - ")[1].removesuffix(" ms")))
+                )
+            case "signal_quality":
+                state.signal_quality = event["message"].split(" - ", 1)[1]
+            case _:
+                pass
+
+
+def summarize_timing_report(
+    report: dict[str, Any],
+) -> dict[str, dict[str, float | None]]:
+    # The worst block counts, since that is where concurrent load would show.
+    summary: dict[str, dict[str, float | None]] = {}
+    for screen_type, metric in MULTI_STATION_TIMING_METRICS:
+        descriptions = [
+            block_report[screen_type][metric]
+            for block_report in report.values()
+            if screen_type in block_report
+            and block_report[screen_type][metric] is not None
+        ]
+        summary[f"{screen_type}.{metric}"] = {
+            statistic: (
+                max(description[statistic] for description in descriptions)
+                if descriptions
+                else None
+            )
+            for statistic in MULTI_STATION_TIMING_STATISTICS
+        }
+
+    return summary
+
+
+def compare_timing(
+    summary: dict[str, dict[str, dict[str, float | None]]],
+    baseline: dict[str, dict[str, dict[str, float | None]]],
+    tolerance_millis: float = MULTI_STATION_TIMING_TOLERANCE_MILLIS,
+) -> list[str]:
+    regressions: list[str] = []
+    for screen_type, metric_name in MULTI_STATION_TIMING_METRICS:
+        metric = f"{screen_type}.{metric_name}"
+        for statistic in MULTI_STATION_TIMING_STATISTICS:
+            baseline_value = _get_worst(baseline, metric, statistic)
+            value = _get_worst(summary, metric, statistic)
+            if baseline_value is None or value is None:
+                continue
+
+            if value - baseline_value > tolerance_millis:
+                regressions.append(
+                    f"{metric} {statistic}: {value:.3f} ms, "
+                    f"baseline {baseline_value:.3f} ms"
+                )
+
+    return regressions
+
+
+def _get_worst(
+    summary: dict[str, dict[str, dict[str, float | None]]],
+    metric: str,
+    statistic: str,
+) -> float | None:
+    values = [
+        value
+        for station_summary in summary.values()
+        if (value := station_summary[metric][statistic]) is not None
+    ]
+
+    return max(values) if values else None
+
+
+def _format(value: float | None, format_spec: str) -> str:
+    return "-" if value is None else format(value, format_spec)
+
+
+class MultiStationLauncher:
+    def __init__(
+        self,
+        *,
+        stations: list[Station],
+        run_path: Path,
+        run_kwargs: dict[str, bool],
+        logger: logging.Logger,
+        dashboard_interval_seconds: float = MULTI_STATION_DASHBOARD_INTERVAL_SECONDS,
+        station_nice_increment: int = MULTI_STATION_STATION_NICE_INCREMENT,
+        launcher_nice_increment: int = MULTI_STATION_LAUNCHER_NICE_INCREMENT,
+    ):
+        # The framework opens its fullscreen window on the default display and
+        # reads every key press, so stations would share one screen and keyboard.
+        if not (
+            run_kwargs.get("do_use_simulation") or run_kwargs.get("do_use_debug_mode")
+        ):
+            raise ValueError(
+                "Stations can only run simulated or windowed, since they cannot be "
+                "given a display and keyboard of their own"
+            )
+
+        self._stations = stations
+        self._run_path = run_path
+        self._run_kwargs = run_kwargs
+        self._logger = logger
+        self._dashboard_interval_seconds = dashboard_interval_seconds
+        self._station_nice_increment = station_nice_increment
+        self._launcher_nice_increment = launcher_nice_increment
+
+        self._station_paths = {
+            station.name: (run_path / station.name).resolve() for station in stations
+        }
+        self.dashboard = StationDashboard(
+            stations=stations, station_paths=self._station_paths
+        )
+
+    def run(self) -> dict[str, int | None]:
+        # Spawned, so that no station inherits another one's threads, logging
+        # or display state.
+        context = multiprocessing.get_context("spawn")
+        processes: dict[str, multiprocessing.process.BaseProcess] = {}
+        for station, cpu_cores in zip(
+            self._stations, get_station_cpu_cores(len(self._stations))
+        ):
+            process = context.Process(
+                target=_run_station,
+                name=f"station-{station.name}",
+                kwargs={
+                    "station": station,
+                    "station_path": self._station_paths[station.name],
+                    "cpu_cores": cpu_cores,
+                    "nice_increment": self._station_nice_increment,
+                    "run_kwargs": self._run_kwargs,
+                },
+            )
+            process.start()
+            processes[station.name] = process
+            self._logger.info(
+                f"multi-station - started {station.name} (pid {process.pid}) on "
+                f"cores {sorted(cpu_cores)}"
+            )
+
+        # Lowered only now, so that the stations do not inherit it.
+        _set_priority(self._launcher_nice_increment, self._logger)
+
+        try:
+            while running := [
+                process.sentinel for process in processes.values() if process.is_alive()
+            ]:
+                multiprocessing.connection.wait(
+                    running, timeout=self._dashboard_interval_seconds
+                )
+                self._refresh_dashboard(processes)
+        finally:
+            for process in processes.values():
+                process.join()
+
+        # The last stations to exit are only seen as done after the loop.
+        self._refresh_dashboard(processes)
+
+        return {name: process.exitcode for name, process in processes.items()}
+
+    def _refresh_dashboard(
+        self, processes: dict[str, multiprocessing.process.BaseProcess]
+    ) -> None:
+        for name, process in processes.items():
+            self.dashboard.set_exit_code(name, process.exitcode)
+        self.dashboard.update()
+
+        with open(self._run_path / "dashboard.json", "w", encoding="utf-8") as file:
+            json.dump(self.dashboard.get_snapshot(), file, indent=2)
+        print(self.dashboard.render(), end="\n\n", flush=True)
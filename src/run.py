@@ -1,29 +1,34 @@
+import importlib
 import logging
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
 from pathlib import Path
 from threading import Thread
 from typing import cast
 
-from data_acquisition.eeg_headset import MockEEGHeadset
-from data_acquisition.experiment_runner import ExperimentRunner
-from data_acquisition.gui import PygameGui
-from data_acquisition.gui.display_mode import FullscreenDisplayMode, WindowedDisplayMode
+from data_acquisition.eeg_headset import EEGHeadset, MockEEGHeadset
 from data_acquisition.pre_experiment_survey import PreExperimentSurvey
 
-from .app_sequencer_builder import AppSequencerBuilder
 from .config import Config
 from .constants import (
     BLOCK_COUNT,
     DEBUG_BLOCK_COUNT,
     DEBUG_RELAX_SCREEN_TIMEOUT_MILLIS,
     DEBUG_SENTENCES_IN_BLOCK_COUNT,
-    LOGGING_DATETIME_FORMAT,
+    DEBUG_WINDOW_SIZE,
     LOGGING_LEVEL,
-    LOGGING_MESSAGE_FORMAT,
     RELAX_SCREEN_TIMEOUT_MILLIS,
     SENTENCES_IN_BLOCK_COUNT,
+    SHARED_MEMORY_STREAM_NAME,
+    STARTUP_WARM_UP_MODULES,
     SURVEY_CONFIG_PATH,
     SURVEY_PARTICIPANT_ID_KEY,
 )
+from .eeg_stream import EEGStream
+from .event_logging import EventLogListener, set_up_event_logging
+from .startup_timer import StartupTimer
+
+_Headset = tuple[EEGHeadset, EEGStream | None]
 
 
 def run(
@@ -31,44 +36,130 @@ def run(
     brainaccess_cap_name: str,
     do_use_debug_mode: bool = False,
     do_use_mock_headset: bool = False,
+    do_use_streaming_recording: bool = False,
+    do_use_shared_memory_stream: bool = False,
+    do_use_simulation: bool = False,
+    do_use_fast_startup: bool = False,
+    participant_id: str | None = None,
+    shared_memory_stream_name: str = SHARED_MEMORY_STREAM_NAME,
 ) -> None:
-    survey = PreExperimentSurvey(config_file_path=SURVEY_CONFIG_PATH)
-    responses = survey.start_and_get_responses()
-    participant_id = cast(str, responses.get(SURVEY_PARTICIPANT_ID_KEY))
+    startup_timer = StartupTimer()
+
+    if do_use_shared_memory_stream and not do_use_streaming_recording:
+        raise ValueError(
+            "The shared memory stream is fed by the EEG stream, which is only "
+            "available for streaming recording"
+        )
 
     logger = logging.getLogger()
-    logger.setLevel(LOGGING_LEVEL)
-    (Path().cwd() / "logs").mkdir(exist_ok=True)
-    handler = logging.FileHandler(f"logs/{participant_id}.log", encoding="utf-8")
-    handler.setLevel(LOGGING_LEVEL)
-    formatter = logging.Formatter(
-        LOGGING_MESSAGE_FORMAT, datefmt=LOGGING_DATETIME_FORMAT
-    )
-    handler.setFormatter(formatter)
-    logger.addHandler(handler)
+    # Set up before anything else runs, so nothing is lost. Records wait on the
+    # queue until the participant id, and with it the log file names, is known.
+    event_log_listener = set_up_event_logging(logger=logger, level=LOGGING_LEVEL)
 
-    if do_use_mock_headset:
-        headset = MockEEGHeadset(logger=logger)
-    else:
-        from data_acquisition.eeg_headset.brainaccess import BrainAccessV3Headset
-        from data_acquisition.eeg_headset.brainaccess.devices import (
-            BRAINACCESS_MAXI_32_CHANNEL,
+    headset_future: Future[_Headset] | None = None
+    is_headset_handed_over = False
+    if do_use_fast_startup and not do_use_simulation:
+        # The headset connects and the heavy modules are imported while the
+        # participant fills in the survey.
+        executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="startup")
+        headset_future = executor.submit(
+            _connect_headset,
+            logger=logger,
+            brainaccess_cap_name=brainaccess_cap_name,
+            do_use_mock_headset=do_use_mock_headset,
+            do_use_streaming_recording=do_use_streaming_recording,
         )
+        executor.submit(_warm_up_modules)
+        executor.shutdown(wait=False)
 
-        headset = BrainAccessV3Headset(
-            device_name=brainaccess_cap_name,
-            device_channels=BRAINACCESS_MAXI_32_CHANNEL,
-            logger=logger,
+    try:
+        if participant_id is None and do_use_simulation:
+            participant_id = f"simulation_{datetime.now():%Y%m%d_%H%M%S}"
+        elif participant_id is None:
+            survey = PreExperimentSurvey(config_file_path=SURVEY_CONFIG_PATH)
+            startup_timer.mark("survey shown")
+            responses = survey.start_and_get_responses()
+            startup_timer.mark("survey done")
+            participant_id = cast(
+                str | None, (responses or {}).get(SURVEY_PARTICIPANT_ID_KEY)
+            )
+            if not participant_id:
+                raise RuntimeError("The survey was closed without a participant id")
+
+        _start_event_logging(event_log_listener, participant_id)
+
+        config = _build_config(
+            do_use_debug_mode=do_use_debug_mode,
+            do_use_fast_startup=do_use_fast_startup,
         )
 
-    display_mode = (
-        WindowedDisplayMode(width=800, height=600)
-        if do_use_debug_mode
-        else FullscreenDisplayMode()
+        if do_use_simulation:
+            from .simulation import SessionSimulator
+
+            SessionSimulator(
+                config=config, participant_id=participant_id, logger=logger
+            ).run()
+        else:
+            if headset_future is None:
+                headset = _connect_headset(
+                    logger=logger,
+                    brainaccess_cap_name=brainaccess_cap_name,
+                    do_use_mock_headset=do_use_mock_headset,
+                    do_use_streaming_recording=do_use_streaming_recording,
+                )
+            else:
+                headset = headset_future.result()
+            startup_timer.mark("headset connected")
+
+            is_headset_handed_over = True
+            _run_session(
+                config=config,
+                participant_id=participant_id,
+                logger=logger,
+                headset=headset,
+                do_use_debug_mode=do_use_debug_mode,
+                do_use_shared_memory_stream=do_use_shared_memory_stream,
+                shared_memory_stream_name=shared_memory_stream_name,
+                startup_timer=startup_timer,
+            )
+    except Exception:
+        logger.exception("session failed")
+        raise
+    finally:
+        if headset_future is not None and not is_headset_handed_over:
+            _disconnect_headset(headset_future, logger)
+        if not event_log_listener.is_started:
+            _start_event_logging(
+                event_log_listener, f"startup_{datetime.now():%Y%m%d_%H%M%S}"
+            )
+        event_log_listener.stop()
+
+
+def _start_event_logging(listener: EventLogListener, name: str) -> None:
+    (Path().cwd() / "logs").mkdir(exist_ok=True)
+    listener.start(
+        log_path=Path("logs") / f"{name}.log",
+        event_log_path=Path("logs") / f"{name}.events.jsonl",
     )
-    gui = PygameGui(display_mode=display_mode, window_title="NeuroGuard", logger=logger)
 
-    config = Config(
+
+def _disconnect_headset(
+    headset_future: Future[_Headset], logger: logging.Logger
+) -> None:
+    # The session disconnects the headset it is given. One connected during a
+    # survey that failed or was cancelled is never given to it.
+    try:
+        eeg_headset, _ = headset_future.result()
+    except Exception:
+        logger.exception("headset - connecting failed")
+        return
+
+    eeg_headset.disconnect()
+    logger.info("headset - disconnected without a session")
+
+
+def _build_config(*, do_use_debug_mode: bool, do_use_fast_startup: bool) -> Config:
+    return Config(
         block_count=(DEBUG_BLOCK_COUNT if do_use_debug_mode else BLOCK_COUNT),
         sentence_count=(
             DEBUG_SENTENCES_IN_BLOCK_COUNT
@@ -80,22 +171,168 @@ def run(
             if do_use_debug_mode
             else RELAX_SCREEN_TIMEOUT_MILLIS
         ),
+        do_build_sequencers_lazily=do_use_fast_startup,
     )
 
-    app_sequencer_builder = AppSequencerBuilder(
-        gui=gui,
-        config=config,
-        headset=headset,
-        participant_id=participant_id,
-        logger=logger,
+
+def _connect_headset(
+    *,
+    logger: logging.Logger,
+    brainaccess_cap_name: str,
+    do_use_mock_headset: bool,
+    do_use_streaming_recording: bool,
+) -> _Headset:
+    if do_use_streaming_recording:
+        from .streaming_eeg_headset import StreamingEEGHeadset
+
+        stream: EEGStream
+        if do_use_mock_headset:
+            from .eeg_stream import MockEEGStream
+
+            stream = MockEEGStream(logger=logger)
+        else:
+            # Connects to the cap through the BrainAccess SDK directly, since
+            # the framework's headset does not hand samples over as they arrive.
+            from data_acquisition.eeg_headset.brainaccess.devices import (
+                BRAINACCESS_MAXI_32_CHANNEL,
+            )
+
+            from .brainaccess_eeg_stream import BrainAccessEEGStream
+
+            stream = BrainAccessEEGStream(
+                device_name=brainaccess_cap_name,
+                device_channels=BRAINACCESS_MAXI_32_CHANNEL,
+                logger=logger,
+            )
+        return StreamingEEGHeadset(stream=stream, logger=logger), stream
+
+    if do_use_mock_headset:
+        return MockEEGHeadset(logger=logger), None
+
+    from data_acquisition.eeg_headset.brainaccess import BrainAccessV3Headset
+    from data_acquisition.eeg_headset.brainaccess.devices import (
+        BRAINACCESS_MAXI_32_CHANNEL,
+    )
+
+    return (
+        BrainAccessV3Headset(
+            device_name=brainaccess_cap_name,
+            device_channels=BRAINACCESS_MAXI_32_CHANNEL,
+            logger=logger,
+        ),
+        None,
+    )
+
+
+def _warm_up_modules() -> None:
+    for module_name in STARTUP_WARM_UP_MODULES:
+        importlib.import_module(module_name, package=__package__)
+
+
+def _run_session(
+    *,
+    config: Config,
+    participant_id: str,
+    logger: logging.Logger,
+    headset: _Headset,
+    do_use_debug_mode: bool,
+    do_use_shared_memory_stream: bool,
+    shared_memory_stream_name: str,
+    startup_timer: StartupTimer,
+) -> None:
+    # Imported here, since mne and pygame take a while to load and are not
+    # needed for the survey.
+    from data_acquisition.experiment_runner import ExperimentRunner
+    from data_acquisition.gui import PygameGui
+    from data_acquisition.gui.display_mode import (
+        FullscreenDisplayMode,
+        WindowedDisplayMode,
+    )
+
+    from .app_sequencer_builder import AppSequencerBuilder
+    from .background_saving_headset import BackgroundSavingHeadset
+    from .shared_memory_stream import SharedMemoryPublishingHeadset
+    from .signal_quality_monitor import SignalQualityMonitor
+    from .streaming_eeg_headset import StreamingEEGHeadset
+    from .text_layout_cache import (
+        check_text_layout_framework_version,
+        get_fullscreen_size,
+        get_text_layout_key,
     )
-    sequencer = app_sequencer_builder.set_up_app_sequencer()
 
-    runner = ExperimentRunner(
-        gui=gui, screen_sequencer=sequencer, end_callback=gui.stop
+    eeg_headset, stream = headset
+    if isinstance(eeg_headset, StreamingEEGHeadset):
+        eeg_headset.set_participant_id(participant_id)
+    signal_quality_monitor = (
+        None if stream is None else SignalQualityMonitor(stream=stream, logger=logger)
     )
+    if signal_quality_monitor is None:
+        # Only streaming recordings hand samples over as they arrive.
+        logger.warning(
+            "signal quality - not monitored, it needs DO_USE_STREAMING_RECORDING"
+        )
+    background_saving_headset = BackgroundSavingHeadset(
+        headset=eeg_headset,
+        logger=logger,
+        get_sample_index=(
+            eeg_headset.get_sample_index
+            if isinstance(eeg_headset, StreamingEEGHeadset)
+            else None
+        ),
+        do_use_compressed_storage=config.do_use_compressed_storage,
+        compressed_storage_scale=config.compressed_storage_scale,
+    )
+    eeg_headset = background_saving_headset
+    if do_use_shared_memory_stream:
+        # Checked when the run starts, streaming recording always has a stream.
+        assert stream is not None
+        # Outermost, so that annotations are published when they are made and
+        # not only once their block is saved.
+        eeg_headset = SharedMemoryPublishingHeadset(
+            headset=eeg_headset,
+            stream=stream,
+            logger=logger,
+            name=shared_memory_stream_name,
+        )
+
+    try:
+        display_mode = (
+            WindowedDisplayMode(width=DEBUG_WINDOW_SIZE[0], height=DEBUG_WINDOW_SIZE[1])
+            if do_use_debug_mode
+            else FullscreenDisplayMode()
+        )
+        text_layout_key = None
+        if config.do_use_text_layout_cache:
+            check_text_layout_framework_version()
+            text_layout_key = get_text_layout_key(
+                DEBUG_WINDOW_SIZE if do_use_debug_mode else get_fullscreen_size()
+            )
+        gui = PygameGui(
+            display_mode=display_mode, window_title="NeuroGuard", logger=logger
+        )
+        startup_timer.mark("gui ready")
+
+        app_sequencer_builder = AppSequencerBuilder(
+            gui=gui,
+            config=config,
+            headset=eeg_headset,
+            participant_id=participant_id,
+            logger=logger,
+            signal_quality_monitor=signal_quality_monitor,
+            startup_timer=startup_timer,
+            text_layout_key=text_layout_key,
+            wait_for_headset_start=background_saving_headset.wait_for_pending_start,
+        )
+        sequencer = app_sequencer_builder.set_up_app_sequencer()
+        startup_timer.mark("sequencers built")
+
+        runner = ExperimentRunner(
+            gui=gui, screen_sequencer=sequencer, end_callback=gui.stop
+        )
 
-    Thread(target=runner.run).start()
-    gui.start()
+        Thread(target=runner.run).start()
+        gui.start()
 
-    headset.disconnect()
+        app_sequencer_builder.write_timing_report()
+    finally:
+        eeg_headset.disconnect()
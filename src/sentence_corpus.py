@@ -0,0 +1,141 @@
+import mmap
+import os
+from pathlib import Path
+
+import numpy as np
+from numpy.typing import NDArray
+
+CORPUS_INDEX_SUFFIX = ".index.npy"
+
+CORPUS_INDEX_DTYPE = np.dtype(
+    [
+        ("offset", np.uint64),
+        ("byte_count", np.uint32),
+        ("character_count", np.uint32),
+        ("word_count", np.uint16),
+    ]
+)
+
+
+class SentenceCorpus:
+    def __init__(self, *, text_path: Path, index_path: Path | None = None):
+        self._text_path = text_path
+        self._index_path = index_path or get_corpus_index_path(text_path)
+
+        if not is_corpus_index_up_to_date(self._text_path, self._index_path):
+            build_corpus_index(self._text_path, self._index_path)
+
+        self._index: NDArray[np.void] = np.load(self._index_path, mmap_mode="r")
+
+        with open(self._text_path, "rb") as file:
+            self._text = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    @property
+    def text_path(self) -> Path:
+        return self._text_path
+
+    @property
+    def index(self) -> NDArray[np.void]:
+        return self._index
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __getitem__(self, sentence_id: int) -> str:
+        return self.get_bytes(sentence_id).decode("utf-8")
+
+    def get_bytes(self, sentence_id: int) -> bytes:
+        entry = self._index[sentence_id]
+        start = int(entry["offset"])
+
+        return self._text[start : start + int(entry["byte_count"])]
+
+    def sample(
+        self,
+        rng: np.random.Generator,
+        *,
+        size: int,
+        length_stratum_count: int = 1,
+    ) -> NDArray[np.int64]:
+        # Empty lines keep their ids, so that ids stay line numbers, but they are
+        # never drawn.
+        sentence_ids = np.flatnonzero(self._index["byte_count"] > 0)
+        if length_stratum_count == 1:
+            return rng.choice(sentence_ids, size=size, replace=False)
+
+        # Splitting by rank rather than by length quantiles keeps every stratum
+        # equally large even when many sentences share the same length.
+        strata = np.array_split(
+            sentence_ids[
+                np.argsort(self._index["character_count"][sentence_ids], kind="stable")
+            ],
+            length_stratum_count,
+        )
+
+        stratum_sizes = np.full(length_stratum_count, size // length_stratum_count)
+        stratum_sizes[: size % length_stratum_count] += 1
+
+        sampled_sentence_ids = np.concatenate(
+            [
+                rng.choice(stratum, size=stratum_size, replace=False)
+                for stratum, stratum_size in zip(strata, stratum_sizes)
+            ]
+        )
+
+        return rng.permutation(sampled_sentence_ids)
+
+    def close(self) -> None:
+        self._text.close()
+
+
+def get_corpus_index_path(text_path: Path) -> Path:
+    return text_path.with_name(text_path.name + CORPUS_INDEX_SUFFIX)
+
+
+def is_corpus_index_up_to_date(text_path: Path, index_path: Path) -> bool:
+    return (
+        index_path.is_file()
+        and index_path.stat().st_mtime_ns >= text_path.stat().st_mtime_ns
+    )
+
+
+def build_corpus_index(text_path: Path, index_path: Path) -> None:
+    text = np.fromfile(text_path, dtype=np.uint8)
+
+    line_ends = np.flatnonzero(text == ord("\n"))
+    if len(text) > 0 and text[-1] != ord("\n"):
+        line_ends = np.append(line_ends, len(text))
+    line_starts = np.concatenate([[0], line_ends + 1])[:-1]
+
+    has_carriage_return = (line_ends > line_starts) & (
+        text[np.maximum(line_ends - 1, 0)] == ord("\r")
+    )
+    line_ends = line_ends - has_carriage_return
+
+    # Every UTF-8 character has exactly one byte that is not a continuation byte.
+    is_character_start = (text & 0b1100_0000) != 0b1000_0000
+    character_offsets = np.concatenate([[0], np.cumsum(is_character_start)])
+
+    is_whitespace = np.isin(text, np.frombuffer(b" \t\r\n", dtype=np.uint8))
+    is_word_start = ~is_whitespace & np.concatenate([[True], is_whitespace[:-1]])
+    word_offsets = np.concatenate([[0], np.cumsum(is_word_start)])
+
+    index = np.zeros(len(line_starts), dtype=CORPUS_INDEX_DTYPE)
+    index["offset"] = line_starts
+    index["byte_count"] = line_ends - line_starts
+    index["character_count"] = (
+        character_offsets[line_ends] - character_offsets[line_starts]
+    )
+    index["word_count"] = word_offsets[line_ends] - word_offsets[line_starts]
+
+    # Stations started together may all build the index at once.
+    temporary_path = index_path.with_name(f".{index_path.name}.{os.getpid()}")
+    with open(temporary_path, "wb") as file:
+        np.save(file, index)
+    temporary_path.replace(index_path)
+
+
+if __name__ == "__main__":
+    for text_path in sorted((Path(__file__).parent / "assets").glob("*.txt")):
+        build_corpus_index(text_path, get_corpus_index_path(text_path))
+        print(f"indexed {text_path}")
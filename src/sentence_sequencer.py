@@ -1,16 +1,18 @@
+import gc
+import time
+from collections.abc import Callable, Iterable
 from logging import Logger
 
+import numpy as np
 from data_acquisition.eeg_headset import EEGHeadset
 from data_acquisition.event_manager import (
     CompositeEventManager,
     EventManager,
     FixedTimeoutEventManager,
     KeyPressEventManager,
-    RandomTimeoutEventManager,
 )
 from data_acquisition.eventful_screen import EventfulScreen
 from data_acquisition.gui import Gui
-from data_acquisition.gui.event_types import Key
 from data_acquisition.screens import BlankScreen, FixationCrossScreen, TextScreen
 from data_acquisition.sequencers import SimpleScreenSequencer
 
@@ -19,6 +21,12 @@ from .constants import (
     NON_SENTENCE_SCREEN_BACKGROUND_COLOR,
     NON_SENTENCE_SCREEN_TEXT_COLOR,
 )
+from .deadline_scheduler import DeadlineScheduler
+from .sentences import Language, Sentences
+from .session_plan import SessionPlan
+from .signal_quality_monitor import SignalQualityMonitor
+from .text_layout_cache import SentenceLayouts
+from .timing_recorder import UNSET, EventSource, ScreenType, TimingRecorder
 
 
 class SentenceSequencer(SimpleScreenSequencer[None]):
@@ -28,116 +36,249 @@ class SentenceSequencer(SimpleScreenSequencer[None]):
         gui: Gui,
         eeg_headset: EEGHeadset,
         config: Config,
-        sentences: list[str],
+        session_plan: SessionPlan,
+        sentences: Sentences,
+        block_index: int,
+        timing_recorder: TimingRecorder,
         logger: Logger,
+        signal_quality_monitor: SignalQualityMonitor | None = None,
+        deadline_scheduler: DeadlineScheduler | None = None,
+        sentence_layouts: SentenceLayouts | None = None,
+        wait_for_headset_start: Callable[[], None] | None = None,
     ):
         super().__init__(gui=gui, logger=logger)
 
+        self._trials = session_plan.get_block_trials(block_index)
+        self._annotations = session_plan.annotations
         self._sentences = sentences
         self._eeg_headset = eeg_headset
         self._config = config
+        self._block_index = block_index
+        self._timing_recorder = timing_recorder
         self._logger = logger
+        self._signal_quality_monitor = signal_quality_monitor
+        self._deadline_scheduler = deadline_scheduler
+        self._sentence_layouts = sentence_layouts
+        self._wait_for_headset_start = wait_for_headset_start
+        self._timing_row = UNSET
 
         self._continue_screen_event_manager = KeyPressEventManager(
             gui=self._gui, key=config.continue_screen_advance_key, logger=logger
         )
         self._continue_screen_event_manager.register_callback(
-            lambda _: self._logger.info("pause end - participant pressed continue key")
+            self._continue_screen_end_callback
         )
 
-        self._build_sentence_screen_event_manager(
-            advance_key=config.sentence_screen_advance_key,
-            timeout_millis=config.sentence_screen_timeout_millis,
+        # Every event manager graph is built once here and handed out again for
+        # each screen, so trials do not allocate managers or callbacks. No two
+        # graphs share a manager.
+        self._build_pause_screen_event_manager()
+        self._build_sentence_screen_event_managers()
+        self._build_fixation_cross_screen_event_managers()
+        self._relax_screen_event_managers = {
+            timeout_millis: self._build_relax_screen_event_manager(timeout_millis)
+            for timeout_millis in self._get_timeouts_millis(
+                [config.relax_screen_timeout_millis]
+            )
+        }
+
+        self._pause_screen = self._build_non_sentence_text_screen(
+            config.pause_screen_text
         )
-        self._build_fixation_cross_screen_event_manager(
-            timeout_range_start_millis=config.fixation_cross_timeout_range_start_millis,
-            timeout_range_end_millis=config.fixation_cross_timeout_range_end_millis,
+        self._continue_screen = self._build_non_sentence_text_screen(
+            config.continue_screen_text
         )
-        self._build_pause_unpause_event_manager(key=config.pause_unpause_key)
-        self._build_relax_screen_event_manager(
-            timeout_millis=config.relax_screen_timeout_millis
+
+        self._fixation_cross_screen = FixationCrossScreen(gui=self._gui)
+        self._prefetched_sentence: tuple[int, TextScreen] | None = None
+
+        self._was_first_screen_shown = False
+        self._was_headset_started = wait_for_headset_start is None
+        self._was_fixation_cross_shown = False
+        self._was_sentence_shown = False
+        self._was_paused = False
+        self._was_relax_screen_shown = False
+        self._index = 0
+        self._end_index = config.sentence_count
+
+    def _log_event(self, event: str, message: str) -> None:
+        sentence_id = (
+            int(self._trials[self._index]["sentence_id"])
+            if self._index < len(self._trials)
+            else None
         )
 
-        self._pause_screen = TextScreen(
-            gui=self._gui,
-            text=config.pause_screen_text,
-            text_color=NON_SENTENCE_SCREEN_TEXT_COLOR,
-            background_color=NON_SENTENCE_SCREEN_BACKGROUND_COLOR,
+        self._logger.info(
+            message,
+            extra={
+                "event": event,
+                "block": self._block_index,
+                "trial": self._index,
+                "sentence_id": sentence_id,
+            },
         )
-        self._continue_screen = TextScreen(
+
+    def _build_non_sentence_text_screen(self, text: str) -> TextScreen:
+        return TextScreen(
             gui=self._gui,
-            text=config.continue_screen_text,
+            text=text,
             text_color=NON_SENTENCE_SCREEN_TEXT_COLOR,
             background_color=NON_SENTENCE_SCREEN_BACKGROUND_COLOR,
         )
 
-        self._was_first_screen_shown = False
-        self._was_fixation_cross_shown = False
-        self._was_paused = False
-        self._was_relax_screen_shown = False
-        self._index = 0
+    def _get_screen_with_signal_quality(
+        self, screen: TextScreen, text: str
+    ) -> TextScreen:
+        if self._signal_quality_monitor is None:
+            return screen
 
-    def _build_sentence_screen_event_manager(
-        self,
-        *,
-        advance_key: Key,
-        timeout_millis: int,
-    ) -> None:
-        key_event_manager = KeyPressEventManager(
-            gui=self._gui, key=advance_key, logger=self._logger
+        self._signal_quality_monitor.log_summary()
+
+        return self._build_non_sentence_text_screen(
+            f"{text}\n\n{self._signal_quality_monitor.get_summary_text()}"
         )
-        key_event_manager.register_callback(
-            lambda _: self._logger.info(
-                "sentence end - participant pressed continue key"
+
+    def _get_timeouts_millis(
+        self, configured_timeouts_millis: Iterable[int]
+    ) -> set[int]:
+        if self._deadline_scheduler is None:
+            return {
+                int(timeout_millis) for timeout_millis in configured_timeouts_millis
+            }
+
+        # Scheduled timeouts are one of a few whole frame counts, so the graphs
+        # for all of them are built up front rather than in the middle of a
+        # block.
+        return {
+            timeout_millis
+            for configured_timeout_millis in configured_timeouts_millis
+            for timeout_millis in self._deadline_scheduler.get_timeouts_millis(
+                int(configured_timeout_millis)
             )
+        }
+
+    def _build_sentence_screen_event_managers(self) -> None:
+        self._sentence_screen_event_managers = {
+            timeout_millis: self._build_sentence_screen_event_manager(timeout_millis)
+            for timeout_millis in self._get_timeouts_millis(
+                np.unique(self._trials["sentence_screen_timeout_millis"])
+            )
+        }
+
+    def _build_sentence_screen_event_manager(
+        self, timeout_millis: int
+    ) -> EventManager[None]:
+        key_event_manager = KeyPressEventManager(
+            gui=self._gui,
+            key=self._config.sentence_screen_advance_key,
+            logger=self._logger,
         )
+        key_event_manager.register_callback(self._sentence_screen_key_callback)
 
         timeout_event_manager = FixedTimeoutEventManager(
             gui=self._gui, timeout_millis=timeout_millis, logger=self._logger
         )
-        timeout_event_manager.register_callback(
-            lambda _: self._logger.info("sentence end - timeout")
-        )
+        timeout_event_manager.register_callback(self._sentence_screen_timeout_callback)
 
-        self._sentence_screen_event_manager = CompositeEventManager(
+        event_manager = CompositeEventManager(
             event_managers=[key_event_manager, timeout_event_manager],
             logger=self._logger,
         )
-        self._sentence_screen_event_manager.register_callback(
-            lambda _: self._eeg_headset.annotate(
-                self._config.sentence_screen_end_annotation
-            )
+        event_manager.register_callback(self._sentence_screen_end_callback)
+
+        return self._build_event_manager_with_pause(event_manager)
+
+    def _sentence_screen_key_callback(self, _: None) -> None:
+        self._timing_recorder.mark_event(self._timing_row, EventSource.KEY)
+        self._reset_deadlines()
+        self._log_event(
+            "sentence_end", "sentence end - participant pressed continue key"
         )
 
+    def _sentence_screen_timeout_callback(self, _: None) -> None:
+        self._timing_recorder.mark_event(self._timing_row, EventSource.TIMEOUT)
+        self._log_event("sentence_end", "sentence end - timeout")
+
+    def _sentence_screen_end_callback(self, _: None) -> None:
+        self._eeg_headset.annotate(
+            self._annotations[self._trials[self._index]["sentence_end_annotation"]]
+        )
+
+    def _build_fixation_cross_screen_event_managers(self) -> None:
+        self._fixation_cross_screen_event_managers = {
+            timeout_millis: self._build_fixation_cross_screen_event_manager(
+                timeout_millis
+            )
+            for timeout_millis in self._get_timeouts_millis(
+                np.unique(self._trials["fixation_cross_timeout_millis"])
+            )
+        }
+
     def _build_fixation_cross_screen_event_manager(
-        self, *, timeout_range_start_millis: int, timeout_range_end_millis: int
-    ) -> None:
-        self._fixation_cross_screen_event_manager = RandomTimeoutEventManager(
-            gui=self._gui,
-            timeout_min_millis=timeout_range_start_millis,
-            timeout_max_millis=timeout_range_end_millis,
-            logger=self._logger,
+        self, timeout_millis: int
+    ) -> EventManager[None]:
+        event_manager = FixedTimeoutEventManager(
+            gui=self._gui, timeout_millis=timeout_millis, logger=self._logger
+        )
+        event_manager.register_callback(self._fixation_cross_screen_end_callback)
+
+        return self._build_event_manager_with_pause(event_manager)
+
+    def _fixation_cross_screen_end_callback(self, _: None) -> None:
+        self._timing_recorder.mark_event(self._timing_row, EventSource.TIMEOUT)
+        self._log_event("fixation_cross_end", "fixation cross end")
+
+    def _build_pause_screen_event_manager(self) -> None:
+        self._pause_screen_event_manager = KeyPressEventManager(
+            gui=self._gui, key=self._config.pause_unpause_key, logger=self._logger
         )
-        self._fixation_cross_screen_event_manager.register_callback(
-            lambda _: self._logger.info("fixation cross end")
+        self._pause_screen_event_manager.register_callback(
+            self._pause_screen_end_callback
         )
 
-    def _build_pause_unpause_event_manager(self, *, key: Key) -> None:
-        self._pause_unpause_event_manager = KeyPressEventManager(
-            gui=self._gui, key=key, logger=self._logger
+    def _build_event_manager_with_pause(
+        self, event_manager: EventManager[None]
+    ) -> EventManager[None]:
+        # Every graph gets its own pause manager, so that a composite only
+        # ever hears about its own children.
+        pause_event_manager = KeyPressEventManager(
+            gui=self._gui, key=self._config.pause_unpause_key, logger=self._logger
         )
+        pause_event_manager.register_callback(self._mark_as_paused)
 
-    def _build_relax_screen_event_manager(self, *, timeout_millis: int) -> None:
-        self._relax_screen_event_manager = FixedTimeoutEventManager(
-            gui=self._gui, timeout_millis=timeout_millis, logger=self._logger
+        return CompositeEventManager(
+            event_managers=[pause_event_manager, event_manager],
+            logger=self._logger,
         )
-        self._relax_screen_event_manager.register_callback(
-            self._relax_screen_end_callback
+
+    def _get_event_manager(
+        self, event_manager: EventManager[None]
+    ) -> EventManager[None]:
+        if self._config.do_reuse_event_managers:
+            return event_manager
+
+        return event_manager.clone()
+
+    def _build_relax_screen_event_manager(
+        self, timeout_millis: int
+    ) -> EventManager[None]:
+        event_manager = FixedTimeoutEventManager(
+            gui=self._gui, timeout_millis=timeout_millis, logger=self._logger
         )
+        event_manager.register_callback(self._relax_screen_end_callback)
+
+        return event_manager
 
     def _relax_screen_end_callback(self, _: None) -> None:
+        self._timing_recorder.mark_event(self._timing_row, EventSource.TIMEOUT)
+        if self._deadline_scheduler is not None:
+            self._log_event(
+                "block_end_error",
+                "block end error - "
+                f"{self._deadline_scheduler.get_millis_after_plan():.3f} ms",
+            )
         self._eeg_headset.annotate(self._config.relax_screen_end_annotation)
-        self._logger.info("relax end")
+        self._log_event("relax_end", "relax end")
 
     def _get_next(self) -> EventfulScreen[None]:
         if not self._was_first_screen_shown and self._config.do_show_continue_screen:
@@ -147,7 +288,11 @@ class SentenceSequencer(SimpleScreenSequencer[None]):
         if self._was_paused:
             return self._get_pause_screen()
 
-        if self._index >= self._config.sentence_count:
+        if self._was_sentence_shown:
+            self._was_sentence_shown = False
+            self._index += 1
+
+        if self._index >= self._end_index:
             return self._get_relax_screen()
 
         if not self._was_fixation_cross_shown:
@@ -155,112 +300,258 @@ class SentenceSequencer(SimpleScreenSequencer[None]):
 
         return self._get_sentence_screen()
 
+    def _begin_timing(
+        self, screen_type: ScreenType, configured_timeout_millis: int = UNSET
+    ) -> None:
+        self._timing_row = self._timing_recorder.begin(
+            block=self._block_index,
+            screen_type=screen_type,
+            trial=self._index,
+            configured_timeout_millis=configured_timeout_millis,
+        )
+
+    def _schedule(self, timeout_millis: int) -> int:
+        if self._deadline_scheduler is None:
+            return timeout_millis
+
+        return self._deadline_scheduler.schedule(self._timing_row, timeout_millis)
+
+    def _mark_shown(self) -> None:
+        self._timing_recorder.mark_shown(self._timing_row)
+        if self._deadline_scheduler is None:
+            return
+
+        self._deadline_scheduler.observe(self._timing_row)
+        record = self._timing_recorder.records[self._timing_row]
+        self._log_event(
+            "onset_error",
+            f"onset error - {(record['shown_ns'] - record['planned_ns']) / 1e6:.3f} ms",
+        )
+
+    def _reset_deadlines(self) -> None:
+        if self._deadline_scheduler is not None:
+            self._deadline_scheduler.reset()
+
     def _get_continue_screen(self) -> EventfulScreen[None]:
         self._was_first_screen_shown = True
+        self._begin_timing(ScreenType.CONTINUE)
 
-        continue_screen = self._continue_screen
+        continue_screen = self._get_screen_with_signal_quality(
+            self._continue_screen, self._config.continue_screen_text
+        )
 
         screen = EventfulScreen(
             screen=continue_screen,
-            event_manager=self._continue_screen_event_manager.clone(),
-            screen_show_callback=lambda: self._logger.info("pause start"),
+            event_manager=self._get_event_manager(self._continue_screen_event_manager),
+            screen_show_callback=self._continue_screen_show_callback,
         )
 
         return screen
 
+    def _continue_screen_show_callback(self) -> None:
+        self._timing_recorder.mark_shown(self._timing_row)
+        self._log_event("continue_start", "pause start")
+
+    def _continue_screen_end_callback(self, _: None) -> None:
+        self._timing_recorder.mark_event(self._timing_row, EventSource.KEY)
+        self._reset_deadlines()
+        self._log_event("continue_end", "pause end - participant pressed continue key")
+
     def _get_pause_screen(self) -> EventfulScreen[None]:
         self._was_paused = False
+        self._was_fixation_cross_shown = False
+        self._was_sentence_shown = False
 
-        self._index -= 1
-
-        pause_event_manager = self._pause_unpause_event_manager.clone()
-        pause_event_manager.register_callback(
-            lambda _: self._eeg_headset.annotate(
-                self._config.pause_screen_end_annotation
-            )
-        )
+        self._begin_timing(ScreenType.PAUSE)
 
         screen = EventfulScreen(
-            screen=self._pause_screen,
-            event_manager=pause_event_manager,
-            screen_show_callback=lambda: self._eeg_headset.annotate(
-                self._config.pause_screen_start_annotation
+            screen=self._get_screen_with_signal_quality(
+                self._pause_screen, self._config.pause_screen_text
             ),
+            event_manager=self._get_event_manager(self._pause_screen_event_manager),
+            screen_show_callback=self._pause_screen_show_callback,
         )
 
         return screen
 
+    def _pause_screen_show_callback(self) -> None:
+        self._timing_recorder.mark_shown(self._timing_row)
+        self._timing_recorder.mark_annotated(self._timing_row)
+        self._eeg_headset.annotate(self._config.pause_screen_start_annotation)
+        self._log_event("pause_start", "pause screen start")
+
+    def _pause_screen_end_callback(self, _: None) -> None:
+        self._timing_recorder.mark_event(self._timing_row, EventSource.KEY)
+        # The next trial and everything after it start again from here.
+        self._reset_deadlines()
+        self._eeg_headset.annotate(self._config.pause_screen_end_annotation)
+        self._log_event("pause_end", "pause screen end")
+        self._skip_paused_trial()
+
+    def _skip_paused_trial(self) -> None:
+        if self._end_index >= len(self._trials):
+            self._log_event(
+                "paused_trial_replay", "paused trial replay - no spare trials left"
+            )
+            return
+
+        # The interrupted trial is marked in the plan and a spare one is added to
+        # the end of the block, so the block still has all of its sentences.
+        self._trials["was_paused"][self._index] = True
+        self._index += 1
+        self._end_index += 1
+
     def _get_relax_screen(self) -> EventfulScreen[None]:
         if self._was_relax_screen_shown:
             raise StopIteration
 
         self._was_relax_screen_shown = True
+        self._begin_timing(ScreenType.RELAX, self._config.relax_screen_timeout_millis)
+        timeout_millis = self._schedule(self._config.relax_screen_timeout_millis)
 
         relax_screen = BlankScreen(gui=self._gui)
 
-        relax_screen_event_manager = self._relax_screen_event_manager.clone()
-
         screen = EventfulScreen(
             screen=relax_screen,
-            event_manager=relax_screen_event_manager,
+            event_manager=self._get_event_manager(
+                self._relax_screen_event_managers[timeout_millis]
+            ),
             screen_show_callback=self._relax_screen_start_callback,
         )
 
         return screen
 
     def _relax_screen_start_callback(self) -> None:
+        self._mark_shown()
+        self._timing_recorder.mark_annotated(self._timing_row)
         self._eeg_headset.annotate(self._config.relax_screen_start_annotation)
-        self._logger.info("relax start")
+        self._log_event("relax_start", "relax start")
+        self._log_sentence_onset_latency()
+
+        if self._config.do_disable_gc_during_blocks:
+            gc.enable()
+            gc.collect()
+
+    def _log_sentence_onset_latency(self) -> None:
+        summary = self._timing_recorder.summarize(
+            block=self._block_index, screen_type=ScreenType.SENTENCE
+        )
+        onset_latency = summary["onset_after_previous_event_ms"]
+        if onset_latency is None:
+            return
+
+        self._logger.info(
+            f"sentence onset latency - prefetch {self._config.do_prefetch_screens}, "
+            f"mean {onset_latency['mean']:.3f} ms, "
+            f"jitter (sd) {onset_latency['std']:.3f} ms, "
+            f"max {onset_latency['max']:.3f} ms, n {summary['count']}"
+        )
+
+    def _await_headset_start(self) -> None:
+        if self._was_headset_started or self._wait_for_headset_start is None:
+            return
+
+        # The headset starts on a worker that may still be busy with the previous
+        # block, so the first timed screen of a block waits until it records.
+        started_at = time.perf_counter()
+        self._wait_for_headset_start()
+        self._was_headset_started = True
+        self._log_event(
+            "headset_start_wait",
+            f"headset start wait - {(time.perf_counter() - started_at) * 1000:.1f} ms",
+        )
 
     def _get_fixation_cross_screen(self) -> EventfulScreen[None]:
+        self._await_headset_start()
         self._was_fixation_cross_shown = True
-
-        screen = FixationCrossScreen(gui=self._gui)
-        event_manager = self._get_event_manager_with_pause(
-            self._fixation_cross_screen_event_manager
+        timeout_millis = int(self._trials[self._index]["fixation_cross_timeout_millis"])
+        self._begin_timing(ScreenType.FIXATION_CROSS, timeout_millis)
+        timeout_millis = self._schedule(timeout_millis)
+
+        screen = (
+            self._fixation_cross_screen
+            if self._config.do_prefetch_screens
+            else FixationCrossScreen(gui=self._gui)
+        )
+        event_manager = self._get_event_manager(
+            self._fixation_cross_screen_event_managers[timeout_millis]
         )
         screen = EventfulScreen(
             screen=screen,
             event_manager=event_manager,
-            screen_show_callback=lambda: self._logger.info("fixation cross start"),
+            screen_show_callback=self._fixation_cross_screen_show_callback,
         )
 
         return screen
 
-    def _get_sentence_screen(self) -> EventfulScreen[None]:
-        self._was_fixation_cross_shown = False
-        self._index += 1
+    def _fixation_cross_screen_show_callback(self) -> None:
+        self._mark_shown()
+        self._log_event("fixation_cross_start", "fixation cross start")
+
+        if self._config.do_disable_gc_during_blocks:
+            gc.disable()
+
+        if self._config.do_prefetch_screens and self._prefetched_sentence is None:
+            self._prefetched_sentence = (
+                self._index,
+                TextScreen(gui=self._gui, text=self._get_sentence_screen_text()),
+            )
+
+    def _get_sentence_text(self) -> str:
+        trial = self._trials[self._index]
 
-        text = self._sentences.pop()
+        return self._sentences.get(Language(trial["language"]))[trial["sentence_id"]]
 
-        screen = TextScreen(gui=self._gui, text=text)
-        event_manager = self._get_event_manager_with_pause(
-            self._sentence_screen_event_manager
+    def _get_sentence_screen_text(self) -> str:
+        if self._sentence_layouts is None:
+            return self._get_sentence_text()
+
+        trial = self._trials[self._index]
+
+        return self._sentence_layouts.get(Language(trial["language"]))[
+            trial["sentence_id"]
+        ]
+
+    def _get_sentence_screen(self) -> EventfulScreen[None]:
+        self._was_fixation_cross_shown = False
+        self._was_sentence_shown = True
+        timeout_millis = int(
+            self._trials[self._index]["sentence_screen_timeout_millis"]
+        )
+        self._begin_timing(ScreenType.SENTENCE, timeout_millis)
+        timeout_millis = self._schedule(timeout_millis)
+
+        if (
+            self._prefetched_sentence is not None
+            and self._prefetched_sentence[0] == self._index
+        ):
+            _, screen = self._prefetched_sentence
+        else:
+            screen = TextScreen(gui=self._gui, text=self._get_sentence_screen_text())
+        self._prefetched_sentence = None
+
+        event_manager = self._get_event_manager(
+            self._sentence_screen_event_managers[timeout_millis]
         )
         screen = EventfulScreen(
             screen=screen,
             event_manager=event_manager,
-            screen_show_callback=lambda: self._sentence_screen_show_callback(text),
+            screen_show_callback=self._sentence_screen_show_callback,
         )
 
         return screen
 
-    def _sentence_screen_show_callback(self, text: str) -> None:
-        self._eeg_headset.annotate(self._config.sentence_screen_start_annotation)
-        self._logger.info(f"sentence start - {text}")
-
-    def _get_event_manager_with_pause(
-        self, event_manager: EventManager[None]
-    ) -> EventManager[None]:
-        pause_event_manager = self._pause_unpause_event_manager.clone()
-        pause_event_manager.register_callback(self._mark_as_paused)
-
-        pause_screen_event_manager = CompositeEventManager(
-            event_managers=[pause_event_manager, event_manager.clone()],
-            logger=self._logger,
+    def _sentence_screen_show_callback(self) -> None:
+        self._mark_shown()
+        self._timing_recorder.mark_annotated(self._timing_row)
+        self._eeg_headset.annotate(
+            self._annotations[self._trials[self._index]["sentence_start_annotation"]]
+        )
+        self._log_event(
+            "sentence_start", f"sentence start - {self._get_sentence_text()}"
         )
-
-        return pause_screen_event_manager
 
     def _mark_as_paused(self, _: None) -> None:
+        self._timing_recorder.mark_event(self._timing_row, EventSource.PAUSE)
+        self._reset_deadlines()
         self._was_paused = True
@@ -1,26 +1,28 @@
-import random
 from dataclasses import dataclass
+from enum import IntEnum
 from pathlib import Path
 
+from .sentence_corpus import SentenceCorpus
+
+
+class Language(IntEnum):
+    POLISH = 0
+    ENGLISH = 1
+
 
 @dataclass(frozen=True, kw_only=True)
 class Sentences:
-    polish: list[str]
-    english: list[str]
+    polish: SentenceCorpus
+    english: SentenceCorpus
+
+    def get(self, language: Language) -> SentenceCorpus:
+        return self.polish if language == Language.POLISH else self.english
 
 
 def load_sentences() -> Sentences:
     assets_dir = Path(__file__).parent / "assets"
 
-    with open(assets_dir / "pl.txt", "r", encoding="utf-8") as file:
-        polish_sentences = file.read().splitlines()
-    random.shuffle(polish_sentences)
-
-    with open(assets_dir / "en.txt", "r", encoding="utf-8") as file:
-        english_sentences = file.read().splitlines()
-    random.shuffle(english_sentences)
-
     return Sentences(
-        polish=polish_sentences,
-        english=english_sentences,
+        polish=SentenceCorpus(text_path=assets_dir / "pl.txt"),
+        english=SentenceCorpus(text_path=assets_dir / "en.txt"),
     )
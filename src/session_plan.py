@@ -0,0 +1,102 @@
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+from numpy.typing import NDArray
+
+from .config import Config
+from .sentences import Language, Sentences
+
+SESSION_PLAN_DTYPE = np.dtype(
+    [
+        ("block", np.int16),
+        ("trial", np.int32),
+        ("language", np.uint8),
+        ("sentence_id", np.int32),
+        ("fixation_cross_timeout_millis", np.int32),
+        ("sentence_screen_timeout_millis", np.int32),
+        ("sentence_start_annotation", np.uint8),
+        ("sentence_end_annotation", np.uint8),
+        ("was_paused", np.bool_),
+    ]
+)
+
+BLOCK_LANGUAGES = (Language.POLISH, Language.ENGLISH)
+
+
+@dataclass(frozen=True, kw_only=True)
+class SessionPlan:
+    seed: int
+    trials: NDArray[np.void]
+    annotations: tuple[str, ...]
+
+    def get_block_trials(self, block: int) -> NDArray[np.void]:
+        start, stop = np.searchsorted(self.trials["block"], [block, block + 1])
+
+        return self.trials[start:stop]
+
+    def save(self, path: Path) -> None:
+        np.savez(
+            path,
+            seed=np.array(self.seed, dtype=np.uint64),
+            trials=self.trials,
+            annotations=np.array(self.annotations),
+        )
+
+
+def compile_session_plan(
+    *, config: Config, sentences: Sentences, seed: int | None = None
+) -> SessionPlan:
+    if seed is None:
+        seed = int(np.random.SeedSequence().generate_state(1, dtype=np.uint64)[0])
+    rng = np.random.default_rng(seed)
+
+    annotations = (
+        config.sentence_screen_start_annotation,
+        config.sentence_screen_end_annotation,
+    )
+
+    trial_count = config.sentence_count + config.spare_trial_count
+    trials = np.zeros(config.block_count * trial_count, SESSION_PLAN_DTYPE)
+    trials["block"] = np.repeat(np.arange(config.block_count), trial_count)
+    trials["trial"] = np.tile(np.arange(trial_count), config.block_count)
+    trials["language"] = np.repeat(
+        [
+            BLOCK_LANGUAGES[block % len(BLOCK_LANGUAGES)]
+            for block in range(config.block_count)
+        ],
+        trial_count,
+    )
+
+    for language in BLOCK_LANGUAGES:
+        is_in_language = trials["language"] == language
+        trials["sentence_id"][is_in_language] = sentences.get(language).sample(
+            rng,
+            size=int(np.count_nonzero(is_in_language)),
+            length_stratum_count=config.sentence_length_stratum_count,
+        )
+
+    trials["fixation_cross_timeout_millis"] = rng.integers(
+        config.fixation_cross_timeout_range_start_millis,
+        config.fixation_cross_timeout_range_end_millis,
+        size=len(trials),
+        endpoint=True,
+    )
+    trials["sentence_screen_timeout_millis"] = config.sentence_screen_timeout_millis
+    trials["sentence_start_annotation"] = annotations.index(
+        config.sentence_screen_start_annotation
+    )
+    trials["sentence_end_annotation"] = annotations.index(
+        config.sentence_screen_end_annotation
+    )
+
+    return SessionPlan(seed=seed, trials=trials, annotations=annotations)
+
+
+def load_session_plan(path: Path) -> SessionPlan:
+    with np.load(path) as file:
+        return SessionPlan(
+            seed=int(file["seed"]),
+            trials=file["trials"],
+            annotations=tuple(str(annotation) for annotation in file["annotations"]),
+        )
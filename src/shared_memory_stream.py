@@ -0,0 +1,360 @@
+import os
+from dataclasses import dataclass
+from logging import Logger
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from pathlib import Path
+
+import numpy as np
+from data_acquisition.eeg_headset import EEGHeadset
+from numpy.typing import NDArray
+
+from .constants import (
+    SHARED_MEMORY_STREAM_ANNOTATION_CAPACITY,
+    SHARED_MEMORY_STREAM_CAPACITY_SECONDS,
+    SHARED_MEMORY_STREAM_NAME,
+)
+from .eeg_stream import EEGStream
+
+SHARED_MEMORY_STREAM_FORMAT_VERSION = 2
+
+_HEADER_DTYPE = np.dtype(
+    [
+        ("format_version", np.int64),
+        ("channel_count", np.int64),
+        ("sampling_frequency", np.float64),
+        ("capacity", np.int64),
+        ("annotation_capacity", np.int64),
+        ("sample_write_count", np.int64),
+        ("sample_reserve_count", np.int64),
+        ("annotation_write_count", np.int64),
+        ("annotation_reserve_count", np.int64),
+    ]
+)
+_CHANNEL_NAME_DTYPE = np.dtype("S32")
+_ANNOTATION_DTYPE = np.dtype([("sample_index", np.int64), ("description", "S56")])
+
+_written_names: set[str] = set()
+
+
+@dataclass(frozen=True, kw_only=True)
+class StreamChunk:
+    start_sample: int
+    samples: NDArray[np.float32]
+    lost_sample_count: int
+
+
+@dataclass(frozen=True, kw_only=True)
+class StreamAnnotations:
+    sample_indices: NDArray[np.int64]
+    descriptions: list[str]
+    lost_annotation_count: int
+
+
+class _SharedMemoryRingBuffer:
+    def __init__(self, shared_memory: SharedMemory):
+        self.shared_memory = shared_memory
+
+        self.header = np.ndarray((), dtype=_HEADER_DTYPE, buffer=shared_memory.buf)
+        channel_count = int(self.header["channel_count"])
+        capacity = int(self.header["capacity"])
+        annotation_capacity = int(self.header["annotation_capacity"])
+
+        offset = _HEADER_DTYPE.itemsize
+        self.channel_names = np.ndarray(
+            channel_count,
+            dtype=_CHANNEL_NAME_DTYPE,
+            buffer=shared_memory.buf,
+            offset=offset,
+        )
+        offset += self.channel_names.nbytes
+        # Samples are stored time-major, so any range of them is one or two
+        # contiguous slices of the buffer.
+        self.samples = np.ndarray(
+            (capacity, channel_count),
+            dtype=np.float32,
+            buffer=shared_memory.buf,
+            offset=offset,
+        )
+        offset += self.samples.nbytes
+        self.annotations = np.ndarray(
+            annotation_capacity,
+            dtype=_ANNOTATION_DTYPE,
+            buffer=shared_memory.buf,
+            offset=offset,
+        )
+
+    @staticmethod
+    def get_size(*, channel_count: int, capacity: int, annotation_capacity: int) -> int:
+        return (
+            _HEADER_DTYPE.itemsize
+            + channel_count * _CHANNEL_NAME_DTYPE.itemsize
+            + capacity * channel_count * np.dtype(np.float32).itemsize
+            + annotation_capacity * _ANNOTATION_DTYPE.itemsize
+        )
+
+    @property
+    def capacity(self) -> int:
+        return self.samples.shape[0]
+
+    @property
+    def sample_write_count(self) -> int:
+        return int(self.header["sample_write_count"])
+
+    @property
+    def sample_reserve_count(self) -> int:
+        return int(self.header["sample_reserve_count"])
+
+    @property
+    def annotation_write_count(self) -> int:
+        return int(self.header["annotation_write_count"])
+
+    @property
+    def annotation_reserve_count(self) -> int:
+        return int(self.header["annotation_reserve_count"])
+
+    def release(self) -> None:
+        # Views into the buffer have to go before it can be closed.
+        del self.header, self.channel_names, self.samples, self.annotations
+        self.shared_memory.close()
+
+
+class SharedMemoryStreamWriter:
+    def __init__(
+        self,
+        *,
+        name: str,
+        channel_names: list[str],
+        sampling_frequency: float,
+        capacity: int,
+        logger: Logger,
+        annotation_capacity: int = SHARED_MEMORY_STREAM_ANNOTATION_CAPACITY,
+    ):
+        self._logger = logger
+
+        size = _SharedMemoryRingBuffer.get_size(
+            channel_count=len(channel_names),
+            capacity=capacity,
+            annotation_capacity=annotation_capacity,
+        )
+        try:
+            shared_memory = SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            # Only a writer that never got to close, e.g. in a crashed run,
+            # leaves the stream behind.
+            stale_shared_memory = SharedMemory(name=name)
+            stale_shared_memory.close()
+            stale_shared_memory.unlink()
+            shared_memory = SharedMemory(name=name, create=True, size=size)
+            self._logger.warning(f"shared memory stream - replaced stale {name}")
+
+        header = np.ndarray((), dtype=_HEADER_DTYPE, buffer=shared_memory.buf)
+        header["format_version"] = SHARED_MEMORY_STREAM_FORMAT_VERSION
+        header["channel_count"] = len(channel_names)
+        header["sampling_frequency"] = sampling_frequency
+        header["capacity"] = capacity
+        header["annotation_capacity"] = annotation_capacity
+        del header
+
+        _written_names.add(shared_memory.name)
+
+        self._buffer = _SharedMemoryRingBuffer(shared_memory)
+        self._buffer.channel_names[:] = [
+            channel_name.encode() for channel_name in channel_names
+        ]
+
+    @property
+    def name(self) -> str:
+        return self._buffer.shared_memory.name
+
+    @property
+    def sample_count(self) -> int:
+        return self._buffer.sample_write_count
+
+    def write(self, samples: NDArray[np.float32]) -> None:
+        capacity = self._buffer.capacity
+        write_count = self._buffer.sample_write_count
+        sample_count = samples.shape[1]
+
+        # There is a single writer, so readers never need a lock. The writer
+        # reserves the samples before it overwrites anything and publishes them
+        # once they are in place. A reader checks the reserve count after it has
+        # copied, and drops whatever the writer may have got to in the meantime.
+        self._buffer.header["sample_reserve_count"] = write_count + sample_count
+
+        skipped_count = max(0, sample_count - capacity)
+        samples = samples[:, skipped_count:]
+        start = (write_count + skipped_count) % capacity
+        first_count = min(samples.shape[1], capacity - start)
+        self._buffer.samples[start : start + first_count] = samples[:, :first_count].T
+        self._buffer.samples[: samples.shape[1] - first_count] = samples[
+            :, first_count:
+        ].T
+
+        self._buffer.header["sample_write_count"] = write_count + sample_count
+
+    def annotate(self, description: str, sample_index: int | None = None) -> None:
+        encoded_description = description.encode()
+        max_length = _ANNOTATION_DTYPE["description"].itemsize
+        if len(encoded_description) > max_length:
+            # Cut on a character boundary, so that readers can still decode it.
+            encoded_description = (
+                encoded_description[:max_length].decode(errors="ignore").encode()
+            )
+            self._logger.warning(
+                f"shared memory stream - annotation truncated to {max_length} "
+                f"bytes - {description}"
+            )
+
+        write_count = self._buffer.annotation_write_count
+        self._buffer.header["annotation_reserve_count"] = write_count + 1
+        self._buffer.annotations[write_count % len(self._buffer.annotations)] = (
+            self._buffer.sample_write_count if sample_index is None else sample_index,
+            encoded_description,
+        )
+
+        self._buffer.header["annotation_write_count"] = write_count + 1
+
+    def close(self) -> None:
+        shared_memory = self._buffer.shared_memory
+        self._buffer.release()
+        shared_memory.unlink()
+        _written_names.discard(shared_memory.name)
+
+
+class SharedMemoryStreamReader:
+    def __init__(self, *, name: str = SHARED_MEMORY_STREAM_NAME):
+        shared_memory = SharedMemory(name=name)
+        if os.name == "posix" and shared_memory.name not in _written_names:
+            # Only the writer may remove the stream, but the resource tracker
+            # would also do it when a reader process exits.
+            resource_tracker.unregister(
+                shared_memory._name, "shared_memory"  # pyright: ignore
+            )
+
+        self._buffer = _SharedMemoryRingBuffer(shared_memory)
+        if self._buffer.header["format_version"] != SHARED_MEMORY_STREAM_FORMAT_VERSION:
+            raise ValueError(
+                f"{name} has unsupported format version "
+                f"{self._buffer.header['format_version']}"
+            )
+
+        self.channel_names = [
+            channel_name.decode() for channel_name in self._buffer.channel_names
+        ]
+        self.sampling_frequency = float(self._buffer.header["sampling_frequency"])
+
+        # Every reader starts at the newest sample and keeps its own cursors.
+        self.sample_cursor = self._buffer.sample_write_count
+        self.annotation_cursor = self._buffer.annotation_write_count
+
+    def read(self, max_sample_count: int | None = None) -> StreamChunk:
+        start = self.sample_cursor
+        write_count = self._buffer.sample_write_count
+        if max_sample_count is not None:
+            write_count = min(write_count, start + max_sample_count)
+
+        chunk = self._copy_samples(start, write_count)
+        self.sample_cursor = write_count
+
+        return StreamChunk(
+            start_sample=chunk.start_sample,
+            samples=chunk.samples,
+            lost_sample_count=chunk.start_sample - start,
+        )
+
+    def read_latest(self, sample_count: int) -> StreamChunk:
+        write_count = self._buffer.sample_write_count
+
+        return self._copy_samples(max(0, write_count - sample_count), write_count)
+
+    def read_annotations(self) -> StreamAnnotations:
+        annotation_capacity = len(self._buffer.annotations)
+        write_count = self._buffer.annotation_write_count
+        start = max(self.annotation_cursor, write_count - annotation_capacity)
+
+        annotations = np.take(
+            self._buffer.annotations,
+            np.arange(start, write_count) % annotation_capacity,
+        )
+
+        valid_start = max(
+            start, self._buffer.annotation_reserve_count - annotation_capacity
+        )
+        annotations = annotations[valid_start - start :]
+        lost_annotation_count = valid_start - self.annotation_cursor
+        self.annotation_cursor = write_count
+
+        return StreamAnnotations(
+            sample_indices=annotations["sample_index"],
+            descriptions=[
+                description.decode() for description in annotations["description"]
+            ],
+            lost_annotation_count=lost_annotation_count,
+        )
+
+    def close(self) -> None:
+        self._buffer.release()
+
+    def _copy_samples(self, start: int, stop: int) -> StreamChunk:
+        capacity = self._buffer.capacity
+        start = max(start, stop - capacity)
+
+        indices = np.arange(start, stop) % capacity
+        samples = np.take(self._buffer.samples, indices, axis=0)
+
+        # Samples the writer got to while they were being copied are dropped,
+        # as if they had been overwritten before the read.
+        valid_start = max(start, self._buffer.sample_reserve_count - capacity)
+
+        return StreamChunk(
+            start_sample=valid_start,
+            samples=samples[valid_start - start :].T,
+            lost_sample_count=valid_start - start,
+        )
+
+
+class SharedMemoryPublishingHeadset(EEGHeadset):
+    def __init__(
+        self,
+        *,
+        headset: EEGHeadset,
+        stream: EEGStream,
+        logger: Logger,
+        name: str = SHARED_MEMORY_STREAM_NAME,
+        capacity_seconds: float = SHARED_MEMORY_STREAM_CAPACITY_SECONDS,
+    ):
+        self._headset = headset
+        self._stream = stream
+        self._logger = logger
+
+        self._writer = SharedMemoryStreamWriter(
+            name=name,
+            channel_names=stream.channel_names,
+            sampling_frequency=stream.sampling_frequency,
+            capacity=int(capacity_seconds * stream.sampling_frequency),
+            logger=logger,
+        )
+        stream.subscribe(self._writer.write)
+        self._logger.info(f"shared memory stream - publishing as {name}")
+
+    def start(self) -> None:
+        self._headset.start()
+
+    def annotate(self, annotation: str) -> None:
+        self._headset.annotate(annotation)
+        self._writer.annotate(annotation)
+
+    def stop_and_save_at_path(self, path: Path) -> None:
+        self._headset.stop_and_save_at_path(path)
+
+    def disconnect(self) -> None:
+        try:
+            self._headset.disconnect()
+        finally:
+            self._stream.unsubscribe(self._writer.write)
+            sample_count = self._writer.sample_count
+            self._writer.close()
+            self._logger.info(
+                f"shared memory stream - closed after {sample_count} samples"
+            )
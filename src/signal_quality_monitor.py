@@ -0,0 +1,211 @@
+import threading
+from logging import Logger
+
+import numpy as np
+from numpy.typing import NDArray
+
+from .constants import (
+    SIGNAL_QUALITY_FLAT_PEAK_TO_PEAK,
+    SIGNAL_QUALITY_LINE_NOISE_FREQUENCY,
+    SIGNAL_QUALITY_MAX_LINE_NOISE_POWER,
+    SIGNAL_QUALITY_MAX_RMS,
+    SIGNAL_QUALITY_NO_BAD_CHANNELS_TEXT,
+    SIGNAL_QUALITY_SUMMARY_TEXT,
+    SIGNAL_QUALITY_UPDATE_INTERVAL_SAMPLE_COUNT,
+    SIGNAL_QUALITY_WINDOW_SAMPLE_COUNT,
+)
+from .eeg_stream import EEGStream
+
+
+class SignalQualityMonitor:
+    def __init__(
+        self,
+        *,
+        stream: EEGStream,
+        logger: Logger,
+        window_sample_count: int = SIGNAL_QUALITY_WINDOW_SAMPLE_COUNT,
+        update_interval_sample_count: int = SIGNAL_QUALITY_UPDATE_INTERVAL_SAMPLE_COUNT,
+    ):
+        self._channel_names = stream.channel_names
+        self._logger = logger
+        self._update_interval_sample_count = update_interval_sample_count
+
+        # The line-noise power is only exact for a window of whole periods, see
+        # below.
+        line_noise_period_count = (
+            window_sample_count
+            * SIGNAL_QUALITY_LINE_NOISE_FREQUENCY
+            / stream.sampling_frequency
+        )
+        if not line_noise_period_count.is_integer():
+            raise ValueError(
+                f"A window of {window_sample_count} samples at "
+                f"{stream.sampling_frequency} Hz does not span a whole number of "
+                f"{SIGNAL_QUALITY_LINE_NOISE_FREQUENCY} Hz periods"
+            )
+
+        channel_count = len(self._channel_names)
+
+        self._buffer = np.zeros((channel_count, window_sample_count), dtype=np.float32)
+        self._squared = np.empty_like(self._buffer)
+        self._write_index = 0
+        self._filled_sample_count = 0
+        self._samples_since_update = 0
+
+        # The window spans a whole number of line-noise periods, so projecting the
+        # unordered ring buffer onto these gives the same power as the ordered one.
+        phase = (
+            2
+            * np.pi
+            * SIGNAL_QUALITY_LINE_NOISE_FREQUENCY
+            * np.arange(window_sample_count)
+            / stream.sampling_frequency
+        )
+        self._line_noise_cosine = np.cos(phase).astype(np.float32)
+        self._line_noise_sine = np.sin(phase).astype(np.float32)
+        self._line_noise_scale = np.float32(2 / window_sample_count**2)
+
+        self._rms = np.zeros(channel_count, dtype=np.float32)
+        self._maximum = np.zeros(channel_count, dtype=np.float32)
+        self._minimum = np.zeros(channel_count, dtype=np.float32)
+        self._peak_to_peak = np.zeros(channel_count, dtype=np.float32)
+        self._line_noise_cosine_projection = np.zeros(channel_count, dtype=np.float32)
+        self._line_noise_sine_projection = np.zeros(channel_count, dtype=np.float32)
+        self._line_noise_power = np.zeros(channel_count, dtype=np.float32)
+
+        self._is_flat = np.zeros(channel_count, dtype=np.bool_)
+        self._is_noisy = np.zeros(channel_count, dtype=np.bool_)
+        self._has_line_noise = np.zeros(channel_count, dtype=np.bool_)
+        self._is_bad = np.zeros(channel_count, dtype=np.bool_)
+        self._was_bad = np.zeros(channel_count, dtype=np.bool_)
+
+        self._lock = threading.Lock()
+
+        stream.subscribe(self._on_samples)
+
+    @property
+    def is_ready(self) -> bool:
+        return self._filled_sample_count == self._buffer.shape[1]
+
+    def get_bad_channels(self) -> tuple[list[str], list[str], list[str]]:
+        with self._lock:
+            return (
+                self._get_channel_names(self._is_flat),
+                self._get_channel_names(self._is_noisy),
+                self._get_channel_names(self._has_line_noise),
+            )
+
+    def get_summary_text(self) -> str:
+        flat, noisy, line_noise = self.get_bad_channels()
+
+        return SIGNAL_QUALITY_SUMMARY_TEXT.format(
+            flat=", ".join(flat) or SIGNAL_QUALITY_NO_BAD_CHANNELS_TEXT,
+            noisy=", ".join(noisy) or SIGNAL_QUALITY_NO_BAD_CHANNELS_TEXT,
+            line_noise=", ".join(line_noise) or SIGNAL_QUALITY_NO_BAD_CHANNELS_TEXT,
+        )
+
+    def log_summary(self) -> None:
+        with self._lock:
+            channel_stats = ", ".join(
+                f"{channel} rms={rms:.1f} ptp={peak_to_peak:.1f} "
+                f"line={line_noise_power:.1f}"
+                for channel, rms, peak_to_peak, line_noise_power in zip(
+                    self._channel_names,
+                    self._rms,
+                    self._peak_to_peak,
+                    self._line_noise_power,
+                )
+            )
+
+        self._logger.info(f"signal quality - {channel_stats}")
+
+    def _on_samples(self, samples: NDArray[np.float32]) -> None:
+        window_sample_count = self._buffer.shape[1]
+        sample_count = samples.shape[1]
+
+        if sample_count >= window_sample_count:
+            self._buffer[:] = samples[:, -window_sample_count:]
+            self._write_index = 0
+        else:
+            head_count = min(sample_count, window_sample_count - self._write_index)
+            self._buffer[:, self._write_index : self._write_index + head_count] = (
+                samples[:, :head_count]
+            )
+            self._buffer[:, : sample_count - head_count] = samples[:, head_count:]
+            self._write_index = (self._write_index + sample_count) % window_sample_count
+
+        self._filled_sample_count = min(
+            self._filled_sample_count + sample_count, window_sample_count
+        )
+        self._samples_since_update += sample_count
+
+        if (
+            self.is_ready
+            and self._samples_since_update >= self._update_interval_sample_count
+        ):
+            self._samples_since_update = 0
+            self._update()
+
+    def _update(self) -> None:
+        with self._lock:
+            np.square(self._buffer, out=self._squared)
+            np.mean(self._squared, axis=1, out=self._rms)
+            np.sqrt(self._rms, out=self._rms)
+
+            np.max(self._buffer, axis=1, out=self._maximum)
+            np.min(self._buffer, axis=1, out=self._minimum)
+            np.subtract(self._maximum, self._minimum, out=self._peak_to_peak)
+
+            np.dot(
+                self._buffer,
+                self._line_noise_cosine,
+                out=self._line_noise_cosine_projection,
+            )
+            np.dot(
+                self._buffer,
+                self._line_noise_sine,
+                out=self._line_noise_sine_projection,
+            )
+            np.square(
+                self._line_noise_cosine_projection,
+                out=self._line_noise_cosine_projection,
+            )
+            np.square(
+                self._line_noise_sine_projection, out=self._line_noise_sine_projection
+            )
+            np.add(
+                self._line_noise_cosine_projection,
+                self._line_noise_sine_projection,
+                out=self._line_noise_power,
+            )
+            np.multiply(
+                self._line_noise_power,
+                self._line_noise_scale,
+                out=self._line_noise_power,
+            )
+
+            np.less(
+                self._peak_to_peak, SIGNAL_QUALITY_FLAT_PEAK_TO_PEAK, out=self._is_flat
+            )
+            np.greater(self._rms, SIGNAL_QUALITY_MAX_RMS, out=self._is_noisy)
+            np.greater(
+                self._line_noise_power,
+                SIGNAL_QUALITY_MAX_LINE_NOISE_POWER,
+                out=self._has_line_noise,
+            )
+
+            np.logical_or(self._is_flat, self._is_noisy, out=self._is_bad)
+            np.logical_or(self._is_bad, self._has_line_noise, out=self._is_bad)
+            has_changed = not np.array_equal(self._is_bad, self._was_bad)
+            np.copyto(self._was_bad, self._is_bad)
+
+        if has_changed:
+            flat, noisy, line_noise = self.get_bad_channels()
+            self._logger.warning(
+                f"signal quality changed - flat: {flat}, noisy: {noisy}, "
+                f"line noise: {line_noise}",
+                extra={"event": "signal_quality"},
+            )
+
+    def _get_channel_names(self, mask: NDArray[np.bool_]) -> list[str]:
+        return [channel for channel, is_set in zip(self._channel_names, mask) if is_set]
@@ -0,0 +1,313 @@
+from abc import ABC, abstractmethod
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, replace
+from logging import Logger
+from pathlib import Path
+
+import numpy as np
+from data_acquisition.event_manager import (
+    CompositeEventManager,
+    EventManager,
+    FixedTimeoutEventManager,
+    KeyPressEventManager,
+)
+from data_acquisition.eventful_screen import EventfulScreen
+from data_acquisition.gui import Gui
+from data_acquisition.gui.event_types import Key
+from data_acquisition.sequencers import (
+    BlockScreenSequencer,
+    PredefinedScreenSequencer,
+    ScreenSequencer,
+    SimpleScreenSequencer,
+)
+
+from .app_sequencer_builder import AppSequencerBuilder
+from .background_saving_headset import BackgroundSavingHeadset
+from .config import Config
+from .constants import (
+    FRAMEWORK_DISTRIBUTION_NAME,
+    SIMULATION_FRAMEWORK_VERSION,
+    SIMULATION_KEY_PRESS_PROBABILITY,
+    SIMULATION_PAUSE_PROBABILITY,
+    SIMULATION_REACTION_TIME_MEDIAN_MILLIS,
+    SIMULATION_REACTION_TIME_SIGMA,
+)
+from .eeg_stream import MockEEGStream
+from .framework_version import get_framework_version
+from .streaming_eeg_headset import StreamingEEGHeadset
+
+
+@dataclass(frozen=True, kw_only=True)
+class Response:
+    key: Key | None
+    delay_millis: int
+
+
+class Participant(ABC):
+    @abstractmethod
+    def respond(
+        self, *, keys: tuple[Key, ...], timeout_millis: int | None
+    ) -> Response: ...
+
+
+class RandomParticipant(Participant):
+    def __init__(
+        self,
+        *,
+        rng: np.random.Generator,
+        key_press_probability: float = SIMULATION_KEY_PRESS_PROBABILITY,
+        pause_probability: float = SIMULATION_PAUSE_PROBABILITY,
+        reaction_time_median_millis: int = SIMULATION_REACTION_TIME_MEDIAN_MILLIS,
+        reaction_time_sigma: float = SIMULATION_REACTION_TIME_SIGMA,
+    ):
+        self._rng = rng
+        self._key_press_probability = key_press_probability
+        self._pause_probability = pause_probability
+        self._reaction_time_mu = np.log(reaction_time_median_millis)
+        self._reaction_time_sigma = reaction_time_sigma
+
+    def respond(self, *, keys: tuple[Key, ...], timeout_millis: int | None) -> Response:
+        if timeout_millis is None:
+            return Response(key=keys[0], delay_millis=self._draw_reaction_time())
+
+        if Key.ESCAPE in keys and self._rng.random() < self._pause_probability:
+            return Response(
+                key=Key.ESCAPE, delay_millis=int(self._rng.integers(0, timeout_millis))
+            )
+
+        advance_keys = [key for key in keys if key != Key.ESCAPE]
+        if advance_keys and self._rng.random() < self._key_press_probability:
+            delay_millis = self._draw_reaction_time()
+            if delay_millis < timeout_millis:
+                return Response(key=advance_keys[0], delay_millis=delay_millis)
+
+        return Response(key=None, delay_millis=timeout_millis)
+
+    def _draw_reaction_time(self) -> int:
+        return int(
+            self._rng.lognormal(self._reaction_time_mu, self._reaction_time_sigma)
+        )
+
+
+class ScriptedParticipant(Participant):
+    def __init__(self, *, responses: Iterable[Response]):
+        self._responses: Iterator[Response] = iter(responses)
+
+    def respond(self, *, keys: tuple[Key, ...], timeout_millis: int | None) -> Response:
+        response = next(self._responses, None)
+        if response is None:
+            return Response(
+                key=None if timeout_millis is not None else keys[0],
+                delay_millis=timeout_millis or 0,
+            )
+
+        if timeout_millis is not None and (
+            response.key not in keys or response.delay_millis >= timeout_millis
+        ):
+            return Response(key=None, delay_millis=timeout_millis)
+
+        return response
+
+
+class VirtualEEGStream(MockEEGStream):
+    def __init__(self, *, logger: Logger, seed: int | None = None):
+        super().__init__(logger=logger, seed=seed)
+        self._pending_sample_count = 0.0
+
+    def start(self) -> None:
+        pass
+
+    def stop(self) -> None:
+        pass
+
+    def advance(self, millis: float) -> None:
+        self._pending_sample_count += millis * self.sampling_frequency / 1000
+        sample_count = int(self._pending_sample_count)
+        if sample_count == 0:
+            return
+
+        self._pending_sample_count -= sample_count
+        self.generate(sample_count)
+
+
+class VirtualClock:
+    def __init__(self, *, stream: VirtualEEGStream):
+        self._stream = stream
+        self._now_ns = 0
+
+    @property
+    def elapsed_millis(self) -> float:
+        return self._now_ns / 1e6
+
+    def now_ns(self) -> int:
+        return self._now_ns
+
+    def advance(self, millis: float) -> None:
+        self._now_ns += round(millis * 1_000_000)
+        self._stream.advance(millis)
+
+
+class SimulatedGui(Gui):
+    pass
+
+
+class SessionSimulator:
+    def __init__(
+        self,
+        *,
+        config: Config,
+        participant_id: str,
+        logger: Logger,
+        participant: Participant | None = None,
+        data_path: Path = Path("data"),
+    ):
+        # The simulator reads the sequencers, screens and event managers of the
+        # framework and fires them itself, through attributes that are not its
+        # public API, so it only runs on the framework version it was written for.
+        framework_version = get_framework_version()
+        if framework_version != SIMULATION_FRAMEWORK_VERSION:
+            raise RuntimeError(
+                f"Simulation needs {FRAMEWORK_DISTRIBUTION_NAME} "
+                f"{SIMULATION_FRAMEWORK_VERSION}, found {framework_version}"
+            )
+
+        self._config = config
+        self._logger = logger
+
+        seed = config.seed
+        if seed is None:
+            seed = int(np.random.SeedSequence().generate_state(1, dtype=np.uint64)[0])
+            self._config = replace(config, seed=seed)
+        self._participant = participant or RandomParticipant(
+            rng=np.random.default_rng(seed)
+        )
+
+        self._stream = VirtualEEGStream(logger=logger, seed=seed)
+        self._clock = VirtualClock(stream=self._stream)
+        self._frame_millis = 1000 / config.display_refresh_rate_hz
+
+        streaming_headset = StreamingEEGHeadset(
+            stream=self._stream,
+            logger=logger,
+            segment_dir_path=data_path / ".segments",
+        )
+        streaming_headset.set_participant_id(participant_id)
+        self._headset = BackgroundSavingHeadset(
+            headset=streaming_headset,
+            logger=logger,
+            get_sample_index=streaming_headset.get_sample_index,
+            do_use_compressed_storage=config.do_use_compressed_storage,
+            compressed_storage_scale=config.compressed_storage_scale,
+        )
+
+        # The real sequencers run against a GUI that never draws and a clock
+        # that only moves when the participant waits or a frame is flipped.
+        self._app_sequencer_builder = AppSequencerBuilder(
+            gui=SimulatedGui(),
+            config=self._config,
+            headset=self._headset,
+            participant_id=participant_id,
+            logger=logger,
+            data_path=data_path,
+            clock=self._clock.now_ns,
+            wait_for_headset_start=self._headset.wait_for_pending_start,
+        )
+
+    @property
+    def elapsed_millis(self) -> float:
+        return self._clock.elapsed_millis
+
+    def run(self) -> None:
+        self._logger.info(f"simulation - seed {self._config.seed}")
+
+        try:
+            self._run_sequencer(self._app_sequencer_builder.set_up_app_sequencer())
+            self._app_sequencer_builder.write_timing_report()
+        finally:
+            self._headset.disconnect()
+
+        self._logger.info(
+            f"simulation - finished, {self.elapsed_millis / 1000:.1f} s simulated"
+        )
+
+    def _run_sequencer(self, sequencer: ScreenSequencer[None]) -> None:
+        if isinstance(sequencer, BlockScreenSequencer):
+            for block_number, block_sequencer in enumerate(sequencer.sequencers):
+                if sequencer.block_start_callback is not None:
+                    sequencer.block_start_callback(block_number)
+                    # Annotations then land on the samples of the virtual clock
+                    # rather than on when the headset got round to starting.
+                    self._headset.wait_for_pending_start()
+                self._run_sequencer(block_sequencer)
+                if sequencer.block_end_callback is not None:
+                    sequencer.block_end_callback(block_number)
+        elif isinstance(sequencer, PredefinedScreenSequencer):
+            for screen in sequencer.screens:
+                self._show(screen)
+        elif isinstance(sequencer, SimpleScreenSequencer):
+            while True:
+                try:
+                    screen = sequencer.get_next()
+                except StopIteration:
+                    break
+                self._show(screen)
+        else:
+            raise TypeError(f"Cannot simulate {type(sequencer).__name__}")
+
+    def _show(self, screen: EventfulScreen[None]) -> None:
+        # The screen is requested, then shown on the next flip.
+        self._clock.advance(self._frame_millis)
+        if screen.screen_show_callback is not None:
+            screen.screen_show_callback()
+
+        paths = _get_leaf_paths(screen.event_manager)
+        keys = tuple(
+            leaf.key for leaf, _ in paths if isinstance(leaf, KeyPressEventManager)
+        )
+        timeouts_millis = [
+            leaf.timeout_millis
+            for leaf, _ in paths
+            if isinstance(leaf, FixedTimeoutEventManager)
+        ]
+        timeout_millis = min(timeouts_millis) if timeouts_millis else None
+
+        if keys:
+            response = self._participant.respond(
+                keys=keys, timeout_millis=timeout_millis
+            )
+        else:
+            assert timeout_millis is not None
+            response = Response(key=None, delay_millis=timeout_millis)
+        self._clock.advance(response.delay_millis)
+
+        leaf, parents = next(
+            (leaf, parents)
+            for leaf, parents in paths
+            if (
+                isinstance(leaf, KeyPressEventManager)
+                and leaf.key == response.key
+                or isinstance(leaf, FixedTimeoutEventManager)
+                and response.key is None
+                and leaf.timeout_millis == timeout_millis
+            )
+        )
+        leaf.fire(None)
+        for parent in reversed(parents):
+            parent.fire(None)
+
+
+_LeafPath = tuple[EventManager[None], tuple[EventManager[None], ...]]
+
+
+def _get_leaf_paths(
+    event_manager: EventManager[None],
+    parents: tuple[EventManager[None], ...] = (),
+) -> list[_LeafPath]:
+    if not isinstance(event_manager, CompositeEventManager):
+        return [(event_manager, parents)]
+
+    return [
+        path
+        for child in event_manager.event_managers
+        for path in _get_leaf_paths(child, (*parents, event_manager))
+    ]
@@ -0,0 +1,22 @@
+import time
+from logging import Logger
+
+
+class StartupTimer:
+    def __init__(self):
+        self._started_at = time.perf_counter()
+        self._marks: dict[str, float] = {}
+
+    @property
+    def marks(self) -> dict[str, float]:
+        return dict(self._marks)
+
+    def mark(self, name: str) -> None:
+        self._marks[name] = (time.perf_counter() - self._started_at) * 1000
+
+    def log(self, logger: Logger) -> None:
+        marks = ", ".join(
+            f"{name} {elapsed_millis:.0f} ms"
+            for name, elapsed_millis in self._marks.items()
+        )
+        logger.info(f"startup - since launch: {marks}", extra={"event": "startup"})
@@ -0,0 +1,129 @@
+import threading
+from logging import Logger
+from pathlib import Path
+
+import numpy as np
+from data_acquisition.eeg_headset import EEGHeadset
+from numpy.typing import NDArray
+
+from .block_segment import (
+    BLOCK_SEGMENT_SUFFIX,
+    BlockSegmentWriter,
+    convert_block_segment_to_fif,
+)
+from .constants import STREAMING_CHUNK_SAMPLE_COUNT, STREAMING_SEGMENT_DIR_PATH
+from .eeg_stream import EEGStream
+
+
+class StreamingEEGHeadset(EEGHeadset):
+    def __init__(
+        self,
+        *,
+        stream: EEGStream,
+        logger: Logger,
+        segment_dir_path: Path = STREAMING_SEGMENT_DIR_PATH,
+        chunk_sample_count: int = STREAMING_CHUNK_SAMPLE_COUNT,
+    ):
+        self._stream = stream
+        self._logger = logger
+        self._segment_dir_path = segment_dir_path
+        self._chunk_sample_count = chunk_sample_count
+
+        self._participant_id: str | None = None
+        self._block_index = 0
+        self._segment_writer: BlockSegmentWriter | None = None
+        self._block_start_sample_count = 0
+        self._pending_annotations: list[tuple[int, str]] = []
+        self._pending_annotations_lock = threading.Lock()
+
+        self._stream.subscribe(self._on_samples)
+
+    def set_participant_id(self, participant_id: str) -> None:
+        # Segments are named after the participant and block, so ones left
+        # behind by a crashed session have to be recovered before a new one.
+        leftover_segment_paths = sorted(
+            self._segment_dir_path.glob(f"{participant_id}_*{BLOCK_SEGMENT_SUFFIX}")
+        )
+        if leftover_segment_paths:
+            raise FileExistsError(
+                f"Segments left behind by an earlier session: "
+                f"{', '.join(map(str, leftover_segment_paths))}, convert them with "
+                f"python -m src.block_segment {self._segment_dir_path}"
+            )
+
+        self._participant_id = participant_id
+        self._block_index = 0
+
+    def start(self) -> None:
+        if self._participant_id is None:
+            raise RuntimeError("Streaming recording needs a participant id")
+        self._segment_dir_path.mkdir(parents=True, exist_ok=True)
+
+        self._segment_writer = BlockSegmentWriter(
+            path=self._segment_dir_path
+            / f"{self._participant_id}_{self._block_index}{BLOCK_SEGMENT_SUFFIX}",
+            channel_names=self._stream.channel_names,
+            sampling_frequency=self._stream.sampling_frequency,
+            chunk_sample_count=self._chunk_sample_count,
+        )
+        self._logger.info(f"streaming recording - {self._segment_writer.path}")
+        self._block_index += 1
+
+        self._block_start_sample_count = self._stream.sample_count
+        self._stream.start()
+
+    def get_sample_index(self) -> int:
+        return self._stream.sample_count - self._block_start_sample_count
+
+    def annotate(self, annotation: str) -> None:
+        self.annotate_at_sample(self.get_sample_index(), annotation)
+
+    def annotate_at_sample(self, sample_index: int, annotation: str) -> None:
+        if self._segment_writer is None:
+            self._logger.warning(f"annotation outside of recording - {annotation}")
+            return
+
+        # Written to the segment with the next samples, on the stream's thread,
+        # so that the caller does no file I/O.
+        with self._pending_annotations_lock:
+            self._pending_annotations.append((sample_index, annotation))
+
+    def stop_and_save_at_path(self, path: Path) -> None:
+        save_block_segment_at_path(self.stop_recording(), path)
+
+    def stop_recording(self) -> Path:
+        self._stream.stop()
+
+        segment_writer = self._segment_writer
+        if segment_writer is None:
+            raise RuntimeError("Streaming recording was not started")
+        self._segment_writer = None
+
+        self._write_pending_annotations(segment_writer)
+        segment_writer.close()
+
+        return segment_writer.path
+
+    def disconnect(self) -> None:
+        self._stream.close()
+
+    def _on_samples(self, samples: NDArray[np.float32]) -> None:
+        segment_writer = self._segment_writer
+        if segment_writer is not None:
+            self._write_pending_annotations(segment_writer)
+            segment_writer.write_samples(samples)
+
+    def _write_pending_annotations(self, segment_writer: BlockSegmentWriter) -> None:
+        with self._pending_annotations_lock:
+            pending_annotations, self._pending_annotations = (
+                self._pending_annotations,
+                [],
+            )
+
+        for sample_index, annotation in pending_annotations:
+            segment_writer.write_annotation(sample_index, annotation)
+
+
+def save_block_segment_at_path(segment_path: Path, path: Path) -> None:
+    convert_block_segment_to_fif(segment_path, path)
+    segment_path.unlink()
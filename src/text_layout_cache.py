@@ -0,0 +1,303 @@
+import hashlib
+import json
+import os
+import shutil
+import sys
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+from numpy.typing import NDArray
+
+from .constants import (
+    DEBUG_WINDOW_SIZE,
+    FRAMEWORK_DISTRIBUTION_NAME,
+    TEXT_LAYOUT_CACHE_DIR_PATH,
+    TEXT_LAYOUT_CACHE_MAX_BYTES,
+    TEXT_LAYOUT_FONT_NAME,
+    TEXT_LAYOUT_FONT_SIZE,
+    TEXT_LAYOUT_MAX_LINE_WIDTH_RATIO,
+    TEXT_LAYOUT_VERIFIED_FRAMEWORK_VERSIONS,
+)
+from .framework_version import get_framework_version
+from .sentence_corpus import SentenceCorpus
+from .sentences import Language, Sentences, load_sentences
+
+TEXT_LAYOUT_FORMAT_VERSION = 2
+TEXT_LAYOUT_KEY_FILE_NAME = "key.json"
+TEXT_LAYOUT_SUFFIX = ".layout"
+
+TEXT_LAYOUT_DTYPE = np.dtype(
+    [
+        ("sentence_hash", np.uint64),
+        ("break_start", np.uint64),
+        ("break_count", np.uint16),
+    ]
+)
+
+
+@dataclass(frozen=True, kw_only=True)
+class TextLayoutKey:
+    font_name: str | None
+    font_size: int
+    display_width: int
+    display_height: int
+    max_line_width_ratio: float
+
+    @property
+    def max_line_width(self) -> int:
+        return int(self.display_width * self.max_line_width_ratio)
+
+    def get_digest(self) -> str:
+        key = json.dumps(
+            {"format_version": TEXT_LAYOUT_FORMAT_VERSION, **asdict(self)},
+            sort_keys=True,
+        )
+
+        return hashlib.blake2b(key.encode(), digest_size=8).hexdigest()
+
+
+def get_text_layout_key(display_size: tuple[int, int]) -> TextLayoutKey:
+    return TextLayoutKey(
+        font_name=TEXT_LAYOUT_FONT_NAME,
+        font_size=TEXT_LAYOUT_FONT_SIZE,
+        display_width=display_size[0],
+        display_height=display_size[1],
+        max_line_width_ratio=TEXT_LAYOUT_MAX_LINE_WIDTH_RATIO,
+    )
+
+
+def check_text_layout_framework_version() -> None:
+    # Lines are broken for the font TextScreen is assumed to use, and are handed
+    # to it joined with newlines, neither of which the framework documents.
+    framework_version = get_framework_version()
+    if framework_version not in TEXT_LAYOUT_VERIFIED_FRAMEWORK_VERSIONS:
+        raise ValueError(
+            f"The text layout cache is not verified against {FRAMEWORK_DISTRIBUTION_NAME} "
+            f"{framework_version}, check that its TextScreen keeps the line breaks "
+            f"and uses the font set in src/constants.py, then add the version to "
+            f"TEXT_LAYOUT_VERIFIED_FRAMEWORK_VERSIONS"
+        )
+
+
+def get_fullscreen_size() -> tuple[int, int]:
+    import pygame
+
+    pygame.display.init()
+
+    return pygame.display.get_desktop_sizes()[0]
+
+
+class LineWrapper:
+    def __init__(self, key: TextLayoutKey):
+        import pygame.font
+
+        pygame.font.init()
+        self._font = pygame.font.Font(key.font_name, key.font_size)
+        self._max_line_width = key.max_line_width
+
+    def get_break_offsets(self, text: bytes) -> list[int]:
+        # Lines are broken greedily at spaces, whose byte offsets are returned.
+        # Whole lines are measured, so kerning counts as it does when rendered.
+        # A word wider than a line is left on a line of its own.
+        break_offsets: list[int] = []
+        line_start = 0
+        previous_word_end: int | None = None
+        for word_end in [*_find_spaces(text), len(text)]:
+            if (
+                previous_word_end is not None
+                and self._font.size(text[line_start:word_end].decode("utf-8"))[0]
+                > self._max_line_width
+            ):
+                break_offsets.append(previous_word_end)
+                line_start = previous_word_end + 1
+            previous_word_end = word_end
+
+        return break_offsets
+
+
+class CorpusLayout:
+    def __init__(self, *, corpus: SentenceCorpus, layout_path: Path):
+        self._corpus = corpus
+        self._layout, self._break_offsets = _load_corpus_layout(layout_path)
+
+    def __getitem__(self, sentence_id: int) -> str:
+        entry = self._layout[sentence_id]
+        start = int(entry["break_start"])
+
+        text = bytearray(self._corpus.get_bytes(sentence_id))
+        for offset in self._break_offsets[start : start + int(entry["break_count"])]:
+            text[offset] = ord("\n")
+
+        return text.decode("utf-8")
+
+
+@dataclass(frozen=True, kw_only=True)
+class SentenceLayouts:
+    polish: CorpusLayout
+    english: CorpusLayout
+
+    def get(self, language: Language) -> CorpusLayout:
+        return self.polish if language == Language.POLISH else self.english
+
+
+def load_sentence_layouts(
+    sentences: Sentences,
+    *,
+    key: TextLayoutKey,
+    cache_dir_path: Path = TEXT_LAYOUT_CACHE_DIR_PATH,
+    max_byte_count: int = TEXT_LAYOUT_CACHE_MAX_BYTES,
+) -> SentenceLayouts:
+    layout_dir_path = cache_dir_path / key.get_digest()
+    layout_dir_path.mkdir(parents=True, exist_ok=True)
+    # Rewritten on every use, so its modification time orders the layouts for
+    # eviction.
+    _write_atomically(
+        layout_dir_path / TEXT_LAYOUT_KEY_FILE_NAME,
+        json.dumps(asdict(key), indent=2).encode(),
+    )
+
+    wrapper: LineWrapper | None = None
+    corpus_layouts: list[CorpusLayout] = []
+    for corpus in (sentences.polish, sentences.english):
+        layout_path = layout_dir_path / f"{corpus.text_path.stem}{TEXT_LAYOUT_SUFFIX}"
+        if not is_corpus_layout_up_to_date(corpus, layout_path):
+            wrapper = wrapper or LineWrapper(key)
+            build_corpus_layout(corpus, layout_path, wrapper)
+
+        corpus_layouts.append(CorpusLayout(corpus=corpus, layout_path=layout_path))
+
+    evict_text_layouts(cache_dir_path, max_byte_count, kept_path=layout_dir_path)
+
+    polish, english = corpus_layouts
+
+    return SentenceLayouts(polish=polish, english=english)
+
+
+def is_corpus_layout_up_to_date(corpus: SentenceCorpus, layout_path: Path) -> bool:
+    return (
+        layout_path.is_file()
+        and layout_path.stat().st_mtime_ns >= corpus.text_path.stat().st_mtime_ns
+    )
+
+
+def build_corpus_layout(
+    corpus: SentenceCorpus, layout_path: Path, wrapper: LineWrapper
+) -> int:
+    # Sentences are matched to the previous layout by content, so after an
+    # edit to the corpus only new or changed sentences are laid out again.
+    previous_break_offsets: dict[int, list[int]] = {}
+    if layout_path.is_file():
+        previous_layout, previous_offsets = _load_corpus_layout(layout_path)
+        for entry in previous_layout:
+            start = int(entry["break_start"])
+            previous_break_offsets[int(entry["sentence_hash"])] = previous_offsets[
+                start : start + int(entry["break_count"])
+            ].tolist()
+
+    layout = np.zeros(len(corpus), dtype=TEXT_LAYOUT_DTYPE)
+    break_offsets: list[int] = []
+    laid_out_count = 0
+    for sentence_id in range(len(corpus)):
+        text = corpus.get_bytes(sentence_id)
+        sentence_hash = int.from_bytes(hashlib.blake2b(text, digest_size=8).digest())
+
+        sentence_break_offsets = previous_break_offsets.get(sentence_hash)
+        if sentence_break_offsets is None:
+            sentence_break_offsets = wrapper.get_break_offsets(text)
+            laid_out_count += 1
+
+        layout[sentence_id] = (
+            sentence_hash,
+            len(break_offsets),
+            len(sentence_break_offsets),
+        )
+        break_offsets.extend(sentence_break_offsets)
+
+    # Both go in one file, so a reader never sees a layout with the break
+    # offsets of another one.
+    _save_corpus_layout(layout_path, layout, np.array(break_offsets, dtype=np.uint16))
+
+    return laid_out_count
+
+
+def evict_text_layouts(
+    cache_dir_path: Path, max_byte_count: int, *, kept_path: Path
+) -> None:
+    layout_dir_paths = sorted(
+        (
+            path
+            for path in cache_dir_path.iterdir()
+            if (path / TEXT_LAYOUT_KEY_FILE_NAME).is_file()
+        ),
+        key=lambda path: (path / TEXT_LAYOUT_KEY_FILE_NAME).stat().st_mtime_ns,
+    )
+    byte_counts = {
+        path: sum(file_path.stat().st_size for file_path in path.iterdir())
+        for path in layout_dir_paths
+    }
+
+    # The least recently used layouts go first, but never the one in use.
+    byte_count = sum(byte_counts.values())
+    for path in layout_dir_paths:
+        if byte_count <= max_byte_count:
+            break
+        if path == kept_path:
+            continue
+
+        shutil.rmtree(path, ignore_errors=True)
+        byte_count -= byte_counts[path]
+
+
+def _find_spaces(text: bytes) -> list[int]:
+    return np.flatnonzero(np.frombuffer(text, dtype=np.uint8) == ord(" ")).tolist()
+
+
+def _save_corpus_layout(
+    path: Path, layout: NDArray[np.void], break_offsets: NDArray[np.uint16]
+) -> None:
+    # Stations running side by side may build the same layout at once.
+    temporary_path = path.with_name(f".{path.name}.{os.getpid()}")
+    with open(temporary_path, "wb") as file:
+        for array in (layout, break_offsets):
+            np.lib.format.write_array(file, array, version=(1, 0))
+    temporary_path.replace(path)
+
+
+def _load_corpus_layout(
+    path: Path,
+) -> tuple[NDArray[np.void], NDArray[np.uint16]]:
+    # The arrays follow each other in .npy format and are mapped where they are.
+    arrays: list[NDArray[Any]] = []
+    with open(path, "rb") as file:
+        for _ in range(2):
+            np.lib.format.read_magic(file)
+            shape, _, dtype = np.lib.format.read_array_header_1_0(file)
+            offset = file.tell()
+            arrays.append(
+                np.memmap(path, dtype=dtype, mode="r", shape=shape, offset=offset)
+            )
+            file.seek(offset + dtype.itemsize * int(np.prod(shape)))
+
+    layout, break_offsets = arrays
+
+    return layout, break_offsets
+
+
+def _write_atomically(path: Path, data: bytes) -> None:
+    temporary_path = path.with_name(f".{path.name}.{os.getpid()}")
+    temporary_path.write_bytes(data)
+    temporary_path.replace(path)
+
+
+if __name__ == "__main__":
+    display_sizes = [
+        tuple(int(size) for size in argument.split("x")) for argument in sys.argv[1:]
+    ] or [DEBUG_WINDOW_SIZE, get_fullscreen_size()]
+
+    sentences = load_sentences()
+    for display_width, display_height in display_sizes:
+        key = get_text_layout_key((display_width, display_height))
+        load_sentence_layouts(sentences, key=key)
+        print(f"laid out sentences for {display_width}x{display_height}")
@@ -0,0 +1,212 @@
+import json
+import time
+from collections.abc import Callable
+from enum import IntEnum
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+from numpy.typing import NDArray
+
+from .constants import TIMING_REPORT_PERCENTILES
+
+
+class ScreenType(IntEnum):
+    START_EXPERIMENT = 0
+    CONTINUE = 1
+    FIXATION_CROSS = 2
+    SENTENCE = 3
+    PAUSE = 4
+    RELAX = 5
+
+
+class EventSource(IntEnum):
+    NONE = 0
+    KEY = 1
+    TIMEOUT = 2
+    PAUSE = 3
+
+
+UNSET = -1
+
+TIMING_RECORD_DTYPE = np.dtype(
+    [
+        ("block", np.int16),
+        ("screen_type", np.uint8),
+        ("event_source", np.uint8),
+        ("trial", np.int32),
+        ("configured_timeout_millis", np.int32),
+        ("requested_ns", np.int64),
+        ("planned_ns", np.int64),
+        ("shown_ns", np.int64),
+        ("annotated_ns", np.int64),
+        ("event_ns", np.int64),
+    ]
+)
+
+
+class TimingRecorder:
+    def __init__(
+        self, *, capacity: int, clock: Callable[[], int] = time.perf_counter_ns
+    ):
+        self._clock = clock
+        self._records = self._allocate(capacity)
+        self._count = 0
+
+    @property
+    def records(self) -> NDArray[np.void]:
+        return self._records[: self._count]
+
+    def begin(
+        self,
+        *,
+        block: int,
+        screen_type: ScreenType,
+        trial: int = UNSET,
+        configured_timeout_millis: int = UNSET,
+    ) -> int:
+        requested_ns = self._clock()
+
+        if self._count == len(self._records):
+            records = self._allocate(2 * len(self._records))
+            records[: self._count] = self._records
+            self._records = records
+
+        row = self._count
+        self._count += 1
+
+        record = self._records[row]
+        record["block"] = block
+        record["screen_type"] = screen_type
+        record["trial"] = trial
+        record["configured_timeout_millis"] = configured_timeout_millis
+        record["requested_ns"] = requested_ns
+
+        return row
+
+    def mark_planned(self, row: int, planned_ns: int) -> None:
+        self._records[row]["planned_ns"] = planned_ns
+
+    def mark_shown(self, row: int) -> None:
+        self._records[row]["shown_ns"] = self._clock()
+
+    def mark_annotated(self, row: int) -> None:
+        self._records[row]["annotated_ns"] = self._clock()
+
+    def mark_event(self, row: int, source: EventSource) -> None:
+        record = self._records[row]
+        if record["event_ns"] == UNSET:
+            record["event_ns"] = self._clock()
+            record["event_source"] = source
+
+    def summarize(self, *, block: int, screen_type: ScreenType) -> dict[str, Any]:
+        records = self.records
+        is_selected = (records["block"] == block) & (
+            records["screen_type"] == screen_type
+        )
+        selected = records[is_selected]
+        previous = self._get_previous_records(is_selected)
+
+        is_timed_out = (selected["event_source"] == EventSource.TIMEOUT) & (
+            selected["configured_timeout_millis"] != UNSET
+        )
+        timed_out = selected[is_timed_out]
+
+        return {
+            "count": int(len(selected)),
+            "show_latency_ms": self._describe(
+                selected["shown_ns"] - selected["requested_ns"],
+                selected["shown_ns"],
+                selected["requested_ns"],
+            ),
+            "onset_after_previous_event_ms": self._describe(
+                selected["shown_ns"] - previous["event_ns"],
+                selected["shown_ns"],
+                previous["event_ns"],
+            ),
+            "onset_error_ms": self._describe(
+                selected["shown_ns"] - selected["planned_ns"],
+                selected["shown_ns"],
+                selected["planned_ns"],
+            ),
+            "annotation_offset_ms": self._describe(
+                selected["annotated_ns"] - selected["shown_ns"],
+                selected["annotated_ns"],
+                selected["shown_ns"],
+            ),
+            "timeout_drift_ms": self._describe(
+                timed_out["event_ns"]
+                - timed_out["shown_ns"]
+                - timed_out["configured_timeout_millis"].astype(np.int64) * 1_000_000,
+                timed_out["event_ns"],
+                timed_out["shown_ns"],
+            ),
+        }
+
+    def write_report(self, path: Path) -> None:
+        records = self.records
+
+        report = {
+            str(block): {
+                ScreenType(screen_type).name.lower(): self.summarize(
+                    block=int(block), screen_type=ScreenType(screen_type)
+                )
+                for screen_type in np.unique(
+                    records[records["block"] == block]["screen_type"]
+                )
+            }
+            for block in np.unique(records["block"])
+        }
+
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+
+    def save(self, path: Path) -> None:
+        np.save(path, self.records)
+
+    def _get_previous_records(self, is_selected: NDArray[np.bool_]) -> NDArray[np.void]:
+        previous_rows = np.flatnonzero(is_selected) - 1
+        previous = self._allocate(len(previous_rows))
+        previous[previous_rows >= 0] = self._records[previous_rows[previous_rows >= 0]]
+
+        return previous
+
+    @staticmethod
+    def _describe(
+        differences_ns: NDArray[np.int64],
+        *timestamps_ns: NDArray[np.int64],
+    ) -> dict[str, float] | None:
+        is_complete = np.logical_and.reduce(
+            [timestamp_ns != UNSET for timestamp_ns in timestamps_ns]
+        )
+        differences_ms = differences_ns[is_complete] / 1e6
+        if len(differences_ms) == 0:
+            return None
+
+        percentiles = np.percentile(differences_ms, TIMING_REPORT_PERCENTILES)
+
+        return {
+            "mean": float(differences_ms.mean()),
+            "std": float(differences_ms.std()),
+            **{
+                f"p{percentile:g}": float(value)
+                for percentile, value in zip(TIMING_REPORT_PERCENTILES, percentiles)
+            },
+            "max": float(differences_ms.max()),
+        }
+
+    @staticmethod
+    def _allocate(capacity: int) -> NDArray[np.void]:
+        records = np.zeros(capacity, dtype=TIMING_RECORD_DTYPE)
+        for field in (
+            "trial",
+            "configured_timeout_millis",
+            "requested_ns",
+            "planned_ns",
+            "shown_ns",
+            "annotated_ns",
+            "event_ns",
+        ):
+            records[field] = UNSET
+
+        return records
@@ -0,0 +1,169 @@
+from importlib.util import find_spec
+from unittest import SkipTest
+
+# The framework is installed from its git repository, which CI does not do.
+if find_spec("data_acquisition") is None:
+    raise SkipTest("data-acquisition-framework is not installed")
+
+import logging
+import tempfile
+import threading
+from pathlib import Path
+from unittest import TestCase
+from unittest.mock import patch
+
+import mne
+import numpy as np
+from data_acquisition.eeg_headset import EEGHeadset
+
+from src.background_saving_headset import BackgroundSavingHeadset
+from src.block_segment import read_block_segment
+from src.eeg_stream import MockEEGStream
+from src.streaming_eeg_headset import StreamingEEGHeadset, save_block_segment_at_path
+
+LOGGER = logging.getLogger(__name__)
+
+
+class ManualEEGStream(MockEEGStream):
+    def __init__(self) -> None:
+        super().__init__(logger=LOGGER, seed=0)
+        self.start_count = 0
+        self.started = threading.Semaphore(0)
+
+    def start(self) -> None:
+        self.start_count += 1
+        self.started.release()
+
+    def stop(self) -> None:
+        pass
+
+
+class FifWritingHeadset(EEGHeadset):
+    def __init__(self) -> None:
+        self.annotations: list[str] = []
+        self.start_released = threading.Event()
+        self.start_released.set()
+
+    def start(self) -> None:
+        self.start_released.wait()
+        self.annotations = []
+
+    def annotate(self, annotation: str) -> None:
+        self.annotations.append(annotation)
+
+    def stop_and_save_at_path(self, path: Path) -> None:
+        info = mne.create_info(["Cz"], 250.0, ch_types="eeg")
+        raw = mne.io.RawArray(np.zeros((1, 250)), info, verbose="error")
+        raw.set_annotations(
+            mne.Annotations(
+                onset=np.arange(len(self.annotations)) / 250,
+                duration=np.zeros(len(self.annotations)),
+                description=self.annotations,
+            )
+        )
+        raw.save(path, verbose="error")
+
+    def disconnect(self) -> None:
+        pass
+
+
+class TestBackgroundSavingHeadset(TestCase):
+    def setUp(self) -> None:
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.path = Path(temp_dir.name)
+
+        self.stream = ManualEEGStream()
+        streaming_headset = StreamingEEGHeadset(
+            stream=self.stream, logger=LOGGER, segment_dir_path=self.path / "segments"
+        )
+        streaming_headset.set_participant_id("participant")
+        self.headset = BackgroundSavingHeadset(
+            headset=streaming_headset,
+            logger=LOGGER,
+            get_sample_index=streaming_headset.get_sample_index,
+        )
+
+    def record_block(self, block: int) -> None:
+        self.headset.start()
+        self.assertTrue(self.stream.started.acquire(timeout=5))
+        self.stream.generate(500)
+        self.headset.stop_and_save_at_path(self.path / f"{block}_raw.fif")
+
+    def test_next_block_starts_while_previous_one_is_saved(self) -> None:
+        save_released = threading.Event()
+
+        def save_when_released(segment_path: Path, path: Path) -> None:
+            save_released.wait()
+            save_block_segment_at_path(segment_path, path)
+
+        with patch(
+            "src.background_saving_headset.save_block_segment_at_path",
+            side_effect=save_when_released,
+        ):
+            self.record_block(0)
+            self.record_block(1)
+            self.assertEqual(self.stream.start_count, 2)
+            self.assertFalse((self.path / "0_raw.fif").exists())
+
+            save_released.set()
+            self.headset.disconnect()
+
+        for block in range(2):
+            raw = mne.io.read_raw_fif(self.path / f"{block}_raw.fif", verbose="error")
+            self.assertEqual(raw.n_times, 500)
+
+    def test_streaming_annotations_are_in_the_segment_with_the_next_samples(
+        self,
+    ) -> None:
+        self.headset.start()
+        self.assertTrue(self.stream.started.acquire(timeout=5))
+        self.stream.generate(300)
+        self.headset.annotate("sentence_start")
+        self.stream.generate(100)
+
+        (segment_path,) = (self.path / "segments").iterdir()
+        segment = read_block_segment(segment_path)
+        self.assertEqual(segment.annotation_sample_indices, [300])
+        self.assertEqual(segment.annotation_descriptions, ["sentence_start"])
+
+        self.headset.stop_and_save_at_path(self.path / "0_raw.fif")
+        self.headset.disconnect()
+
+        raw = mne.io.read_raw_fif(self.path / "0_raw.fif", verbose="error")
+        self.assertEqual(list(raw.annotations.description), ["sentence_start"])
+
+    def test_annotations_go_into_the_fif_file_of_a_headset_without_sample_clock(
+        self,
+    ) -> None:
+        fif_writing_headset = FifWritingHeadset()
+        headset = BackgroundSavingHeadset(headset=fif_writing_headset, logger=LOGGER)
+        fif_path = self.path / "0_raw.fif"
+
+        # Annotations made while the headset is starting don't wait for it.
+        fif_writing_headset.start_released.clear()
+        headset.start()
+        headset.annotate("block_start")
+        fif_writing_headset.start_released.set()
+        headset.wait_for_pending_start()
+        headset.annotate("sentence_start")
+
+        headset.stop_and_save_at_path(fif_path)
+        headset.disconnect()
+
+        self.assertEqual(fif_writing_headset.annotations, [])
+        self.assertEqual(
+            sorted(path.name for path in self.path.iterdir()),
+            [
+                "0_raw.fif",
+                "0_raw_annotations.npy",
+            ],
+        )
+        raw = mne.io.read_raw_fif(fif_path, verbose="error")
+        self.assertEqual(
+            list(raw.annotations.description), ["block_start", "sentence_start"]
+        )
+        annotations = np.load(self.path / "0_raw_annotations.npy")
+        self.assertEqual(
+            annotations["description"].tolist(), ["block_start", "sentence_start"]
+        )
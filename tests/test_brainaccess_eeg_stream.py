@@ -0,0 +1,71 @@
+from importlib.util import find_spec
+from unittest import SkipTest
+
+# The BrainAccess SDK is installed by hand, see the README.
+if find_spec("brainaccess") is None:
+    raise SkipTest("brainaccess is not installed")
+
+import logging
+from unittest import TestCase
+from unittest.mock import patch
+
+import numpy as np
+from numpy.typing import NDArray
+
+from src.brainaccess_eeg_stream import BrainAccessEEGStream
+
+LOGGER = logging.getLogger(__name__)
+
+
+class TestBrainAccessEEGStream(TestCase):
+    def setUp(self) -> None:
+        patcher = patch("src.brainaccess_eeg_stream.core")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = patch("src.brainaccess_eeg_stream.EEGManager")
+        self.manager = patcher.start().return_value
+        self.addCleanup(patcher.stop)
+
+        self.manager.connect.return_value = 0
+        self.manager.get_sample_frequency.return_value = 250
+        # The sample number comes first in every chunk, then the electrodes in
+        # reverse order.
+        self.manager.get_channel_index.side_effect = lambda channel: 4 - channel
+
+        self.stream = BrainAccessEEGStream(
+            device_name="BA MAXI 001",
+            device_channels={0: "Fp1", 1: "Fp2", 2: "Cz"},
+            logger=LOGGER,
+        )
+        self.samples: list[NDArray[np.float32]] = []
+        self.stream.subscribe(self.samples.append)
+        (self.on_chunk,) = self.manager.set_callback_chunk.call_args.args
+
+    def test_chunks_are_published_in_channel_order(self) -> None:
+        self.stream.start()
+        chunk = [np.arange(4.0) + 10 * row for row in range(4)]
+        self.on_chunk(chunk, 4)
+
+        (samples,) = self.samples
+        np.testing.assert_array_equal(samples, [chunk[3], chunk[2], chunk[1]])
+        self.assertEqual(samples.dtype, np.float32)
+        self.assertEqual(self.stream.sample_count, 4)
+
+    def test_chunks_outside_of_recording_are_dropped(self) -> None:
+        chunk = [np.zeros(4) for _ in range(4)]
+        self.on_chunk(chunk, 4)
+        self.stream.start()
+        self.stream.stop()
+        self.on_chunk(chunk, 4)
+
+        self.assertEqual(self.samples, [])
+        self.assertEqual(self.stream.sample_count, 0)
+
+    def test_incompatible_stream_is_refused(self) -> None:
+        self.manager.connect.return_value = 2
+
+        with self.assertRaises(RuntimeError):
+            BrainAccessEEGStream(
+                device_name="BA MAXI 001", device_channels={0: "Fp1"}, logger=LOGGER
+            )
+        self.manager.destroy.assert_called_once()
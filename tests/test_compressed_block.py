@@ -0,0 +1,90 @@
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+from unittest import TestCase
+
+import mne
+import numpy as np
+
+from src.compressed_block import read_compressed_block, write_compressed_block
+
+SAMPLING_FREQUENCY = 250.0
+FIRST_SAMPLE = 1000
+
+
+def get_raw(seed: int = 0) -> mne.io.RawArray:
+    info = mne.create_info(["Cz", "Pz", "Trigger"], SAMPLING_FREQUENCY)
+    info.set_channel_types(
+        {"Cz": "eeg", "Pz": "eeg", "Trigger": "misc"}, on_unit_change="ignore"
+    )
+    data = np.random.default_rng(seed).standard_normal((3, 1100)) * 1e-5
+    raw = mne.io.RawArray(data, info, first_samp=FIRST_SAMPLE, verbose="error")
+    raw.set_meas_date(datetime(2025, 1, 1, tzinfo=timezone.utc))
+    raw.set_annotations(
+        mne.Annotations(
+            onset=[0.4, 2.0],
+            duration=[0.0, 0.5],
+            description=["SENTENCE_START", "SENTENCE_END"],
+        )
+    )
+
+    return raw
+
+
+class TestCompressedBlock(TestCase):
+    def setUp(self) -> None:
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.path = Path(temp_dir.name) / "0_raw.eegz"
+
+    def round_trip(self, raw: mne.io.BaseRaw, scale: float | None) -> mne.io.BaseRaw:
+        # Chunks of 0.3 s do not divide the block, so the last one is short.
+        write_compressed_block(raw, self.path, chunk_seconds=0.3, scale=scale)
+        block = read_compressed_block(self.path)
+        self.assertTrue(block.matches(raw))
+
+        return block.to_raw()
+
+    def assert_metadata_kept(
+        self, raw: mne.io.BaseRaw, restored: mne.io.BaseRaw
+    ) -> None:
+        self.assertEqual(restored.first_samp, FIRST_SAMPLE)
+        self.assertEqual(restored.n_times, raw.n_times)
+        self.assertEqual(restored.ch_names, raw.ch_names)
+        self.assertEqual(restored.get_channel_types(), raw.get_channel_types())
+        self.assertEqual(restored.info["meas_date"], raw.info["meas_date"])
+        self.assertEqual(
+            list(restored.annotations.description), list(raw.annotations.description)
+        )
+        np.testing.assert_allclose(restored.annotations.onset, raw.annotations.onset)
+        np.testing.assert_allclose(
+            restored.annotations.duration, raw.annotations.duration
+        )
+
+    def test_lossless_round_trip(self) -> None:
+        raw = get_raw()
+
+        restored = self.round_trip(raw, scale=None)
+
+        self.assert_metadata_kept(raw, restored)
+        np.testing.assert_array_equal(
+            restored.get_data(), np.asarray(raw.get_data(), dtype=np.float32)
+        )
+        np.testing.assert_array_equal(
+            restored.get_data(start=290, stop=610),
+            np.asarray(raw.get_data(start=290, stop=610), dtype=np.float32),
+        )
+
+    def test_scaled_round_trip(self) -> None:
+        raw = get_raw()
+        scale = 1e-8
+
+        restored = self.round_trip(raw, scale=scale)
+
+        self.assert_metadata_kept(raw, restored)
+        np.testing.assert_allclose(restored.get_data(), raw.get_data(), atol=scale)
+
+    def test_block_does_not_match_other_samples(self) -> None:
+        write_compressed_block(get_raw(), self.path, chunk_seconds=0.3)
+
+        self.assertFalse(read_compressed_block(self.path).matches(get_raw(seed=1)))
@@ -0,0 +1,134 @@
+from importlib.util import find_spec
+from unittest import SkipTest
+
+# The framework is installed from its git repository, which CI does not do.
+if find_spec("data_acquisition") is None:
+    raise SkipTest("data-acquisition-framework is not installed")
+
+from unittest import TestCase
+
+from src.deadline_scheduler import DeadlineScheduler
+from src.timing_recorder import EventSource, ScreenType, TimingRecorder
+
+REFRESH_RATE_HZ = 60
+FRAME_NS = 1e9 / REFRESH_RATE_HZ
+SHOW_LATENCY_NS = 7_000_000
+SWITCH_LATENCY_NS = 3_000_000
+TIMEOUTS_MILLIS = [700, 5000, 850, 5000, 1200, 5000] * 5
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now_ns = 1_000_000_000
+
+    def __call__(self) -> int:
+        return self.now_ns
+
+
+class TestDeadlineScheduler(TestCase):
+    def setUp(self) -> None:
+        self.clock = Clock()
+        self.timing_recorder = TimingRecorder(
+            capacity=len(TIMEOUTS_MILLIS), clock=self.clock
+        )
+        self.scheduler = DeadlineScheduler(
+            timing_recorder=self.timing_recorder,
+            refresh_rate_hz=REFRESH_RATE_HZ,
+            clock=self.clock,
+        )
+
+    def show_screens(
+        self, timeouts_millis: list[int], request_delay_ns: int = 0
+    ) -> list[int]:
+        scheduled_timeouts_millis: list[int] = []
+        for timeout_millis in timeouts_millis:
+            self.clock.now_ns += request_delay_ns
+            row = self.timing_recorder.begin(
+                block=0,
+                screen_type=ScreenType.FIXATION_CROSS,
+                configured_timeout_millis=timeout_millis,
+            )
+            scheduled_timeout_millis = self.scheduler.schedule(row, timeout_millis)
+            scheduled_timeouts_millis.append(scheduled_timeout_millis)
+
+            self.clock.now_ns += SHOW_LATENCY_NS
+            self.timing_recorder.mark_shown(row)
+            self.scheduler.observe(row)
+
+            self.clock.now_ns += scheduled_timeout_millis * 1_000_000
+            self.timing_recorder.mark_event(row, EventSource.TIMEOUT)
+            self.clock.now_ns += SWITCH_LATENCY_NS
+
+        return scheduled_timeouts_millis
+
+    def test_overheads_do_not_accumulate(self) -> None:
+        started_at_ns = self.clock.now_ns + SHOW_LATENCY_NS
+
+        self.show_screens(TIMEOUTS_MILLIS)
+
+        records = self.timing_recorder.records
+        onset_errors_ns = records["shown_ns"] - records["planned_ns"]
+        self.assertLessEqual(abs(onset_errors_ns).max(), FRAME_NS)
+
+        ended_at_ns = self.clock.now_ns - SWITCH_LATENCY_NS + SHOW_LATENCY_NS
+        self.assertLessEqual(
+            abs(ended_at_ns - started_at_ns - sum(TIMEOUTS_MILLIS) * 1_000_000),
+            FRAME_NS,
+        )
+
+    def test_reset_starts_a_new_chain(self) -> None:
+        self.show_screens(TIMEOUTS_MILLIS[:2])
+        self.clock.now_ns += 10_000_000_000
+        self.scheduler.reset()
+        self.show_screens(TIMEOUTS_MILLIS[2:4])
+
+        records = self.timing_recorder.records
+        self.assertEqual(records[2]["planned_ns"], records[2]["shown_ns"])
+        self.assertLessEqual(
+            abs(records[3]["shown_ns"] - records[3]["planned_ns"]), FRAME_NS
+        )
+
+    def test_late_screens_are_cut_by_at_most_a_frame(self) -> None:
+        request_delay_ns = 100_000_000
+        scheduled_timeouts_millis = self.show_screens(
+            TIMEOUTS_MILLIS[:4], request_delay_ns=request_delay_ns
+        )
+
+        # The first screen anchors the chain, so only the later ones are late.
+        for timeout_millis, scheduled_timeout_millis in zip(
+            TIMEOUTS_MILLIS[1:4], scheduled_timeouts_millis[1:]
+        ):
+            self.assertEqual(
+                scheduled_timeout_millis,
+                self.scheduler.get_timeouts_millis(timeout_millis)[0],
+            )
+
+        # The lateness the screens could not make up is still reported...
+        self.clock.now_ns += request_delay_ns
+        self.assertGreater(
+            self.scheduler.get_millis_after_plan(), 3 * request_delay_ns / 1e6
+        )
+
+        # ...until the chain starts again.
+        self.scheduler.reset()
+        self.assertEqual(self.scheduler.get_millis_after_plan(), 0.0)
+        self.show_screens(TIMEOUTS_MILLIS[4:6])
+        self.assertLessEqual(
+            abs(self.scheduler.get_millis_after_plan()) * 1e6,
+            SHOW_LATENCY_NS + SWITCH_LATENCY_NS + FRAME_NS,
+        )
+
+    def test_scheduled_timeouts_are_among_the_prebuilt_ones(self) -> None:
+        for request_delay_ns in (0, 10_000_000, 100_000_000):
+            self.scheduler.reset()
+            scheduled_timeouts_millis = self.show_screens(
+                TIMEOUTS_MILLIS, request_delay_ns=request_delay_ns
+            )
+
+            for timeout_millis, scheduled_timeout_millis in zip(
+                TIMEOUTS_MILLIS, scheduled_timeouts_millis
+            ):
+                self.assertIn(
+                    scheduled_timeout_millis,
+                    self.scheduler.get_timeouts_millis(timeout_millis),
+                )
@@ -0,0 +1,117 @@
+import os
+import sys
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+from unittest import TestCase
+from unittest.mock import patch
+
+import mne
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "eeg_checker"))
+
+import cache  # noqa: E402
+import utils  # noqa: E402
+
+
+def write_recording(path: Path, sample_count: int = 1000) -> None:
+    info = mne.create_info(["Cz", "Pz"], 250.0, ch_types="eeg")
+    data = np.random.default_rng(0).standard_normal((2, sample_count))
+    mne.io.RawArray(data, info, verbose="error").save(
+        path, overwrite=True, verbose="error"
+    )
+
+
+def compute(path: Path) -> mne.io.BaseRaw:
+    return mne.io.read_raw_fif(path, preload=True, verbose="error")
+
+
+class TestCache(TestCase):
+    def setUp(self) -> None:
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.path = Path(temp_dir.name)
+        self.cache_path = self.path / "cache"
+        self.recording_path = self.path / "0_raw.fif"
+        write_recording(self.recording_path)
+
+        self.compute_count = 0
+
+    def load(self, parameters: dict[str, float]) -> mne.io.BaseRaw:
+        def count_and_compute() -> mne.io.BaseRaw:
+            self.compute_count += 1
+            return compute(self.recording_path)
+
+        return cache.load_or_compute(
+            self.recording_path,
+            parameters,
+            count_and_compute,
+            cache_path=self.cache_path,
+        )
+
+    def test_unchanged_recording_is_loaded_and_hashed_once(self) -> None:
+        with patch.object(cache, "hash_file", wraps=cache.hash_file) as hash_file:
+            computed = self.load({"tmin": 0.0})
+            loaded = self.load({"tmin": 0.0})
+
+        self.assertEqual(self.compute_count, 1)
+        self.assertEqual(hash_file.call_count, 1)
+        np.testing.assert_array_equal(loaded.get_data(), computed.get_data())
+
+    def test_changed_recording_is_computed_again(self) -> None:
+        self.load({"tmin": 0.0})
+
+        write_recording(self.recording_path, sample_count=1250)
+        stat = self.recording_path.stat()
+        os.utime(self.recording_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+        loaded = self.load({"tmin": 0.0})
+
+        self.assertEqual(self.compute_count, 2)
+        self.assertEqual(loaded.n_times, 1250)
+
+    def test_changed_parameters_are_computed_again(self) -> None:
+        self.load({"tmin": 0.0})
+        self.load({"tmin": 1.0})
+
+        self.assertEqual(self.compute_count, 2)
+
+    def test_cached_window_keeps_first_sample_and_annotations(self) -> None:
+        info = mne.create_info(utils.CHANNELS, utils.SAMPLING_FREQUENCY, "eeg")
+        data = np.random.default_rng(0).standard_normal(
+            (len(utils.CHANNELS), 120 * utils.SAMPLING_FREQUENCY)
+        )
+        raw = mne.io.RawArray(data, info, verbose="error")
+        raw.set_meas_date(datetime(2025, 1, 1, tzinfo=timezone.utc))
+        raw.set_annotations(
+            mne.Annotations(
+                onset=[105.0],
+                duration=[0.0],
+                description=["SENTENCE_START"],
+                orig_time=raw.info["meas_date"],
+            )
+        )
+        raw.save(self.recording_path, overwrite=True, verbose="error")
+
+        with patch.object(utils, "DATA_PATH", self.path):
+            windows = [
+                cache.load_or_compute(
+                    self.recording_path,
+                    {"tmin": 100, "tmax": 110},
+                    lambda: utils.preprocess_window(
+                        self.recording_path.name, tmin=100, tmax=110
+                    ),
+                    cache_path=self.cache_path,
+                )
+                for _ in range(2)
+            ]
+
+        computed, cached = windows
+        self.assertEqual(computed.first_samp, 100 * utils.SAMPLING_FREQUENCY)
+        self.assertEqual(cached.first_samp, computed.first_samp)
+        self.assertEqual(cached.annotations.orig_time, computed.annotations.orig_time)
+        np.testing.assert_array_equal(
+            cached.annotations.onset, computed.annotations.onset
+        )
+        self.assertEqual(list(cached.annotations.description), ["SENTENCE_START"])
+        np.testing.assert_allclose(cached.get_data(), computed.get_data())
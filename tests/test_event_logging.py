@@ -0,0 +1,70 @@
+from importlib.util import find_spec
+from unittest import SkipTest
+
+# The framework is installed from its git repository, which CI does not do.
+if find_spec("data_acquisition") is None:
+    raise SkipTest("data-acquisition-framework is not installed")
+
+import json
+import logging
+import tempfile
+import threading
+from collections.abc import Callable
+from pathlib import Path
+from unittest import TestCase
+
+from src.event_logging import set_up_event_logging
+
+
+def fail() -> None:
+    raise ValueError("thread failed")
+
+
+class TestEventLogging(TestCase):
+    def setUp(self) -> None:
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.path = Path(temp_dir.name)
+
+    def test_thread_exceptions_are_logged_until_stopped(self) -> None:
+        # Keeps the expected traceback out of the test output.
+        self.addCleanup(setattr, threading, "excepthook", threading.excepthook)
+        quiet_excepthook: Callable[[threading.ExceptHookArgs], None] = lambda args: None
+        threading.excepthook = quiet_excepthook
+
+        logger = logging.getLogger(__name__)
+        self.addCleanup(logger.handlers.clear)
+        event_log_path = self.path / "events.jsonl"
+        listener = set_up_event_logging(logger=logger, level=logging.INFO)
+        listener.start(
+            log_path=self.path / "session.log", event_log_path=event_log_path
+        )
+
+        thread = threading.Thread(target=fail, name="failing")
+        thread.start()
+        thread.join()
+        listener.stop()
+
+        self.assertIs(threading.excepthook, quiet_excepthook)
+        self.assertEqual(logger.handlers, [])
+        with open(event_log_path, encoding="utf-8") as file:
+            (event,) = [json.loads(line) for line in file]
+        self.assertEqual(event["message"], "uncaught exception in thread failing")
+        self.assertIn("ValueError: thread failed", event["exception"])
+
+    def test_records_logged_before_start_are_written_once_started(self) -> None:
+        logger = logging.getLogger(f"{__name__}.early")
+        self.addCleanup(logger.handlers.clear)
+        log_path = self.path / "session.log"
+        listener = set_up_event_logging(logger=logger, level=logging.INFO)
+
+        logger.info("headset - connecting")
+        self.assertFalse(listener.is_started)
+        listener.start(log_path=log_path, event_log_path=self.path / "events.jsonl")
+        logger.info("session started")
+        listener.stop()
+
+        lines = log_path.read_text(encoding="utf-8").splitlines()
+        self.assertEqual(len(lines), 2)
+        self.assertTrue(lines[0].endswith("headset - connecting"))
+        self.assertTrue(lines[1].endswith("session started"))
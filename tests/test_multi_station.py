@@ -0,0 +1,175 @@
+from importlib.util import find_spec
+from unittest import SkipTest
+
+# The framework is installed from its git repository, which CI does not do.
+if find_spec("data_acquisition") is None:
+    raise SkipTest("data-acquisition-framework is not installed")
+
+import contextlib
+import io
+import json
+import logging
+import tempfile
+from pathlib import Path
+from typing import Any
+from unittest import TestCase
+
+from src.multi_station import (
+    MultiStationLauncher,
+    Station,
+    StationDashboard,
+    compare_timing,
+    load_stations,
+    summarize_timing_report,
+)
+
+STATION = Station(name="s1", brainaccess_cap_name="BA MAXI 011", participant_id="p1")
+LOGGER = logging.getLogger(__name__)
+
+
+def get_description(p99: float, std: float = 1.0) -> dict[str, float]:
+    return {"mean": 0.0, "std": std, "p50": 0.0, "p90": 0.0, "p99": p99, "max": p99}
+
+
+def get_timing_report(sentence_p99s: list[float]) -> dict[str, Any]:
+    return {
+        str(block): {
+            "sentence": {
+                "show_latency_ms": get_description(p99),
+                "onset_after_previous_event_ms": get_description(p99),
+            },
+            "fixation_cross": {
+                "timeout_drift_ms": get_description(1.0),
+                "onset_error_ms": None,
+            },
+        }
+        for block, p99 in enumerate(sentence_p99s)
+    }
+
+
+class TestMultiStation(TestCase):
+    def setUp(self) -> None:
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.path = Path(temp_dir.name)
+
+    def test_stations_must_be_distinct(self) -> None:
+        stations_path = self.path / "stations.json"
+        with open(stations_path, "w", encoding="utf-8") as file:
+            json.dump(
+                [
+                    {"name": "s1", "brainaccess_cap_name": "a", "participant_id": "p1"},
+                    {"name": "s2", "brainaccess_cap_name": "a", "participant_id": "p2"},
+                ],
+                file,
+            )
+
+        with self.assertRaises(ValueError):
+            load_stations(stations_path)
+
+    def test_dashboard_reads_complete_events(self) -> None:
+        event_log_path = self.path / "s1" / "logs" / "p1.events.jsonl"
+        event_log_path.parent.mkdir(parents=True)
+        dashboard = StationDashboard(
+            stations=[STATION], station_paths={"s1": self.path / "s1"}
+        )
+
+        events = [
+            {"event": "sentence_start", "block": 0, "message": "sentence start - a"},
+            {"event": "onset_error", "block": 0, "message": "onset error - -2.500 ms"},
+            {"event": "signal_quality", "message": "signal quality changed - flat"},
+        ]
+        lines = [
+            json.dumps({"timestamp_ns": 0, "level": "INFO", **event})
+            for event in events
+        ]
+        with open(event_log_path, "w", encoding="utf-8") as file:
+            file.write("\n".join(lines[:2]) + "\n" + lines[2][:10])
+        dashboard.update()
+
+        snapshot = dashboard.get_snapshot()["s1"]
+        self.assertEqual(snapshot["trial_count"], 1)
+        self.assertEqual(snapshot["max_abs_onset_error_ms"], 2.5)
+        self.assertEqual(snapshot["signal_quality"], "")
+
+        with open(event_log_path, "a", encoding="utf-8") as file:
+            file.write(lines[2][10:] + "\n")
+        dashboard.update()
+
+        snapshot = dashboard.get_snapshot()["s1"]
+        self.assertEqual(snapshot["trial_count"], 1)
+        self.assertEqual(snapshot["signal_quality"], "flat")
+
+    def test_timing_is_compared_on_worst_block(self) -> None:
+        baseline = {"s1": summarize_timing_report(get_timing_report([10.0, 12.0]))}
+        summary = {
+            "s1": summarize_timing_report(get_timing_report([10.0, 11.0])),
+            "s2": summarize_timing_report(get_timing_report([30.0, 12.0])),
+        }
+
+        self.assertEqual(baseline["s1"]["sentence.show_latency_ms"]["p99"], 12.0)
+        self.assertIsNone(baseline["s1"]["fixation_cross.onset_error_ms"]["p99"])
+        self.assertEqual(compare_timing(baseline, baseline), [])
+        self.assertEqual(len(compare_timing(summary, baseline)), 2)
+
+    def test_missing_timing_report_fails_the_summary(self) -> None:
+        dashboard = StationDashboard(
+            stations=[STATION], station_paths={"s1": self.path / "s1"}
+        )
+
+        with self.assertRaises(FileNotFoundError):
+            dashboard.summarize_timing()
+
+    def test_stations_do_not_share_the_fullscreen_display(self) -> None:
+        with self.assertRaises(ValueError):
+            MultiStationLauncher(
+                stations=[STATION],
+                run_path=self.path,
+                run_kwargs={"do_use_mock_headset": True},
+                logger=LOGGER,
+            )
+
+    def test_simulated_stations_run_side_by_side(self) -> None:
+        stations = [
+            Station(
+                name=f"s{index}",
+                brainaccess_cap_name=f"cap {index}",
+                participant_id=f"p{index}",
+            )
+            for index in range(2)
+        ]
+        launcher = MultiStationLauncher(
+            stations=stations,
+            run_path=self.path,
+            run_kwargs={
+                "do_use_debug_mode": True,
+                "do_use_mock_headset": True,
+                "do_use_simulation": True,
+                "do_use_fast_startup": True,
+            },
+            logger=LOGGER,
+            dashboard_interval_seconds=0.5,
+            station_nice_increment=0,
+            launcher_nice_increment=0,
+        )
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            exit_codes = launcher.run()
+
+        self.assertEqual(exit_codes, {"s0": 0, "s1": 0})
+
+        summary = launcher.dashboard.summarize_timing()
+        self.assertEqual(sorted(summary), ["s0", "s1"])
+        for station in stations:
+            self.assertTrue(
+                (
+                    self.path
+                    / station.name
+                    / "data"
+                    / station.participant_id
+                    / "0_raw.fif"
+                ).exists()
+            )
+            snapshot = launcher.dashboard.get_snapshot()[station.name]
+            self.assertEqual(snapshot["status"], "done")
+            self.assertGreater(snapshot["trial_count"], 0)
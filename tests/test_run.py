@@ -0,0 +1,44 @@
+from importlib.util import find_spec
+from unittest import SkipTest
+
+# The framework is installed from its git repository, which CI does not do.
+if find_spec("data_acquisition") is None:
+    raise SkipTest("data-acquisition-framework is not installed")
+
+import os
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+from unittest.mock import patch
+
+from src.run import run
+
+
+class TestRun(TestCase):
+    def setUp(self) -> None:
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.addCleanup(os.chdir, os.getcwd())
+        os.chdir(temp_dir.name)
+
+    def test_headset_connected_during_a_failed_survey_is_disconnected(self) -> None:
+        with (
+            patch("src.run.MockEEGHeadset") as mock_eeg_headset,
+            patch("src.run.PreExperimentSurvey") as survey,
+        ):
+            survey.return_value.start_and_get_responses.side_effect = RuntimeError(
+                "survey window closed"
+            )
+
+            with self.assertRaises(RuntimeError):
+                run(
+                    brainaccess_cap_name="cap",
+                    do_use_mock_headset=True,
+                    do_use_fast_startup=True,
+                )
+
+        mock_eeg_headset.return_value.disconnect.assert_called_once_with()
+        (log_path,) = Path("logs").glob("startup_*.log")
+        log = log_path.read_text(encoding="utf-8")
+        self.assertIn("session failed", log)
+        self.assertIn("headset - disconnected without a session", log)
@@ -0,0 +1,42 @@
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+
+import numpy as np
+
+from src.sentence_corpus import SentenceCorpus
+
+
+class TestSentenceCorpus(TestCase):
+    def setUp(self) -> None:
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.text_path = Path(temp_dir.name) / "pl.txt"
+
+    def get_corpus(self, text: str) -> SentenceCorpus:
+        self.text_path.write_bytes(text.encode("utf-8"))
+        corpus = SentenceCorpus(text_path=self.text_path)
+        self.addCleanup(corpus.close)
+
+        return corpus
+
+    def test_sentence_ids_are_line_numbers(self) -> None:
+        corpus = self.get_corpus("Pierwsze zdanie.\r\n\nTrzecie zdanie\n\nPiąte")
+
+        self.assertEqual(len(corpus), 5)
+        self.assertEqual(corpus[0], "Pierwsze zdanie.")
+        self.assertEqual(corpus[1], "")
+        self.assertEqual(corpus[2], "Trzecie zdanie")
+        self.assertEqual(corpus[4], "Piąte")
+        self.assertEqual(corpus.index["character_count"].tolist(), [16, 0, 14, 0, 5])
+
+    def test_empty_lines_are_never_sampled(self) -> None:
+        corpus = self.get_corpus("".join(f"zdanie {i}\n\n" for i in range(10)))
+
+        for length_stratum_count in (1, 3):
+            sentence_ids = corpus.sample(
+                np.random.default_rng(0),
+                size=10,
+                length_stratum_count=length_stratum_count,
+            )
+            self.assertEqual(sorted(sentence_ids.tolist()), list(range(0, 20, 2)))
@@ -0,0 +1,288 @@
+from importlib.util import find_spec
+from unittest import SkipTest
+
+# The framework is installed from its git repository, which CI does not do.
+if find_spec("data_acquisition") is None:
+    raise SkipTest("data-acquisition-framework is not installed")
+
+import gc
+import logging
+from dataclasses import replace
+from unittest import TestCase
+from unittest.mock import Mock, call, patch
+
+import numpy as np
+from data_acquisition.event_manager import (
+    CompositeEventManager,
+    EventManager,
+    FixedTimeoutEventManager,
+    KeyPressEventManager,
+)
+from data_acquisition.eventful_screen import EventfulScreen
+
+from src.config import Config
+from src.deadline_scheduler import DeadlineScheduler
+from src.sentence_sequencer import SentenceSequencer
+from src.sentences import load_sentences
+from src.session_plan import compile_session_plan
+from src.text_layout_cache import SentenceLayouts
+from src.timing_recorder import EventSource, ScreenType, TimingRecorder
+
+
+def count_event_managers() -> int:
+    return sum(isinstance(obj, EventManager) for obj in gc.get_objects())
+
+
+def get_leaves(event_manager: EventManager[None]) -> list[EventManager[None]]:
+    if not isinstance(event_manager, CompositeEventManager):
+        return [event_manager]
+
+    return [
+        leaf for child in event_manager.event_managers for leaf in get_leaves(child)
+    ]
+
+
+def fire(event_manager: EventManager[None], leaf: EventManager[None]) -> None:
+    # The leaf fires first, then every composite above it.
+    if isinstance(event_manager, CompositeEventManager):
+        (child,) = [
+            child
+            for child in event_manager.event_managers
+            if any(child_leaf is leaf for child_leaf in get_leaves(child))
+        ]
+        fire(child, leaf)
+
+    event_manager.fire(None)
+
+
+class TestSentenceSequencer(TestCase):
+    def setUp(self) -> None:
+        self.screens: dict[str, Mock] = {}
+        for name in ("TextScreen", "FixationCrossScreen", "BlankScreen"):
+            patcher = patch(f"src.sentence_sequencer.{name}")
+            self.screens[name] = patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.config = Config(block_count=1, sentence_count=20, seed=0)
+        self.sentences = load_sentences()
+        self.session_plan = compile_session_plan(
+            config=self.config, sentences=self.sentences, seed=self.config.seed
+        )
+        self.eeg_headset = Mock()
+        self.timing_recorder = TimingRecorder(capacity=4 * self.config.sentence_count)
+        self.sequencer = self.build_sequencer()
+
+    def build_sequencer(
+        self,
+        deadline_scheduler: DeadlineScheduler | None = None,
+        sentence_layouts: SentenceLayouts | None = None,
+        wait_for_headset_start: Mock | None = None,
+    ) -> SentenceSequencer:
+        return SentenceSequencer(
+            gui=Mock(),
+            eeg_headset=self.eeg_headset,
+            config=self.config,
+            session_plan=self.session_plan,
+            sentences=self.sentences,
+            block_index=0,
+            timing_recorder=self.timing_recorder,
+            logger=logging.getLogger(__name__),
+            deadline_scheduler=deadline_scheduler,
+            sentence_layouts=sentence_layouts,
+            wait_for_headset_start=wait_for_headset_start,
+        )
+
+    def run_screens(self, *, pause_at: int | None = None) -> list[EventfulScreen[None]]:
+        # Timed screens time out and sentences alternate between a key press
+        # and a timeout. The screen at pause_at is left with the pause key.
+        screens: list[EventfulScreen[None]] = []
+        sentence_count = 0
+        while True:
+            try:
+                screen = self.sequencer.get_next()
+            except StopIteration:
+                return screens
+
+            screens.append(screen)
+            if screen.screen_show_callback is not None:
+                screen.screen_show_callback()
+
+            leaves = get_leaves(screen.event_manager)
+            key_leaves = [
+                leaf for leaf in leaves if isinstance(leaf, KeyPressEventManager)
+            ]
+            timeout_leaves = [
+                leaf for leaf in leaves if isinstance(leaf, FixedTimeoutEventManager)
+            ]
+            if len(screens) - 1 == pause_at:
+                (leaf,) = [
+                    leaf
+                    for leaf in key_leaves
+                    if leaf.key == self.config.pause_unpause_key
+                ]
+            elif len(key_leaves) == 2:
+                sentence_count += 1
+                leaf = key_leaves[1] if sentence_count % 2 else timeout_leaves[0]
+            else:
+                leaf = (timeout_leaves or key_leaves)[0]
+            fire(screen.event_manager, leaf)
+
+    def reuse_event_managers(self) -> None:
+        self.config = replace(self.config, do_reuse_event_managers=True)
+        self.sequencer = self.build_sequencer()
+
+    def test_event_managers_are_not_allocated_per_trial(self) -> None:
+        self.reuse_event_managers()
+        gc.collect()
+        event_manager_count = count_event_managers()
+
+        screens = self.run_screens(pause_at=self.config.sentence_count)
+
+        gc.collect()
+        self.assertEqual(count_event_managers(), event_manager_count)
+        self.assertGreater(len(screens), 2 * self.config.sentence_count)
+
+    def test_scheduled_timeouts_do_not_allocate_event_managers(self) -> None:
+        self.reuse_event_managers()
+        self.sequencer = self.build_sequencer(
+            DeadlineScheduler(
+                timing_recorder=self.timing_recorder,
+                refresh_rate_hz=self.config.display_refresh_rate_hz,
+            )
+        )
+        gc.collect()
+        event_manager_count = count_event_managers()
+
+        self.run_screens(pause_at=self.config.sentence_count)
+
+        gc.collect()
+        self.assertEqual(count_event_managers(), event_manager_count)
+
+    def test_event_managers_are_reused_across_trials(self) -> None:
+        self.reuse_event_managers()
+        screens = self.run_screens(pause_at=self.config.sentence_count)
+
+        fixation_cross_timeout_count = len(
+            np.unique(
+                self.session_plan.get_block_trials(0)["fixation_cross_timeout_millis"]
+            )
+        )
+        event_managers = {id(screen.event_manager) for screen in screens}
+        # One graph per fixation cross timeout and one each for the sentence,
+        # continue, pause and relax screens.
+        self.assertLessEqual(len(event_managers), fixation_cross_timeout_count + 4)
+
+    def test_graphs_do_not_share_event_managers(self) -> None:
+        screens = self.run_screens()
+
+        graph_ids_by_leaf_id: dict[int, set[int]] = {}
+        for screen in screens:
+            for leaf in get_leaves(screen.event_manager):
+                graph_ids_by_leaf_id.setdefault(id(leaf), set()).add(
+                    id(screen.event_manager)
+                )
+
+        for graph_ids in graph_ids_by_leaf_id.values():
+            self.assertEqual(len(graph_ids), 1)
+
+    def test_sentence_screens_handle_keys_and_timeouts(self) -> None:
+        self.run_screens()
+
+        records = self.timing_recorder.records
+        sentence_records = records[records["screen_type"] == ScreenType.SENTENCE]
+        self.assertEqual(
+            sentence_records["event_source"].tolist(),
+            [EventSource.KEY, EventSource.TIMEOUT] * (self.config.sentence_count // 2),
+        )
+        self.assertNotIn(EventSource.PAUSE, records["event_source"])
+
+        sentence_end_annotations = [
+            annotation_call
+            for annotation_call in self.eeg_headset.annotate.call_args_list
+            if annotation_call == call(self.config.sentence_screen_end_annotation)
+        ]
+        self.assertEqual(len(sentence_end_annotations), self.config.sentence_count)
+
+    def test_paused_trial_is_marked_and_followed_by_a_new_one(self) -> None:
+        # The first sentence is left with the pause key.
+        self.run_screens(pause_at=2)
+
+        records = self.timing_recorder.records
+        sentence_records = records[records["screen_type"] == ScreenType.SENTENCE]
+        self.assertEqual(
+            sentence_records["trial"].tolist(),
+            list(range(self.config.sentence_count + 1)),
+        )
+        fixation_cross_records = records[
+            records["screen_type"] == ScreenType.FIXATION_CROSS
+        ]
+        self.assertEqual(
+            fixation_cross_records["trial"].tolist(),
+            list(range(self.config.sentence_count + 1)),
+        )
+        self.assertEqual(
+            np.flatnonzero(
+                self.session_plan.get_block_trials(0)["was_paused"]
+            ).tolist(),
+            [0],
+        )
+
+    def test_paused_trial_is_replayed_without_spare_trials(self) -> None:
+        self.config = replace(self.config, spare_trial_count=0)
+        self.session_plan = compile_session_plan(
+            config=self.config, sentences=self.sentences, seed=self.config.seed
+        )
+        self.sequencer = self.build_sequencer()
+
+        self.run_screens(pause_at=2)
+
+        records = self.timing_recorder.records
+        sentence_records = records[records["screen_type"] == ScreenType.SENTENCE]
+        self.assertEqual(
+            sentence_records["trial"].tolist(),
+            [0, *range(self.config.sentence_count)],
+        )
+        self.assertFalse(self.session_plan.get_block_trials(0)["was_paused"].any())
+
+    def test_laid_out_sentences_are_shown_as_they_are(self) -> None:
+        # The lines are broken for the display already, so the sentence screens
+        # get them unchanged.
+        def get_text(sentence_id: int) -> str:
+            return f"sentence\n{sentence_id}"
+
+        sentence_layouts = Mock()
+        sentence_layouts.get.return_value.__getitem__ = Mock(side_effect=get_text)
+        self.sequencer = self.build_sequencer(sentence_layouts=sentence_layouts)
+
+        self.run_screens()
+
+        sentence_texts = [
+            text_screen_call.kwargs["text"]
+            for text_screen_call in self.screens["TextScreen"].call_args_list
+            if text_screen_call.kwargs["text"].startswith("sentence\n")
+        ]
+        self.assertEqual(
+            sentence_texts,
+            [
+                f"sentence\n{sentence_id}"
+                for sentence_id in self.session_plan.get_block_trials(0)[
+                    : self.config.sentence_count
+                ]["sentence_id"]
+            ],
+        )
+
+    def test_first_timed_screen_waits_for_the_headset_to_start(self) -> None:
+        wait_for_headset_start = Mock()
+        self.sequencer = self.build_sequencer(
+            wait_for_headset_start=wait_for_headset_start
+        )
+
+        # The continue screen is shown while the headset is still starting.
+        self.sequencer.get_next()
+        wait_for_headset_start.assert_not_called()
+
+        self.sequencer.get_next()
+        wait_for_headset_start.assert_called_once_with()
+
+        self.run_screens(pause_at=2)
+        wait_for_headset_start.assert_called_once_with()
@@ -0,0 +1,178 @@
+from importlib.util import find_spec
+from unittest import SkipTest
+
+# The framework is installed from its git repository, which CI does not do.
+if find_spec("data_acquisition") is None:
+    raise SkipTest("data-acquisition-framework is not installed")
+
+import logging
+import os
+from collections.abc import Callable
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any
+from unittest import TestCase
+
+import numpy as np
+from numpy.typing import NDArray
+
+from src.shared_memory_stream import (
+    SharedMemoryStreamReader,
+    SharedMemoryStreamWriter,
+    StreamChunk,
+)
+
+LOGGER = logging.getLogger(__name__)
+
+CHANNEL_NAMES = ["Fp1", "Fp2", "Cz"]
+CAPACITY = 100
+
+
+def get_samples(start: int, stop: int) -> NDArray[np.float32]:
+    return np.tile(np.arange(start, stop, dtype=np.float32), (len(CHANNEL_NAMES), 1))
+
+
+class InterleavedSamples(np.ndarray[Any, np.dtype[np.float32]]):
+    # Runs a callback every time the writer takes a part of the samples, so
+    # it can read while the write is only partly in the ring buffer.
+    on_getitem: Callable[[], None] | None = None
+
+    def __array_finalize__(self, obj: NDArray[Any] | None) -> None:
+        self.on_getitem = getattr(obj, "on_getitem", None)
+
+    def __getitem__(self, key: Any) -> Any:
+        if self.on_getitem is not None:
+            self.on_getitem()
+
+        return super().__getitem__(key)
+
+
+class TestSharedMemoryStream(TestCase):
+    def setUp(self) -> None:
+        self.writer = SharedMemoryStreamWriter(
+            name=f"test_stream_{os.getpid()}",
+            channel_names=CHANNEL_NAMES,
+            sampling_frequency=250,
+            capacity=CAPACITY,
+            logger=LOGGER,
+            annotation_capacity=4,
+        )
+        self.addCleanup(self.writer.close)
+
+    def get_reader(self) -> SharedMemoryStreamReader:
+        reader = SharedMemoryStreamReader(name=self.writer.name)
+        self.addCleanup(reader.close)
+
+        return reader
+
+    def test_readers_have_independent_cursors(self) -> None:
+        first_reader = self.get_reader()
+        self.assertEqual(first_reader.channel_names, CHANNEL_NAMES)
+        self.writer.write(get_samples(0, 30))
+        second_reader = self.get_reader()
+        self.writer.write(get_samples(30, 90))
+
+        first_chunk = first_reader.read()
+        second_chunk = second_reader.read()
+        self.writer.write(get_samples(90, 150))
+
+        self.assertEqual(first_chunk.start_sample, 0)
+        np.testing.assert_array_equal(first_chunk.samples, get_samples(0, 90))
+        self.assertEqual(second_chunk.start_sample, 30)
+        np.testing.assert_array_equal(second_chunk.samples, get_samples(30, 90))
+
+        # The read wraps around the end of the ring buffer.
+        chunk = first_reader.read()
+        self.assertEqual(chunk.lost_sample_count, 0)
+        np.testing.assert_array_equal(chunk.samples, get_samples(90, 150))
+
+    def test_overrun_is_reported(self) -> None:
+        reader = self.get_reader()
+        for start in range(0, 250, 25):
+            self.writer.write(get_samples(start, start + 25))
+
+        chunk = reader.read()
+
+        self.assertEqual(chunk.lost_sample_count, 250 - CAPACITY)
+        self.assertEqual(chunk.start_sample, 250 - CAPACITY)
+        np.testing.assert_array_equal(chunk.samples, get_samples(150, 250))
+
+    def test_read_latest_does_not_move_cursor(self) -> None:
+        reader = self.get_reader()
+        self.writer.write(get_samples(0, 60))
+
+        np.testing.assert_array_equal(
+            reader.read_latest(20).samples, get_samples(40, 60)
+        )
+        self.assertEqual(reader.read().samples.shape, (len(CHANNEL_NAMES), 60))
+
+    def test_annotations(self) -> None:
+        reader = self.get_reader()
+        self.writer.write(get_samples(0, 10))
+        self.writer.annotate("SENTENCE_START")
+        self.writer.write(get_samples(10, 20))
+        self.writer.annotate("SENTENCE_END")
+
+        annotations = reader.read_annotations()
+        self.assertEqual(annotations.descriptions, ["SENTENCE_START", "SENTENCE_END"])
+        np.testing.assert_array_equal(annotations.sample_indices, [10, 20])
+        self.assertEqual(annotations.lost_annotation_count, 0)
+
+        for index in range(6):
+            self.writer.annotate(f"annotation {index}")
+        annotations = reader.read_annotations()
+        self.assertEqual(annotations.lost_annotation_count, 2)
+        self.assertEqual(annotations.descriptions[0], "annotation 2")
+
+    def test_long_annotations_are_truncated_on_a_character_boundary(self) -> None:
+        reader = self.get_reader()
+
+        with self.assertLogs(LOGGER, logging.WARNING):
+            self.writer.annotate("ż" * 30)
+
+        (description,) = reader.read_annotations().descriptions
+        self.assertEqual(description, "ż" * 28)
+
+    def test_stale_stream_is_replaced(self) -> None:
+        name = f"test_stale_stream_{os.getpid()}"
+        # As left behind by a writer that crashed.
+        SharedMemory(name=name, create=True, size=16).close()
+
+        with self.assertLogs(LOGGER, logging.WARNING):
+            writer = SharedMemoryStreamWriter(
+                name=name,
+                channel_names=CHANNEL_NAMES,
+                sampling_frequency=250,
+                capacity=CAPACITY,
+                logger=LOGGER,
+            )
+        self.addCleanup(writer.close)
+
+        writer.write(get_samples(0, 10))
+        reader = SharedMemoryStreamReader(name=name)
+        self.addCleanup(reader.close)
+        chunk = reader.read_latest(10)
+        np.testing.assert_array_equal(chunk.samples, get_samples(0, 10))
+
+    def test_samples_overwritten_during_a_read_are_dropped(self) -> None:
+        reader = self.get_reader()
+        self.writer.write(get_samples(0, CAPACITY))
+        chunks: list[StreamChunk] = []
+
+        def read_latest() -> None:
+            chunks.append(reader.read_latest(CAPACITY))
+
+        samples = get_samples(CAPACITY, CAPACITY + 70).view(InterleavedSamples)
+        samples.on_getitem = read_latest
+        self.writer.write(samples)
+
+        # The last read copies after the first part of the write is in place
+        # but before the write is published.
+        self.assertEqual(chunks[-1].start_sample, 70)
+        self.assertEqual(chunks[-1].lost_sample_count, 70)
+        for chunk in chunks:
+            np.testing.assert_array_equal(
+                chunk.samples,
+                get_samples(
+                    chunk.start_sample, chunk.start_sample + chunk.samples.shape[1]
+                ),
+            )
@@ -0,0 +1,62 @@
+from importlib.util import find_spec
+from unittest import SkipTest
+
+# The framework is installed from its git repository, which CI does not do.
+if find_spec("data_acquisition") is None:
+    raise SkipTest("data-acquisition-framework is not installed")
+
+import logging
+from unittest import TestCase
+
+import numpy as np
+from numpy.typing import NDArray
+
+from src.eeg_stream import EEGStream
+from src.signal_quality_monitor import SignalQualityMonitor
+
+LOGGER = logging.getLogger(__name__)
+
+
+class ManualEEGStream(EEGStream):
+    def start(self) -> None:
+        pass
+
+    def stop(self) -> None:
+        pass
+
+    def publish(self, samples: NDArray[np.float32]) -> None:
+        self._publish(samples)
+
+
+def get_line_noise(amplitude: float, sample_count: int) -> NDArray[np.float32]:
+    phase = 2 * np.pi * 50 * np.arange(sample_count) / 250 + 0.3
+
+    return np.tile(amplitude * np.sin(phase), (2, 1)).astype(np.float32)
+
+
+def get_stream() -> ManualEEGStream:
+    return ManualEEGStream(channel_names=["Cz", "Pz"], sampling_frequency=250)
+
+
+class TestSignalQualityMonitor(TestCase):
+    def test_window_must_span_whole_line_noise_periods(self) -> None:
+        with self.assertRaises(ValueError):
+            SignalQualityMonitor(
+                stream=get_stream(), logger=LOGGER, window_sample_count=252
+            )
+
+    def test_line_noise_does_not_depend_on_ring_buffer_position(self) -> None:
+        for amplitude, expected_channels in ((5.0, []), (20.0, ["Cz", "Pz"])):
+            stream = get_stream()
+            monitor = SignalQualityMonitor(
+                stream=stream,
+                logger=LOGGER,
+                window_sample_count=250,
+                update_interval_sample_count=1,
+            )
+            samples = get_line_noise(amplitude, 1003)
+            # Odd-sized chunks leave the window wrapped at an arbitrary sample.
+            for start in range(0, samples.shape[1], 17):
+                stream.publish(samples[:, start : start + 17])
+
+            self.assertEqual(monitor.get_bad_channels(), ([], [], expected_channels))
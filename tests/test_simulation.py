@@ -0,0 +1,122 @@
+from importlib.util import find_spec
+from unittest import SkipTest
+
+# The framework is installed from its git repository, which CI does not do.
+if find_spec("data_acquisition") is None:
+    raise SkipTest("data-acquisition-framework is not installed")
+
+import json
+import logging
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+from unittest.mock import patch
+
+import mne
+from data_acquisition.gui.event_types import Key
+
+from src.config import Config
+from src.constants import SIMULATION_FRAMEWORK_VERSION
+from src.framework_version import get_framework_version
+from src.session_plan import load_session_plan
+from src.simulation import Response, ScriptedParticipant, SessionSimulator
+
+if get_framework_version() != SIMULATION_FRAMEWORK_VERSION:
+    raise SkipTest(
+        f"simulation needs data-acquisition-framework {SIMULATION_FRAMEWORK_VERSION}"
+    )
+
+LOGGER = logging.getLogger(__name__)
+
+
+class TestSessionSimulator(TestCase):
+    def test_session_is_run_through_the_app_sequencers(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            data_path = Path(temp_dir)
+            config = Config(
+                block_count=2,
+                sentence_count=2,
+                relax_screen_timeout_millis=1000,
+                seed=0,
+            )
+            # The start screen is left with a key press, then the first fixation
+            # cross is cut short by a pause. Everything else times out.
+            participant = ScriptedParticipant(
+                responses=[
+                    Response(key=Key.SPACE, delay_millis=500),
+                    Response(key=config.pause_unpause_key, delay_millis=100),
+                    Response(key=config.pause_unpause_key, delay_millis=2000),
+                ]
+            )
+
+            SessionSimulator(
+                config=config,
+                participant_id="simulation",
+                logger=LOGGER,
+                participant=participant,
+                data_path=data_path,
+            ).run()
+
+            save_dir_path = data_path / "simulation"
+            self.assertEqual(
+                sorted(path.name for path in save_dir_path.iterdir()),
+                [
+                    "0_raw.fif",
+                    "0_raw_annotations.npy",
+                    "1_raw.fif",
+                    "1_raw_annotations.npy",
+                    "session_plan.npz",
+                    "timing.npy",
+                    "timing_report.json",
+                ],
+            )
+
+            descriptions = [
+                list(
+                    mne.io.read_raw_fif(
+                        save_dir_path / f"{block}_raw.fif", verbose="error"
+                    ).annotations.description
+                )
+                for block in range(2)
+            ]
+            trial_descriptions = [
+                config.sentence_screen_start_annotation,
+                config.sentence_screen_end_annotation,
+            ] * 2
+            relax_descriptions = [
+                config.relax_screen_start_annotation,
+                config.relax_screen_end_annotation,
+            ]
+            self.assertEqual(
+                descriptions[0],
+                [
+                    config.pause_screen_start_annotation,
+                    config.pause_screen_end_annotation,
+                    *trial_descriptions,
+                    *relax_descriptions,
+                ],
+            )
+            self.assertEqual(descriptions[1], trial_descriptions + relax_descriptions)
+
+            with open(save_dir_path / "timing_report.json", encoding="utf-8") as file:
+                report = json.load(file)
+            self.assertEqual(report["0"]["start_experiment"]["count"], 1)
+            self.assertEqual(report["0"]["fixation_cross"]["count"], 3)
+            self.assertEqual(report["0"]["pause"]["count"], 1)
+            self.assertEqual(report["1"]["continue"]["count"], 1)
+            self.assertEqual(report["1"]["fixation_cross"]["count"], 2)
+            self.assertEqual(report["1"]["sentence"]["count"], 2)
+
+            session_plan = load_session_plan(save_dir_path / "session_plan.npz")
+            self.assertEqual(
+                session_plan.get_block_trials(0)["was_paused"][:3].tolist(),
+                [True, False, False],
+            )
+            self.assertFalse(session_plan.get_block_trials(1)["was_paused"].any())
+
+    def test_other_framework_version_is_refused(self) -> None:
+        with patch("src.simulation.get_framework_version", return_value="0.6.0"):
+            with self.assertRaises(RuntimeError):
+                SessionSimulator(
+                    config=Config(seed=0), participant_id="simulation", logger=LOGGER
+                )
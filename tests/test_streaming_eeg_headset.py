@@ -0,0 +1,101 @@
+from importlib.util import find_spec
+from unittest import SkipTest
+
+# The framework is installed from its git repository, which CI does not do.
+if find_spec("data_acquisition") is None:
+    raise SkipTest("data-acquisition-framework is not installed")
+
+import logging
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+
+import mne
+import numpy as np
+
+from src.block_segment import read_block_segment
+from src.eeg_stream import MockEEGStream
+from src.streaming_eeg_headset import StreamingEEGHeadset
+
+LOGGER = logging.getLogger(__name__)
+
+
+class ManualEEGStream(MockEEGStream):
+    def __init__(self) -> None:
+        super().__init__(logger=LOGGER, seed=0)
+
+    def start(self) -> None:
+        pass
+
+    def stop(self) -> None:
+        pass
+
+
+class TestStreamingEEGHeadset(TestCase):
+    def setUp(self) -> None:
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.path = Path(temp_dir.name)
+
+        self.stream = ManualEEGStream()
+        self.headset = StreamingEEGHeadset(
+            stream=self.stream,
+            logger=LOGGER,
+            segment_dir_path=self.path / "segments",
+            chunk_sample_count=100,
+        )
+        self.headset.set_participant_id("participant")
+
+    def test_blocks_are_written_with_block_relative_annotations(self) -> None:
+        for block in range(2):
+            self.headset.start()
+            self.stream.generate(250)
+            self.headset.annotate("sentence_start")
+            self.stream.generate(130)
+            self.headset.stop_and_save_at_path(self.path / f"{block}_raw.fif")
+
+        raw = mne.io.read_raw_fif(self.path / "1_raw.fif", verbose="error")
+        self.assertEqual(raw.n_times, 380)
+        self.assertEqual(list(raw.annotations.description), ["sentence_start"])
+        self.assertEqual(raw.time_as_index(raw.annotations.onset)[0], 250)
+        self.assertEqual(list((self.path / "segments").iterdir()), [])
+
+    def test_segments_are_named_after_participant_and_block(self) -> None:
+        segment_paths: list[Path] = []
+        for _ in range(2):
+            self.headset.start()
+            self.stream.generate(10)
+            segment_paths.append(self.headset.stop_recording())
+
+        self.assertEqual(
+            [path.name for path in segment_paths],
+            ["participant_0.seg", "participant_1.seg"],
+        )
+
+    def test_leftover_segments_of_the_participant_are_refused(self) -> None:
+        self.headset.start()
+        self.stream.generate(10)
+        self.headset.stop_recording()
+
+        with self.assertRaises(FileExistsError):
+            self.headset.set_participant_id("participant")
+        self.headset.set_participant_id("other_participant")
+
+    def test_truncated_segment_keeps_complete_records(self) -> None:
+        self.headset.start()
+        self.stream.generate(250)
+        self.headset.annotate("sentence_start")
+        self.stream.generate(50)
+        segment_path = self.headset.stop_recording()
+        samples = read_block_segment(segment_path).read_samples(0, 200)
+
+        # The last chunk is cut off halfway, as it would be by a crash.
+        chunk_size = 100 * len(self.stream.channel_names) * 4
+        with open(segment_path, "r+b") as file:
+            file.truncate(segment_path.stat().st_size - chunk_size // 2)
+
+        segment = read_block_segment(segment_path)
+        self.assertEqual(segment.sample_count, 200)
+        self.assertEqual(segment.annotation_sample_indices, [250])
+        self.assertEqual(segment.annotation_descriptions, ["sentence_start"])
+        np.testing.assert_array_equal(segment.read_samples(0, 200), samples)
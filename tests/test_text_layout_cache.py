@@ -0,0 +1,150 @@
+from importlib.util import find_spec
+from unittest import SkipTest
+
+# The framework is installed from its git repository, which CI does not do.
+if find_spec("data_acquisition") is None:
+    raise SkipTest("data-acquisition-framework is not installed")
+
+import os
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+from unittest.mock import patch
+
+import pygame.font
+
+from src.sentence_corpus import SentenceCorpus
+from src.sentences import Sentences
+from src.text_layout_cache import (
+    TEXT_LAYOUT_SUFFIX,
+    LineWrapper,
+    TextLayoutKey,
+    build_corpus_layout,
+    check_text_layout_framework_version,
+    load_sentence_layouts,
+)
+
+POLISH_SENTENCES = [
+    "Zażółć gęślą jaźń, zanim słońce zajdzie nad spokojnym jeziorem.",
+    "Krótkie zdanie.",
+]
+ENGLISH_SENTENCES = [
+    "The quick brown fox jumps over the lazy dog near the quiet river bank.",
+    "Short sentence.",
+]
+
+
+def get_key(display_width: int = 400) -> TextLayoutKey:
+    return TextLayoutKey(
+        font_name=None,
+        font_size=24,
+        display_width=display_width,
+        display_height=300,
+        max_line_width_ratio=0.5,
+    )
+
+
+class TestTextLayoutCache(TestCase):
+    def setUp(self) -> None:
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.path = Path(temp_dir.name)
+        self.cache_dir_path = self.path / "cache"
+
+    def get_sentences(
+        self, polish_sentences: list[str] = POLISH_SENTENCES
+    ) -> Sentences:
+        corpora: list[SentenceCorpus] = []
+        for name, lines in (("pl", polish_sentences), ("en", ENGLISH_SENTENCES)):
+            text_path = self.path / f"{name}.txt"
+            text_path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+            corpus = SentenceCorpus(text_path=text_path)
+            self.addCleanup(corpus.close)
+            corpora.append(corpus)
+
+        return Sentences(polish=corpora[0], english=corpora[1])
+
+    def test_sentences_are_broken_into_lines(self) -> None:
+        sentences = self.get_sentences()
+
+        layouts = load_sentence_layouts(
+            sentences, key=get_key(), cache_dir_path=self.cache_dir_path
+        )
+
+        text = layouts.polish[0]
+        self.assertGreater(text.count("\n"), 0)
+        self.assertEqual(text.replace("\n", " "), POLISH_SENTENCES[0])
+        self.assertEqual(layouts.english[1], ENGLISH_SENTENCES[1])
+
+    def test_lines_fit_so_text_screen_does_not_wrap_them_again(self) -> None:
+        # TextScreen renders every line as it is given, so each one has to fit
+        # in the font it renders with.
+        sentences = self.get_sentences()
+        key = get_key()
+
+        layouts = load_sentence_layouts(
+            sentences, key=key, cache_dir_path=self.cache_dir_path
+        )
+
+        pygame.font.init()
+        font = pygame.font.Font(key.font_name, key.font_size)
+        for layout, lines in (
+            (layouts.polish, POLISH_SENTENCES),
+            (layouts.english, ENGLISH_SENTENCES),
+        ):
+            for sentence_id in range(len(lines)):
+                for line in layout[sentence_id].split("\n"):
+                    self.assertLessEqual(font.size(line)[0], key.max_line_width)
+
+    def test_only_changed_sentences_are_laid_out_again(self) -> None:
+        sentences = self.get_sentences()
+        key = get_key()
+        load_sentence_layouts(sentences, key=key, cache_dir_path=self.cache_dir_path)
+
+        sentences = self.get_sentences(
+            polish_sentences=[*POLISH_SENTENCES, "Nowe zdanie na końcu korpusu."]
+        )
+        layout_path = self.cache_dir_path / key.get_digest() / f"pl{TEXT_LAYOUT_SUFFIX}"
+
+        self.assertEqual(
+            build_corpus_layout(sentences.polish, layout_path, LineWrapper(key)), 1
+        )
+
+    def test_least_recently_used_layouts_are_evicted(self) -> None:
+        sentences = self.get_sentences()
+        keys = [get_key(display_width) for display_width in (300, 400, 500)]
+        for index, key in enumerate(keys):
+            load_sentence_layouts(
+                sentences, key=key, cache_dir_path=self.cache_dir_path
+            )
+            key_path = self.cache_dir_path / key.get_digest() / "key.json"
+            os.utime(key_path, ns=(index, index))
+        byte_count = sum(
+            path.stat().st_size for path in self.cache_dir_path.rglob("*.*")
+        )
+
+        load_sentence_layouts(
+            sentences,
+            key=keys[1],
+            cache_dir_path=self.cache_dir_path,
+            max_byte_count=byte_count - 1,
+        )
+
+        self.assertEqual(
+            sorted(path.name for path in self.cache_dir_path.iterdir()),
+            sorted(key.get_digest() for key in keys[1:]),
+        )
+
+    def test_unverified_framework_version_is_refused(self) -> None:
+        with patch(
+            "src.text_layout_cache.TEXT_LAYOUT_VERIFIED_FRAMEWORK_VERSIONS", ("0.5.0",)
+        ):
+            with patch(
+                "src.text_layout_cache.get_framework_version", return_value="0.6.0"
+            ):
+                with self.assertRaises(ValueError):
+                    check_text_layout_framework_version()
+            with patch(
+                "src.text_layout_cache.get_framework_version", return_value="0.5.0"
+            ):
+                check_text_layout_framework_version()